@@ -0,0 +1,8 @@
+"""
+Throughput benchmarks for SecuLint.
+
+Generates deterministic synthetic source trees and times the public entry
+points on them (ignore matching, pattern compilation, `walk_and_scan` and
+the JSON and HTML reporters). Run `python -m benchmarks --help` from the
+project directory.
+"""
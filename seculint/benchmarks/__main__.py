@@ -0,0 +1,158 @@
+import argparse
+import json
+import sys
+import tempfile
+from dataclasses import fields
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .runner import (
+    DEFAULT_REGRESSION_THRESHOLD,
+    comparable,
+    compare_results,
+    print_comparison,
+    run_benchmark,
+)
+from .synthetic import MANIFEST_NAME, TreeSpec, generate_tree, load_manifest
+
+
+def _add_spec_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = TreeSpec()
+    parser.add_argument("--files", type=int, default=defaults.files, help="Number of files.")
+    parser.add_argument(
+        "--file-size-kb", type=float, default=defaults.file_size_kb,
+        help="Average file size in KB; sizes vary from half to one and a half times this.",
+    )
+    parser.add_argument("--line-length", type=int, default=defaults.line_length, help="Average line length.")
+    parser.add_argument(
+        "--secret-density", type=float, default=defaults.secret_density,
+        help="Share of lines holding a secret or privacy leak.",
+    )
+    parser.add_argument(
+        "--ignore-rules", type=int, default=defaults.ignore_rules, help="Number of .seculintignore rules."
+    )
+    parser.add_argument(
+        "--binary-ratio", type=float, default=defaults.binary_ratio, help="Share of binary files."
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Random seed.")
+
+
+def _spec_from_args(args: argparse.Namespace) -> TreeSpec:
+    return TreeSpec(**{f.name: getattr(args, f.name) for f in fields(TreeSpec)})
+
+
+def _load_results(path: Path) -> Optional[Dict]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"[ERROR] Could not read results {path}: {e}", file=sys.stderr)
+        return None
+
+
+def _compare(baseline: Dict, current: Dict, threshold: float, file=None) -> int:
+    for problem in comparable(baseline, current):
+        print(f"[WARN] Results may not be comparable, {problem}", file=sys.stderr)
+    rows = compare_results(baseline, current, threshold)
+    print_comparison(rows, threshold, file)
+    return 1 if any(row["regressed"] for row in rows) else 0
+
+
+def cmd_generate(args: argparse.Namespace) -> int:
+    manifest = generate_tree(args.directory, _spec_from_args(args))
+    print(
+        f"[INFO] Generated {manifest['files']} files ({manifest['bytes'] / 1e6:.1f} MB, "
+        f"{manifest['binary_files']} binary) in {args.directory}"
+    )
+    return 0
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    baseline = None
+    if args.compare is not None:
+        baseline = _load_results(args.compare)
+        if baseline is None:
+            return 2
+
+    with tempfile.TemporaryDirectory(prefix="seculint-tree-") as tmp:
+        if args.tree is not None:
+            root = args.tree
+            spec = load_manifest(root)["spec"] if (root / MANIFEST_NAME).exists() else None
+        else:
+            root = Path(tmp)
+            print(f"[INFO] Generating synthetic tree in {root}", file=sys.stderr)
+            spec = generate_tree(root, _spec_from_args(args))["spec"]
+        results = run_benchmark(root, repeat=args.repeat, jobs=args.jobs, spec=spec)
+
+    text = json.dumps(results, indent=2)
+    if args.output is not None:
+        args.output.write_text(text + "\n", encoding="utf-8")
+        print(f"[INFO] Benchmark results saved to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    if baseline is not None:
+        # Keep stdout parseable when the results were printed there.
+        return _compare(baseline, results, args.threshold, sys.stdout if args.output else sys.stderr)
+    return 0
+
+
+def cmd_compare(args: argparse.Namespace) -> int:
+    baseline = _load_results(args.baseline)
+    current = _load_results(args.current)
+    if baseline is None or current is None:
+        return 2
+    return _compare(baseline, current, args.threshold)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Reproducible throughput benchmarks for SecuLint.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", help="Write a synthetic tree to a directory.")
+    gen.add_argument("directory", type=Path)
+    _add_spec_arguments(gen)
+    gen.set_defaults(func=cmd_generate)
+
+    run = sub.add_parser(
+        "run",
+        help="Benchmark on a synthetic tree and print the results as JSON.",
+        description=(
+            "Benchmark on the tree given by --tree, or on a synthetic tree "
+            "generated from the tree options into a temporary directory."
+        ),
+    )
+    run.add_argument("--tree", type=Path, help="Benchmark an existing tree instead of generating one.")
+    run.add_argument("--repeat", type=int, default=3, help="Runs per stage; the median is reported.")
+    run.add_argument("--jobs", type=int, default=1, help="Worker processes for walk_and_scan.")
+    run.add_argument("--output", type=Path, help="Write the results to this file instead of stdout.")
+    run.add_argument("--compare", type=Path, help="Compare with a previous results file.")
+    run.add_argument(
+        "--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+        help="Percentage a metric may worsen before it counts as a regression.",
+    )
+    _add_spec_arguments(run)
+    run.set_defaults(func=cmd_run)
+
+    cmp = sub.add_parser(
+        "compare",
+        help="Compare two results files; exits 1 if any metric regressed.",
+    )
+    cmp.add_argument("baseline", type=Path)
+    cmp.add_argument("current", type=Path)
+    cmp.add_argument(
+        "--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+        help="Percentage a metric may worsen before it counts as a regression.",
+    )
+    cmp.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    if getattr(args, "repeat", 1) < 1:
+        parser.error("--repeat must be at least 1")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from seculint import __version__
+from seculint.ignore import IgnoreMatcher, load_ignore_patterns
+from seculint.patterns import build_active_patterns
+from seculint.reporting import save_findings_html, save_findings_json
+from seculint.scanner import clear_scan_caches, walk_and_scan
+
+RESULTS_VERSION = 1
+DEFAULT_REGRESSION_THRESHOLD = 10.0
+
+# Stage times that change by less than this are timer noise, whatever the
+# percentage; throughput metrics follow the stage they are derived from.
+STAGE_NOISE_SECONDS = 0.005
+_DERIVED_FROM = {
+    "throughput.files_per_second": "stages.scan",
+    "throughput.mb_per_second": "stages.scan",
+    "throughput.ignore_checks_per_second": "stages.ignore",
+}
+
+# Metrics checked by `compare`, and whether a higher value is better.
+COMPARED_METRICS: Dict[str, bool] = {
+    "stages.ignore": False,
+    "stages.patterns": False,
+    "stages.scan": False,
+    "stages.json_report": False,
+    "stages.html_report": False,
+    "throughput.files_per_second": True,
+    "throughput.mb_per_second": True,
+    "throughput.ignore_checks_per_second": True,
+    "peak_rss_bytes": False,
+}
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process and its finished children."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is in KB on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) * scale
+
+
+def _timed(fn: Callable):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def _tree_paths(root: Path) -> List[Tuple[str, bool, int]]:
+    """(relative path, is_dir, size) of everything under `root`."""
+    entries: List[Tuple[str, bool, int]] = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root).replace("\\", "/")
+        prefix = "" if rel_dir == "." else rel_dir + "/"
+        for name in dirnames:
+            entries.append((prefix + name, True, 0))
+        for name in filenames:
+            entries.append((prefix + name, False, os.path.getsize(os.path.join(dirpath, name))))
+    return entries
+
+
+def _run_once(
+    root: Path, entries: List[Tuple[str, bool, int]], out_dir: Path, jobs: int, max_size_mb: int
+) -> Dict:
+    stages: Dict[str, float] = {}
+
+    def check_ignores():
+        matcher = IgnoreMatcher(load_ignore_patterns(root))
+        kept = []
+        for rel, is_dir, size in entries:
+            if not matcher.is_ignored(rel, is_dir) and not is_dir:
+                kept.append((rel, size))
+        return matcher, kept
+
+    # Every run starts cold: binary verdicts and content results from the
+    # previous run would let it skip sniffing and scanning.
+    clear_scan_caches()
+    (matcher, kept), stages["ignore"] = _timed(check_ignores)
+    patterns, stages["patterns"] = _timed(lambda: build_active_patterns({}))
+    findings, stages["scan"] = _timed(
+        lambda: walk_and_scan(
+            root,
+            max_size_mb=max_size_mb,
+            include_ext=None,
+            exclude_ext=None,
+            ignore_patterns=matcher,
+            active_patterns=patterns,
+            jobs=jobs,
+        )
+    )
+    _, stages["json_report"] = _timed(lambda: save_findings_json(findings, out_dir / "report.json"))
+    _, stages["html_report"] = _timed(lambda: save_findings_html(findings, out_dir / "report.html"))
+
+    return {
+        "stages": stages,
+        "files": len(kept),
+        "bytes": sum(size for _, size in kept),
+        "ignore_checks": len(entries),
+        "findings": len(findings),
+    }
+
+
+def run_benchmark(
+    root: Path,
+    repeat: int = 3,
+    jobs: int = 1,
+    max_size_mb: int = 10,
+    spec: Optional[Dict] = None,
+) -> Dict:
+    """
+    Run every stage `repeat` times on the tree at `root` and return the
+    results: median seconds per stage, throughput derived from the median
+    scan time, and the peak RSS of the whole run. `spec` records the
+    parameters the tree was generated with, if known.
+    """
+    entries = _tree_paths(root)
+    runs: List[Dict] = []
+    with tempfile.TemporaryDirectory(prefix="seculint-bench-") as out:
+        for i in range(repeat):
+            print(f"[INFO] Benchmark run {i + 1}/{repeat}", file=sys.stderr)
+            # The scanner and reporters print progress; keep stdout for results.
+            with redirect_stdout(sys.stderr):
+                runs.append(_run_once(root, entries, Path(out), jobs, max_size_mb))
+
+    stages = {
+        name: statistics.median(run["stages"][name] for run in runs)
+        for name in runs[0]["stages"]
+    }
+    first = runs[0]
+    scan = stages["scan"] or 1e-9
+    return {
+        "version": RESULTS_VERSION,
+        "seculint_version": __version__,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {"repeat": repeat, "jobs": jobs, "max_size_mb": max_size_mb},
+        "spec": spec,
+        "tree": {
+            "files_scanned": first["files"],
+            "bytes_scanned": first["bytes"],
+            "paths": first["ignore_checks"],
+        },
+        "findings": first["findings"],
+        "stages": stages,
+        "samples": {name: [run["stages"][name] for run in runs] for name in stages},
+        "throughput": {
+            "files_per_second": first["files"] / scan,
+            "mb_per_second": first["bytes"] / 1_000_000 / scan,
+            "ignore_checks_per_second": first["ignore_checks"] / (stages["ignore"] or 1e-9),
+            "findings_per_second": first["findings"] / scan,
+        },
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def _metric(results: Dict, key: str) -> Optional[float]:
+    value = results
+    for part in key.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def compare_results(
+    baseline: Dict, current: Dict, threshold: float = DEFAULT_REGRESSION_THRESHOLD
+) -> List[Dict]:
+    """
+    Compare `current` with `baseline` metric by metric. A metric regresses
+    when it is more than `threshold` percent worse than in the baseline.
+    """
+    rows: List[Dict] = []
+    for key, higher_is_better in COMPARED_METRICS.items():
+        old, new = _metric(baseline, key), _metric(current, key)
+        if old is None or new is None or old == 0:
+            continue
+        change = (new - old) / old * 100
+        worse = -change if higher_is_better else change
+        stage = key if key.startswith("stages.") else _DERIVED_FROM.get(key)
+        regressed = worse > threshold and not (
+            stage is not None
+            and abs(_metric(current, stage) - _metric(baseline, stage)) < STAGE_NOISE_SECONDS
+        )
+        rows.append(
+            {"metric": key, "baseline": old, "current": new, "change_pct": change, "regressed": regressed}
+        )
+    return rows
+
+
+def comparable(baseline: Dict, current: Dict) -> List[str]:
+    """Differences between the runs that make their numbers incomparable."""
+    problems: List[str] = []
+    for key in ("spec", "tree"):
+        if baseline.get(key) != current.get(key):
+            problems.append(f"{key} differs: {baseline.get(key)} vs {current.get(key)}")
+    old_jobs = baseline.get("settings", {}).get("jobs")
+    new_jobs = current.get("settings", {}).get("jobs")
+    if old_jobs != new_jobs:
+        problems.append(f"jobs differ: {old_jobs} vs {new_jobs}")
+    if baseline.get("findings") != current.get("findings"):
+        problems.append(f"finding count differs: {baseline.get('findings')} vs {current.get('findings')}")
+    return problems
+
+
+def print_comparison(rows: List[Dict], threshold: float, file=None) -> None:
+    file = file or sys.stdout
+    print(f"{'metric':<36} {'baseline':>14} {'current':>14} {'change':>9}", file=file)
+    for row in rows:
+        flag = "  REGRESSED" if row["regressed"] else ""
+        print(
+            f"{row['metric']:<36} {row['baseline']:>14.4g} {row['current']:>14.4g} "
+            f"{row['change_pct']:>+8.1f}%{flag}",
+            file=file,
+        )
+    regressed = sum(row["regressed"] for row in rows)
+    if regressed:
+        print(f"[ERROR] {regressed} metric(s) regressed by more than {threshold:g}%.", file=sys.stderr)
+    else:
+        print(f"[INFO] No metric regressed by more than {threshold:g}%.", file=file)
@@ -1,8 +1,16 @@
+import asyncio
+import hashlib
 import json
 import os
+import random
+import re
+import time
+from collections import deque
+from itertools import groupby, islice
 from pathlib import Path
-from typing import Dict, List
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from .cache import AIVerdictCache
 from .models import Finding
 
 try:
@@ -10,6 +18,28 @@ try:
 except ImportError:
     openai = None
 
+DEFAULT_AI_MODEL = "gpt-4o-mini"
+DEFAULT_AI_CONCURRENCY = 8
+# Requests started per second, across all concurrent requests.
+DEFAULT_AI_RATE_LIMIT = 5.0
+# Seconds allowed for a single request before it is retried.
+DEFAULT_AI_TIMEOUT = 60.0
+DEFAULT_AI_MAX_RETRIES = 4
+AI_BACKOFF_BASE = 1.0
+AI_BACKOFF_MAX = 30.0
+
+# Findings of one file are reviewed together: their context windows are
+# merged and sent in prompts of at most this many findings and characters.
+AI_CONTEXT_RADIUS = 6
+AI_BATCH_MAX_FINDINGS = 20
+AI_BATCH_MAX_CONTEXT_CHARS = 12_000
+AI_CONTEXT_LINE_MAX_CHARS = 400
+
+SYSTEM_PROMPT = "You are a security code reviewer."
+# Bump when prompts or their interpretation change, so cached verdicts
+# from older prompts are not reused.
+AI_PROMPT_VERSION = 2
+
 
 def get_line_context(file_path: Path, line_no: int, radius: int = 5) -> str:
     try:
@@ -21,7 +51,110 @@ def get_line_context(file_path: Path, line_no: int, radius: int = 5) -> str:
     return "\n".join(f"{i+1:4}: {lines[i]}" for i in range(start, end))
 
 
-def call_ai_model(prompt: str, model: str = "gpt-4o-mini") -> str:
+def read_leading_lines(file_path: Path, last_line: int) -> List[str]:
+    """The first `last_line` lines of a file; nothing past them is read."""
+    try:
+        with file_path.open("r", encoding="utf-8", errors="ignore") as fh:
+            return [line.rstrip("\n") for line in islice(fh, last_line)]
+    except OSError:
+        return []
+
+
+def merge_context_windows(
+    line_nos: Iterable[int], radius: int, line_count: int
+) -> List[Tuple[int, int]]:
+    """Inclusive (start, end) line ranges around each line, overlaps merged."""
+    windows: List[Tuple[int, int]] = []
+    for line_no in sorted(set(line_nos)):
+        start, end = max(1, line_no - radius), min(line_count, line_no + radius)
+        if start > end:
+            continue
+        if windows and start <= windows[-1][1] + 1:
+            windows[-1] = (windows[-1][0], max(windows[-1][1], end))
+        else:
+            windows.append((start, end))
+    return windows
+
+
+def render_context(lines: List[str], windows: List[Tuple[int, int]]) -> str:
+    return "\n  ...\n".join(
+        "\n".join(
+            f"{i:4}: {lines[i - 1][:AI_CONTEXT_LINE_MAX_CHARS]}" for i in range(start, end + 1)
+        )
+        for start, end in windows
+    )
+
+
+def read_finding_lines(file_findings: List[Finding], radius: int = AI_CONTEXT_RADIUS) -> List[str]:
+    """The lines of a file that the context windows of its findings can need."""
+    if not file_findings:
+        return []
+    last_line = max(f.line_no for f in file_findings) + radius
+    return read_leading_lines(Path(file_findings[0].file_path), last_line)
+
+
+def batch_findings(
+    file_findings: List[Finding], lines: List[str], radius: int = AI_CONTEXT_RADIUS
+) -> Iterator[Tuple[List[Finding], str]]:
+    """
+    Split the findings of one file into prompt-sized batches, yielding each
+    batch with its context windows merged over `lines`.
+    """
+    if not file_findings:
+        return
+    batch: List[Finding] = []
+    context = ""
+    for f in file_findings:
+        candidate = batch + [f]
+        rendered = render_context(
+            lines, merge_context_windows((x.line_no for x in candidate), radius, len(lines))
+        )
+        if batch and (
+            len(candidate) > AI_BATCH_MAX_FINDINGS or len(rendered) > AI_BATCH_MAX_CONTEXT_CHARS
+        ):
+            yield batch, context
+            batch = [f]
+            context = render_context(lines, merge_context_windows([f.line_no], radius, len(lines)))
+        else:
+            batch, context = candidate, rendered
+    yield batch, context
+
+
+def batch_file_findings(
+    file_findings: List[Finding], radius: int = AI_CONTEXT_RADIUS
+) -> Iterator[Tuple[List[Finding], str]]:
+    """
+    Batch the findings of one file, reading the file once and only up to
+    the last line any window needs.
+    """
+    lines = read_finding_lines(file_findings, radius)
+    return batch_findings(file_findings, lines, radius)
+
+
+def verdict_cache_key(
+    finding: Finding, lines: List[str], model: str, radius: int = AI_CONTEXT_RADIUS
+) -> str:
+    """
+    Hash of everything a verdict depends on: the pattern, the matched line,
+    the code around it, the model and the prompt version. Whitespace is
+    collapsed and line numbers are left out, so reindenting a file or
+    shifting a finding up or down does not invalidate its verdict.
+    """
+    window = merge_context_windows([finding.line_no], radius, len(lines))
+    context = [" ".join(lines[i - 1].split()) for start, end in window for i in range(start, end + 1)]
+    payload = json.dumps(
+        [
+            finding.pattern_name,
+            " ".join(finding.line_preview.split()),
+            context,
+            model,
+            AI_PROMPT_VERSION,
+        ]
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _api_key() -> str:
     if openai is None:
         raise RuntimeError(
             "openai library is not installed. Install with 'pip install openai' to use --enable-ai."
@@ -29,21 +162,29 @@ def call_ai_model(prompt: str, model: str = "gpt-4o-mini") -> str:
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY not set in environment, required for --enable-ai.")
-    openai.api_key = api_key
+    return api_key
+
+
+def _messages(prompt: str) -> List[Dict]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
 
-    resp = openai.ChatCompletion.create(
+
+def call_ai_model(prompt: str, model: str = DEFAULT_AI_MODEL) -> str:
+    api_key = _api_key()
+    client = openai.OpenAI(api_key=api_key)
+    resp = client.chat.completions.create(
         model=model,
-        messages=[
-            {"role": "system", "content": "You are a security code reviewer."},
-            {"role": "user", "content": prompt},
-        ],
+        messages=_messages(prompt),
         temperature=0.1,
     )
-    return resp["choices"][0]["message"]["content"]
+    return resp.choices[0].message.content or ""
 
 
-def analyze_finding_with_ai(finding: Finding, file_context: str) -> Dict:
-    prompt = f"""
+def build_finding_prompt(finding: Finding, file_context: str) -> str:
+    return f"""
 You are a senior application security engineer.
 
 You are reviewing this code context:
@@ -69,7 +210,9 @@ Respond ONLY in strict JSON, with keys:
   "severity" (string: LOW|MEDIUM|HIGH),
   "reason" (string).
 """
-    text = call_ai_model(prompt)
+
+
+def parse_ai_response(text: str, finding: Finding) -> Dict:
     text = text.strip()
 
     # Handle case where model wraps JSON in ```json ... ```
@@ -91,30 +234,361 @@ Respond ONLY in strict JSON, with keys:
     return data
 
 
-def ai_refine_findings(findings: List[Finding]) -> List[Finding]:
-    refined: List[Finding] = []
+def build_batch_prompt(file_path: str, findings: List[Finding], file_context: str) -> str:
+    items = "\n".join(
+        f"- Line {f.line_no}, pattern {f.pattern_name}: "
+        f"{f.line_preview.strip()[:AI_CONTEXT_LINE_MAX_CHARS]}"
+        for f in findings
+    )
+    return f"""
+You are a senior application security engineer.
+
+You are reviewing excerpts of the file {file_path}:
+
+{file_context}
+
+A regex-based scanner detected these potential findings in it:
+
+{items}
+
+For each finding:
+1. Is this actually a secret or sensitive data or truly security-relevant? (true/false)
+2. If yes, what type? (e.g., password, token, API key, private key, PII, debug_flag, false_positive, etc.)
+3. What severity would you assign? (LOW, MEDIUM, HIGH)
+4. Give a short reason (max 2 sentences).
+
+Respond ONLY with a strict JSON array holding one object per finding, with keys:
+  "line" (integer, the finding's line number),
+  "pattern" (string, the finding's pattern),
+  "is_secret" (boolean),
+  "secret_type" (string),
+  "severity" (string: LOW|MEDIUM|HIGH),
+  "reason" (string).
+"""
+
+
+def _strip_code_fences(text: str) -> str:
+    text = text.strip()
+    if text.startswith("```"):
+        lines = [ln for ln in text.splitlines() if not ln.strip().startswith("```")]
+        text = "\n".join(lines).strip()
+    return text
+
+
+def _loads(text: str):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return None
+
+
+def parse_batch_response(text: str) -> List[Dict]:
+    """
+    Extract verdict objects from a model answer. Tolerates code fences,
+    prose around the JSON, an object wrapping the array, and a truncated or
+    malformed array, from which every well-formed item is still recovered.
+    """
+    text = _strip_code_fences(text)
+    data = _loads(text)
+    if data is None:
+        start, end = text.find("["), text.rfind("]")
+        if 0 <= start < end:
+            data = _loads(text[start : end + 1])
+
+    if isinstance(data, dict):
+        data = next((v for v in data.values() if isinstance(v, list)), [data])
+    if isinstance(data, list):
+        return [item for item in data if isinstance(item, dict)]
+
+    items = []
+    for m in re.finditer(r"\{[^{}]*\}", text):
+        item = _loads(m.group(0))
+        if isinstance(item, dict):
+            items.append(item)
+    return items
+
+
+def match_verdicts(findings: List[Finding], verdicts: List[Dict]) -> List[Optional[Dict]]:
+    """Pair each finding with its verdict by (line, pattern), falling back to line."""
+    by_key: Dict[Tuple[int, str], Dict] = {}
+    by_line: Dict[int, Dict] = {}
+    for v in verdicts:
+        try:
+            line_no = int(v.get("line"))
+        except (TypeError, ValueError):
+            continue
+        by_key.setdefault((line_no, str(v.get("pattern", ""))), v)
+        by_line.setdefault(line_no, v)
+
+    matched = [by_key.get((f.line_no, f.pattern_name)) or by_line.get(f.line_no) for f in findings]
+    if len(findings) == 1 and matched[0] is None and len(verdicts) == 1:
+        matched[0] = verdicts[0]
+    return matched
+
+
+def _missing_verdict(finding: Finding) -> Dict:
+    return {
+        "is_secret": True,
+        "secret_type": finding.pattern_name,
+        "severity": finding.severity,
+        "reason": "AI response had no valid verdict for this finding; falling back to regex classification.",
+    }
+
+
+def analyze_finding_with_ai(finding: Finding, file_context: str) -> Dict:
+    text = call_ai_model(build_finding_prompt(finding, file_context))
+    return parse_ai_response(text, finding)
+
+
+def _apply_analysis(f: Finding, analysis: Dict) -> None:
+    # Ensure safe defaults even if AI gives garbage or empty JSON
+    is_secret = analysis.get("is_secret", False)
+    if isinstance(is_secret, str):
+        is_secret = is_secret.strip().lower() in ("true", "yes", "1")
+    f.ai_confirmed = bool(is_secret)
+    f.ai_type = analysis.get("secret_type", f.pattern_name)
+    sev = analysis.get("severity", f.severity)
+    f.ai_severity = sev.upper() if isinstance(sev, str) else f.severity.upper()
+    f.ai_reason = analysis.get("reason", "No AI reason provided.")
+
+
+def _apply_ai_error(f: Finding, e: Exception) -> None:
+    # Fail-safe fallback: never return None values
+    f.ai_confirmed = True           # treat as real secret
+    f.ai_type = f.pattern_name
+    f.ai_severity = f.severity
+    f.ai_reason = f"[AI ERROR] {e}"
+
+
+class TokenBucket:
+    """
+    Async token bucket: tokens refill at `rate` per second up to `capacity`,
+    and each request takes one, so bursts are bounded by `capacity` and the
+    sustained request rate by `rate`.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
 
-    for f in findings:
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Exponential backoff with jitter, or the server's Retry-After if given."""
+    if retry_after:
         try:
-            context = get_line_context(Path(f.file_path), f.line_no, radius=6)
-            analysis = analyze_finding_with_ai(f, context)
+            return min(AI_BACKOFF_MAX, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    return min(AI_BACKOFF_MAX, AI_BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+class AsyncAIClient:
+    """
+    Chat completions client for concurrent refinement. Requests are started
+    through a shared token bucket, time out after `timeout` seconds, and are
+    retried with backoff on timeouts, connection errors, 429 and 5xx
+    responses. Other errors are raised to the caller.
+
+    The endpoint follows the `openai` library's configuration, so setting
+    `OPENAI_BASE_URL` points it at any compatible server, such as a local
+    stand-in for testing.
+    """
+
+    def __init__(
+        self,
+        model: str = DEFAULT_AI_MODEL,
+        rate_limit: float = DEFAULT_AI_RATE_LIMIT,
+        burst: float = DEFAULT_AI_CONCURRENCY,
+        timeout: float = DEFAULT_AI_TIMEOUT,
+        max_retries: int = DEFAULT_AI_MAX_RETRIES,
+    ):
+        self.model = model
+        self.max_retries = max_retries
+        self.limiter = TokenBucket(rate_limit, max(1.0, burst))
+        # Retries are handled here so they pass through the rate limiter.
+        self._client = openai.AsyncOpenAI(api_key=_api_key(), timeout=timeout, max_retries=0)
+
+    async def complete(self, prompt: str) -> str:
+        attempt = 0
+        while True:
+            await self.limiter.acquire()
+            try:
+                resp = await self._client.chat.completions.create(
+                    model=self.model,
+                    messages=_messages(prompt),
+                    temperature=0.1,
+                )
+                return resp.choices[0].message.content or ""
+            except openai.APIStatusError as e:
+                if attempt >= self.max_retries or not (e.status_code == 429 or e.status_code >= 500):
+                    raise
+                delay = _retry_delay(attempt, e.response.headers.get("retry-after"))
+            except openai.APIConnectionError:  # includes timeouts
+                if attempt >= self.max_retries:
+                    raise
+                delay = _retry_delay(attempt)
+            attempt += 1
+            await asyncio.sleep(delay)
 
-            # Ensure safe defaults even if AI gives garbage or empty JSON
-            f.ai_confirmed = bool(analysis.get("is_secret", False))
-            f.ai_type = analysis.get("secret_type", f.pattern_name)
-            sev = analysis.get("severity", f.severity)
-            f.ai_severity = sev.upper() if isinstance(sev, str) else f.severity.upper()
-            f.ai_reason = analysis.get("reason", "No AI reason provided.")
+    async def close(self) -> None:
+        await self._client.close()
 
-            refined.append(f)
 
+async def _refine_batch(
+    batch: List[Finding],
+    file_context: str,
+    client: Optional[AsyncAIClient],
+    client_error: Optional[Exception],
+    semaphore: asyncio.Semaphore,
+    cache: Optional[AIVerdictCache] = None,
+    keys: Optional[Dict[int, str]] = None,
+) -> List[Finding]:
+    async with semaphore:
+        try:
+            if client is None:
+                raise client_error
+            prompt = build_batch_prompt(batch[0].file_path, batch, file_context)
+            verdicts = match_verdicts(batch, parse_batch_response(await client.complete(prompt)))
+            for f, verdict in zip(batch, verdicts):
+                if verdict is None:
+                    _apply_analysis(f, _missing_verdict(f))
+                    continue
+                _apply_analysis(f, verdict)
+                if cache is not None:
+                    # Store the normalized verdict, never fallbacks or errors.
+                    cache.put(
+                        keys[id(f)],
+                        {
+                            "is_secret": f.ai_confirmed,
+                            "secret_type": f.ai_type,
+                            "severity": f.ai_severity,
+                            "reason": f.ai_reason,
+                        },
+                    )
         except Exception as e:
-            # Fail-safe fallback: never return None values
-            f.ai_confirmed = True           # treat as real secret
-            f.ai_type = f.pattern_name
-            f.ai_severity = f.severity
-            f.ai_reason = f"[AI ERROR] {e}"
-            refined.append(f)
-
-    # Only drop AI-rejected findings (False)
-    return [x for x in refined if x.ai_confirmed is True]
+            for f in batch:
+                _apply_ai_error(f, e)
+    return batch
+
+
+async def _refine_file(
+    file_findings: List[Finding],
+    lines: List[str],
+    client: Optional[AsyncAIClient],
+    client_error: Optional[Exception],
+    semaphore: asyncio.Semaphore,
+    cache: Optional[AIVerdictCache],
+    model: str,
+) -> List[Finding]:
+    """
+    Refine the findings of one file that no earlier stage has settled,
+    answering from `cache` where possible.
+    """
+    todo = [f for f in file_findings if f.ai_confirmed is None]
+    keys: Optional[Dict[int, str]] = None
+    if cache is not None:
+        undecided, todo = todo, []
+        keys = {}
+        for f in undecided:
+            key = verdict_cache_key(f, lines, model)
+            verdict = cache.get(key)
+            if verdict is not None:
+                _apply_analysis(f, verdict)
+            else:
+                keys[id(f)] = key
+                todo.append(f)
+
+    await asyncio.gather(
+        *(
+            _refine_batch(batch, context, client, client_error, semaphore, cache, keys)
+            for batch, context in batch_findings(todo, lines)
+        )
+    )
+    return file_findings
+
+
+def iter_ai_refine_findings(
+    findings: Iterable[Finding],
+    concurrency: int = DEFAULT_AI_CONCURRENCY,
+    rate_limit: float = DEFAULT_AI_RATE_LIMIT,
+    timeout: float = DEFAULT_AI_TIMEOUT,
+    max_retries: int = DEFAULT_AI_MAX_RETRIES,
+    model: str = DEFAULT_AI_MODEL,
+    cache: Optional[AIVerdictCache] = None,
+) -> Iterator[Finding]:
+    """
+    Refine findings as they stream in, yielding only those the AI does not
+    reject, in their original order.
+
+    Consecutive findings of the same file are reviewed together: the file
+    is read once, their context windows are merged, and one prompt per
+    batch asks for a verdict per finding. Up to `concurrency` requests are
+    in flight at once, started at no more than `rate_limit` per second. A
+    bounded window of files is read ahead of the one being yielded, so
+    memory stays flat on large scans. Any error while refining a batch
+    keeps its findings, marked with the error.
+
+    With a `cache`, findings whose verdict is cached are answered without
+    a request, and new verdicts are stored for later runs. Findings already
+    confirmed by local triage pass through without a request.
+    """
+    concurrency = max(1, concurrency)
+    loop = asyncio.new_event_loop()
+    client: Optional[AsyncAIClient] = None
+    client_error: Optional[Exception] = None
+    try:
+        client = AsyncAIClient(model, rate_limit, concurrency, timeout, max_retries)
+    except Exception as e:
+        client_error = e
+
+    semaphore = asyncio.Semaphore(concurrency)
+    window = concurrency * 2
+    pending: Deque[asyncio.Task] = deque()
+
+    def confirmed(batch: List[Finding]) -> Iterator[Finding]:
+        # Only drop AI-rejected findings (False)
+        return (f for f in batch if f.ai_confirmed is True)
+
+    try:
+        for _, group in groupby(findings, key=lambda f: f.file_path):
+            group = list(group)
+            lines = read_finding_lines([f for f in group if f.ai_confirmed is None])
+            pending.append(
+                loop.create_task(
+                    _refine_file(group, lines, client, client_error, semaphore, cache, model)
+                )
+            )
+            if len(pending) < window:
+                continue
+            # Running the loop until the oldest file finishes also
+            # advances every other request in flight.
+            yield from confirmed(loop.run_until_complete(pending.popleft()))
+
+        while pending:
+            yield from confirmed(loop.run_until_complete(pending.popleft()))
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        if client is not None:
+            loop.run_until_complete(client.close())
+        loop.close()
+
+
+def ai_refine_findings(findings: List[Finding], **kwargs) -> List[Finding]:
+    return list(iter_ai_refine_findings(findings, **kwargs))
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import re
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from .models import Finding
+
+DEFAULT_BASELINE_FILENAME = ".seculint-baseline.json"
+BASELINE_VERSION = 1
+
+# History findings are reported as "<commit>:<path>".
+_COMMIT_PREFIX = re.compile(r"^[0-9a-f]{40}:")
+
+baseline_stats = {"suppressed": 0}
+
+
+def normalize_path(file_path: str, root: Path) -> str:
+    """
+    `file_path` relative to the scan root with forward slashes, and without
+    the commit prefix of history findings, so the same file matches across
+    checkouts, platforms and commits.
+    """
+    stripped = _COMMIT_PREFIX.sub("", file_path)
+    if stripped != file_path:
+        # Already relative to the repository root.
+        return stripped
+    try:
+        file_path = os.path.relpath(file_path, root)
+    except ValueError:  # different drive on Windows
+        pass
+    return file_path.replace("\\", "/")
+
+
+def finding_fingerprint(f: Finding, root: Path) -> str:
+    """
+    Stable identity of a finding: its pattern, normalized path and a hash of
+    the matched value. Line numbers are left out, so a finding keeps its
+    fingerprint when code above it moves.
+    """
+    value = " ".join(f.matched_text().split())
+    value_hash = hashlib.blake2b(value.encode("utf-8"), digest_size=16).hexdigest()
+    key = f"{f.pattern_name}\0{normalize_path(f.file_path, root)}\0{value_hash}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def load_baseline(path: Path) -> Optional[Set[str]]:
+    """Load the fingerprints of a baseline file, or None if it is unusable."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return {entry["fingerprint"] for entry in data["findings"]}
+    except (OSError, json.JSONDecodeError, KeyError, TypeError) as e:
+        print(f"[ERROR] Could not load baseline {path}: {e}", file=sys.stderr)
+        return None
+
+
+def suppress_baseline(
+    findings: Iterable[Finding], fingerprints: Set[str], root: Path
+) -> Iterator[Finding]:
+    """Drop findings whose fingerprint is in the baseline."""
+    for f in findings:
+        if finding_fingerprint(f, root) in fingerprints:
+            baseline_stats["suppressed"] += 1
+            continue
+        yield f
+
+
+class BaselineWriter:
+    """
+    Records findings as they stream past and writes them as a baseline
+    file on `close`. Entries are sorted by path, line and pattern so
+    regenerated baselines diff cleanly.
+    """
+
+    def __init__(self, path: Path, root: Path):
+        self.path = path
+        self.root = root
+        self._entries: Dict[str, Dict] = {}
+
+    def record(self, findings: Iterable[Finding]) -> Iterator[Finding]:
+        for f in findings:
+            fingerprint = finding_fingerprint(f, self.root)
+            self._entries.setdefault(
+                fingerprint,
+                {
+                    "fingerprint": fingerprint,
+                    "file": normalize_path(f.file_path, self.root),
+                    "line": f.line_no,
+                    "pattern": f.pattern_name,
+                },
+            )
+            yield f
+
+    def close(self) -> bool:
+        entries: List[Dict] = sorted(
+            self._entries.values(), key=lambda e: (e["file"], e["line"], e["pattern"])
+        )
+        data = {
+            "version": BASELINE_VERSION,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "findings": entries,
+        }
+        try:
+            self.path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+        except OSError as e:
+            print(f"[ERROR] Could not write baseline {self.path}: {e}", file=sys.stderr)
+            return False
+        print(f"[INFO] Baseline with {len(entries)} findings saved to {self.path}")
+        return True
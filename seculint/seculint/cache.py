@@ -0,0 +1,380 @@
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import __version__
+from .limits import DEFAULT_SCAN_LIMITS, ScanLimits
+from .models import Finding, intern_text
+
+DEFAULT_CACHE_DIRNAME = ".seculint_cache"
+DEFAULT_MAX_ENTRIES = 200_000
+DEFAULT_AI_CACHE_TTL_DAYS = 30
+DEFAULT_AI_CACHE_MAX_ENTRIES = 100_000
+
+# Bump when the stored layout or the meaning of cached results changes.
+CACHE_SCHEMA_VERSION = 4
+
+# Writes are grouped into transactions of this many statements.
+_COMMIT_EVERY = 256
+_HASH_BLOCK = 1024 * 1024
+
+
+def hash_file(path: Path) -> Optional[str]:
+    """BLAKE2b digest of a file's contents, read in blocks."""
+    h = hashlib.blake2b(digest_size=20)
+    try:
+        with path.open("rb") as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+                h.update(block)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+class _SQLiteStore:
+    """
+    Lazily opened SQLite database in `cache_dir`, shared by runs and worker
+    processes. WAL mode provides safe concurrent access; writes are grouped
+    into transactions. Any database error disables or skips the cache with
+    a warning instead of failing the scan.
+    """
+
+    DB_NAME = ""
+    SCHEMA = ""
+
+    def __init__(self, cache_dir: Path, max_entries: int):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pending = 0
+
+    def __getstate__(self):
+        # Connections cannot cross process boundaries; workers open their own.
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        state["_pending"] = 0
+        return state
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None:
+            return self._conn
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            gitignore = self.cache_dir / ".gitignore"
+            if not gitignore.exists():
+                gitignore.write_text("*\n", encoding="utf-8")
+
+            conn = sqlite3.connect(
+                str(self.cache_dir / self.DB_NAME), timeout=30, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+        except (OSError, sqlite3.Error) as e:
+            print(f"[WARN] Cache disabled, could not open {self.cache_dir / self.DB_NAME}: {e}", file=sys.stderr)
+            self.max_entries = 0
+            return None
+
+        self._conn = conn
+        return conn
+
+    def _write(self, sql: str, params: Tuple) -> None:
+        conn = self._conn
+        if conn is None:
+            return
+        try:
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            conn.execute(sql, params)
+            self._pending += 1
+            if self._pending >= _COMMIT_EVERY:
+                self.flush()
+        except sqlite3.Error as e:
+            print(f"[WARN] Cache write failed: {e}", file=sys.stderr)
+
+    def flush(self) -> None:
+        if self._conn is None or not self._conn.in_transaction:
+            return
+        try:
+            self._conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            print(f"[WARN] Cache commit failed: {e}", file=sys.stderr)
+        self._pending = 0
+
+    def _trim(self, conn: sqlite3.Connection, table: str) -> None:
+        """Keep the `max_entries` most recently used rows of `table`."""
+        conn.execute(
+            f"DELETE FROM {table} WHERE rowid IN ("
+            f"SELECT rowid FROM {table} ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def close(self) -> None:
+        if self._conn is None:
+            return
+        self.flush()
+        self._conn.close()
+        self._conn = None
+
+
+class ScanCache(_SQLiteStore):
+    """
+    On-disk cache of scan results, shared by runs and worker processes.
+
+    Results are stored per content hash, and each path remembers the
+    (size, mtime_ns, inode) it had when its hash was taken, so an unchanged
+    file is answered from its stat data alone. A file whose stat changed but
+    whose contents did not (fresh checkouts, touched files) costs one hash.
+    Every entry is keyed by the pattern-set fingerprint and the scan limits
+    that shape results (line window and file size budget), so changing
+    rules, config or limits never returns stale results. Time budgets are
+    left out: a scan cut short by one is never stored.
+
+    Entries beyond `max_entries` are evicted least-recently-used first.
+    """
+
+    DB_NAME = "scan.sqlite3"
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            inode INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            last_used INTEGER NOT NULL,
+            PRIMARY KEY (path, fingerprint)
+        );
+        CREATE TABLE IF NOT EXISTS results (
+            content_hash TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            findings TEXT NOT NULL,
+            last_used INTEGER NOT NULL,
+            PRIMARY KEY (content_hash, fingerprint)
+        );
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        fingerprint: str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        limits: Optional[ScanLimits] = None,
+    ):
+        super().__init__(cache_dir, max_entries)
+        limits = limits or DEFAULT_SCAN_LIMITS
+        self.fingerprint = hashlib.sha256(
+            f"{CACHE_SCHEMA_VERSION}:{__version__}:{fingerprint}:"
+            f"{limits.max_line_length}:{limits.max_file_bytes}".encode("utf-8")
+        ).hexdigest()[:32]
+
+    def _results(self, content_hash: str) -> Optional[List]:
+        row = self._conn.execute(
+            "SELECT findings FROM results WHERE content_hash = ? AND fingerprint = ?",
+            (content_hash, self.fingerprint),
+        ).fetchone()
+        if row is None:
+            return None
+        self._write(
+            "UPDATE results SET last_used = ? WHERE content_hash = ? AND fingerprint = ?",
+            (int(time.time()), content_hash, self.fingerprint),
+        )
+        return json.loads(row[0])
+
+    def lookup(
+        self, path: Path, st: os.stat_result, skip: Optional[Callable[[], bool]] = None
+    ) -> Tuple[Optional[List], Optional[str]]:
+        """
+        Return (cached records, content hash) for `path`. Records are None on
+        a miss; the hash is returned whenever it had to be computed so the
+        caller can `store` results under it without hashing again. When the
+        file would have to be hashed, `skip` is asked first, and a True
+        answer returns a miss without reading the file.
+        """
+        conn = self._connect()
+        if conn is None:
+            return None, None
+
+        key = str(path)
+        try:
+            row = conn.execute(
+                "SELECT size, mtime_ns, inode, content_hash FROM files "
+                "WHERE path = ? AND fingerprint = ?",
+                (key, self.fingerprint),
+            ).fetchone()
+            if row is not None and tuple(row[:3]) == (st.st_size, st.st_mtime_ns, st.st_ino):
+                records = self._results(row[3])
+                if records is not None:
+                    return records, row[3]
+
+            if skip is not None and skip():
+                return None, None
+            content_hash = hash_file(path)
+            if content_hash is None:
+                return None, None
+            records = self._results(content_hash)
+            if records is not None:
+                self._remember_path(key, st, content_hash)
+            return records, content_hash
+        except sqlite3.Error as e:
+            print(f"[WARN] Scan cache read failed: {e}", file=sys.stderr)
+            return None, None
+
+    def _remember_path(self, key: str, st: os.stat_result, content_hash: str) -> None:
+        self._write(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                self.fingerprint,
+                st.st_size,
+                st.st_mtime_ns,
+                st.st_ino,
+                content_hash,
+                int(time.time()),
+            ),
+        )
+
+    def store(
+        self, path: Path, st: os.stat_result, content_hash: str, findings: List[Finding]
+    ) -> None:
+        if self._connect() is None:
+            return
+        records = [
+            [
+                f.line_no,
+                f.pattern_name,
+                f.severity,
+                f.description,
+                f.line_preview,
+                f.match_start,
+                f.match_end,
+            ]
+            for f in findings
+        ]
+        self._write(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+            (content_hash, self.fingerprint, json.dumps(records), int(time.time())),
+        )
+        self._remember_path(str(path), st, content_hash)
+
+    def evict(self) -> None:
+        """Trim both tables to `max_entries`, dropping the least recently used."""
+        conn = self._connect()
+        if conn is None:
+            return
+        self.flush()
+        try:
+            self._trim(conn, "files")
+            self._trim(conn, "results")
+        except sqlite3.Error as e:
+            print(f"[WARN] Scan cache eviction failed: {e}", file=sys.stderr)
+
+
+class AIVerdictCache(_SQLiteStore):
+    """
+    On-disk cache of AI verdicts. Keys are hashes of everything a verdict
+    depends on (pattern, snippet, surrounding code, model, prompt version),
+    so repeated runs only ask the model about findings it has not judged.
+    Entries expire `ttl_seconds` after they were stored; beyond
+    `max_entries` the least recently used are evicted.
+    """
+
+    DB_NAME = "ai_verdicts.sqlite3"
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS verdicts (
+            key TEXT PRIMARY KEY,
+            verdict TEXT NOT NULL,
+            created INTEGER NOT NULL,
+            last_used INTEGER NOT NULL
+        );
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        ttl_seconds: int = DEFAULT_AI_CACHE_TTL_DAYS * 86400,
+        max_entries: int = DEFAULT_AI_CACHE_MAX_ENTRIES,
+    ):
+        super().__init__(cache_dir, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        conn = self._connect()
+        if conn is None:
+            self.misses += 1
+            return None
+        now = int(time.time())
+        try:
+            row = conn.execute(
+                "SELECT verdict FROM verdicts WHERE key = ? AND created > ?",
+                (key, now - self.ttl_seconds),
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"[WARN] AI verdict cache read failed: {e}", file=sys.stderr)
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._write("UPDATE verdicts SET last_used = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def put(self, key: str, verdict: Dict) -> None:
+        if self._connect() is None:
+            return
+        now = int(time.time())
+        self._write(
+            "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?)",
+            (key, json.dumps(verdict), now, now),
+        )
+
+    def evict(self) -> None:
+        """Drop expired verdicts, then trim to `max_entries`."""
+        conn = self._connect()
+        if conn is None:
+            return
+        self.flush()
+        try:
+            conn.execute(
+                "DELETE FROM verdicts WHERE created <= ?",
+                (int(time.time()) - self.ttl_seconds,),
+            )
+            self._trim(conn, "verdicts")
+        except sqlite3.Error as e:
+            print(f"[WARN] AI verdict cache eviction failed: {e}", file=sys.stderr)
+
+
+def findings_from_records(path: Path, records: List) -> List[Finding]:
+    file_path = str(path)
+    return [
+        Finding(
+            file_path=file_path,
+            line_no=line_no,
+            pattern_name=intern_text(pattern_name),
+            severity=intern_text(severity),
+            description=intern_text(description),
+            line_preview=line_preview,
+            match_start=match_start,
+            match_end=match_end,
+        )
+        for (
+            line_no,
+            pattern_name,
+            severity,
+            description,
+            line_preview,
+            match_start,
+            match_end,
+        ) in records
+    ]
@@ -2,23 +2,64 @@ import argparse
 import os
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 
 from . import __version__
-from .git_utils import get_changed_files
-from .ai_integration import ai_refine_findings, openai  # type: ignore
-from .ignore import load_ignore_patterns
+from .git_utils import is_valid_ref
+from .ai_integration import (  # type: ignore
+    DEFAULT_AI_CONCURRENCY,
+    DEFAULT_AI_RATE_LIMIT,
+    DEFAULT_AI_TIMEOUT,
+    iter_ai_refine_findings,
+    openai,
+)
+from .ignore import IgnoreMatcher, load_ignore_patterns
 from .models import Finding
 from .patterns import build_active_patterns, load_pattern_config
-from .reporting import print_findings_console, save_findings_html, save_findings_json
-from .scanner import walk_and_scan, should_scan_file
+from .reporting import (
+    ConsoleReporter,
+    HtmlReporter,
+    JsonlReporter,
+    JsonReporter,
+    report_findings,
+)
+from .baseline import (
+    DEFAULT_BASELINE_FILENAME,
+    BaselineWriter,
+    baseline_stats,
+    load_baseline,
+    suppress_baseline,
+)
+from .cache import (
+    DEFAULT_AI_CACHE_TTL_DAYS,
+    DEFAULT_CACHE_DIRNAME,
+    DEFAULT_MAX_ENTRIES,
+    AIVerdictCache,
+    ScanCache,
+)
+from .triage import (
+    DEFAULT_TRIAGE_HIGH,
+    DEFAULT_TRIAGE_LOW,
+    iter_triage_findings,
+    triage_stats,
+)
+from .limits import (
+    DEFAULT_FILE_TIME_BUDGET,
+    DEFAULT_LINE_TIME_BUDGET,
+    DEFAULT_MAX_LINE_LENGTH,
+    LINE_WINDOW_OVERLAP,
+    ScanLimits,
+)
+from .profiling import enable_profiling, print_profile, save_profile_json
+from .scanner import (
+    collapse_duplicates,
+    iter_scan_changes,
+    iter_scan_history,
+    iter_walk_and_scan,
+    scan_stats,
+)
 
 
-
-
-from .scanner import walk_and_scan, should_scan_file, scan_file
-from .ignore import load_ignore_patterns
-
 def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         prog="seculint",
@@ -32,6 +73,7 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
             "  seculint --path ./src --include-ext .py .env\n"
             "  seculint --path . --enable-ai --html-report results.html\n"
             "  seculint --path . --changed-only\n"
+            "  seculint --path . --since origin/main\n"
         ),
         formatter_class=argparse.RawTextHelpFormatter,
     )
@@ -50,11 +92,53 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         type=int,
         default=5,
         help=(
-            "Maximum file size (in MB) to scan.\n"
-            "Files larger than this limit will be skipped. Default: 5 MB."
+            "File size (in MB) above which files are scanned in streaming mode.\n"
+            "Larger files are memory-mapped and scanned in chunks instead of\n"
+            "being read whole, so memory use stays flat. Default: 5 MB."
+        ),
+    )
+
+    parser.add_argument(
+        "--max-line-length",
+        type=int,
+        default=DEFAULT_MAX_LINE_LENGTH,
+        help=(
+            "Lines longer than this many characters (minified bundles,\n"
+            "lockfiles, base64 blobs) are matched in overlapping windows of\n"
+            f"this size. Default: {DEFAULT_MAX_LINE_LENGTH}."
+        ),
+    )
+
+    parser.add_argument(
+        "--line-time-budget",
+        type=float,
+        default=DEFAULT_LINE_TIME_BUDGET,
+        metavar="SECONDS",
+        help=(
+            "Give up matching a pattern against one long line after this\n"
+            f"many seconds (0 = no limit). Default: {DEFAULT_LINE_TIME_BUDGET:g}."
         ),
     )
 
+    parser.add_argument(
+        "--file-time-budget",
+        type=float,
+        default=DEFAULT_FILE_TIME_BUDGET,
+        metavar="SECONDS",
+        help=(
+            "Stop scanning a file after this many seconds (0 = no limit).\n"
+            f"Default: {DEFAULT_FILE_TIME_BUDGET:g}."
+        ),
+    )
+
+    parser.add_argument(
+        "--file-size-budget-mb",
+        type=float,
+        default=0,
+        metavar="MB",
+        help="Scan at most this many MB of each file (0 = no limit). Default: 0.",
+    )
+
     parser.add_argument(
         "--include-ext",
         nargs="*",
@@ -84,6 +168,16 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         ),
     )
 
+    parser.add_argument(
+        "--jsonl-report",
+        default=None,
+        help=(
+            "Path to stream findings as JSON Lines (one compact record per\n"
+            "finding, written as found, followed by a summary record).\n"
+            "Example: --jsonl-report reports/findings.jsonl"
+        ),
+    )
+
     parser.add_argument(
         "--html-report",
         default=None,
@@ -117,15 +211,104 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         ),
     )
 
+    parser.add_argument(
+        "--ai-concurrency",
+        type=int,
+        default=DEFAULT_AI_CONCURRENCY,
+        help=(
+            "Maximum number of AI requests in flight at once.\n"
+            f"Default: {DEFAULT_AI_CONCURRENCY}."
+        ),
+    )
+
+    parser.add_argument(
+        "--ai-rate-limit",
+        type=float,
+        default=DEFAULT_AI_RATE_LIMIT,
+        help=(
+            "Maximum number of AI requests started per second. Requests that\n"
+            "are rate limited (429) or fail with 5xx are retried with backoff.\n"
+            f"Default: {DEFAULT_AI_RATE_LIMIT}."
+        ),
+    )
+
+    parser.add_argument(
+        "--ai-timeout",
+        type=float,
+        default=DEFAULT_AI_TIMEOUT,
+        help=f"Timeout in seconds for each AI request. Default: {DEFAULT_AI_TIMEOUT:g}.",
+    )
+
+    parser.add_argument(
+        "--ai-cache-ttl-days",
+        type=float,
+        default=DEFAULT_AI_CACHE_TTL_DAYS,
+        help=(
+            "With --cache, how long AI verdicts are reused before findings are\n"
+            f"sent to the model again. Default: {DEFAULT_AI_CACHE_TTL_DAYS}."
+        ),
+    )
+
+    parser.add_argument(
+        "--triage",
+        action="store_true",
+        help=(
+            "Score findings offline and drop the clear non-secrets (env lookups,\n"
+            "placeholders, known dummies, example domains) without --enable-ai.\n"
+            "With --enable-ai, triage always runs unless --no-triage is given."
+        ),
+    )
+
+    parser.add_argument(
+        "--no-triage",
+        action="store_true",
+        help="With --enable-ai, send every finding to the model.",
+    )
+
+    parser.add_argument(
+        "--triage-band",
+        nargs=2,
+        type=float,
+        default=[DEFAULT_TRIAGE_LOW, DEFAULT_TRIAGE_HIGH],
+        metavar=("LOW", "HIGH"),
+        help=(
+            "Triage scores range from 0 to 1: findings scoring at or below LOW\n"
+            "are dismissed, at or above HIGH confirmed, and only those in\n"
+            f"between go to the AI. Default: {DEFAULT_TRIAGE_LOW} {DEFAULT_TRIAGE_HIGH}."
+        ),
+    )
+
     parser.add_argument(
         "--changed-only",
         action="store_true",
         help=(
-            "Scan only changed (staged/unstaged) files in the current Git repository.\n"
+            "Scan only the lines added by staged and unstaged changes in the\n"
+            "current Git repository, plus untracked files.\n"
             "Useful for pre-commit or CI/CD hooks."
         ),
     )
 
+    parser.add_argument(
+        "--since",
+        default=None,
+        metavar="REF",
+        help=(
+            "With --changed-only, scan the lines added since REF (a commit,\n"
+            "branch or tag) instead of since HEAD. Implies --changed-only.\n"
+            "Example: --since origin/main"
+        ),
+    )
+
+    parser.add_argument(
+        "--history",
+        action="store_true",
+        help=(
+            "Scan every version of every file in the Git history (all refs),\n"
+            "including secrets that were committed and later removed.\n"
+            "Findings are reported as <commit>:<path>."
+        ),
+    )
+
     parser.add_argument(
         "--debug-ignore",
         action="store_true",
@@ -135,6 +318,99 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         ),
     )
 
+    parser.add_argument(
+        "--collapse-duplicates",
+        action="store_true",
+        help=(
+            "Report the findings of files with identical contents once,\n"
+            "listing every copy."
+        ),
+    )
+
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help=(
+            "Print scan statistics after the run, such as the number of\n"
+            "stat() calls made per scanned file."
+        ),
+    )
+
+    parser.add_argument(
+        "--profile-patterns",
+        action="store_true",
+        help=(
+            "Profile the scan: print per-pattern evaluations, matches,\n"
+            "cumulative time and slowest line (with its file and length),\n"
+            "and the time spent walking, matching ignore rules, stat'ing,\n"
+            "reading, decoding, matching and reporting."
+        ),
+    )
+
+    parser.add_argument(
+        "--profile-json",
+        metavar="FILE",
+        help="Write the --profile-patterns profile to FILE as JSON (implies --profile-patterns).",
+    )
+
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help=(
+            "Number of worker processes used to scan files in parallel.\n"
+            "Use 0 to start one worker per CPU. Small trees are always\n"
+            "scanned serially. Default: 1."
+        ),
+    )
+
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help=(
+            "Reuse results for files unchanged since the previous run, and\n"
+            "with --enable-ai, AI verdicts for findings already reviewed.\n"
+            "Results are stored in .seculint_cache/ under the scanned path and\n"
+            "are invalidated automatically when patterns or config change."
+        ),
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Directory for the scan and AI verdict caches (implies --cache).",
+    )
+
+    parser.add_argument(
+        "--cache-max-entries",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help=(
+            "Maximum number of cached files and results kept; the least\n"
+            f"recently used are evicted first. Default: {DEFAULT_MAX_ENTRIES}."
+        ),
+    )
+
+    parser.add_argument(
+        "--baseline",
+        default=None,
+        metavar="FILE",
+        help=(
+            "Suppress findings recorded in this baseline file. Findings match\n"
+            "by pattern, path and matched value, so moved lines stay suppressed."
+        ),
+    )
+
+    parser.add_argument(
+        "--write-baseline",
+        action="store_true",
+        help=(
+            "Accept every current finding: write them to the --baseline file\n"
+            f"(default: {DEFAULT_BASELINE_FILENAME} in the scanned path) and exit 0.\n"
+            "AI refinement and triage are skipped."
+        ),
+    )
+
     parser.add_argument(
         "--version",
         action="version",
@@ -157,6 +433,19 @@ def main(argv: Optional[List[str]] = None) -> int:
 
     # AI pre-flight validation
     if args.enable_ai:
+        if (
+            args.ai_concurrency < 1
+            or args.ai_rate_limit <= 0
+            or args.ai_timeout <= 0
+            or args.ai_cache_ttl_days <= 0
+        ):
+            print(
+                "[ERROR] --ai-concurrency, --ai-rate-limit, --ai-timeout and "
+                "--ai-cache-ttl-days must be positive.",
+                file=sys.stderr,
+            )
+            return 2
+
         if openai is None:
             print(
                 "[ERROR] --enable-ai was used, but the OpenAI library is not installed.",
@@ -186,6 +475,11 @@ def main(argv: Optional[List[str]] = None) -> int:
 
     active_patterns = build_active_patterns(pattern_config)
 
+    profile = None
+    if args.profile_patterns or args.profile_json:
+        profile = enable_profiling()
+        active_patterns = active_patterns.profiled()
+
     include_ext = (
         [e.lower() if e.startswith(".") else f".{e.lower()}" for e in args.include_ext]
         if args.include_ext
@@ -197,15 +491,80 @@ def main(argv: Optional[List[str]] = None) -> int:
         else None
     )
 
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    if args.max_line_length < 2 * LINE_WINDOW_OVERLAP:
+        print(
+            f"[ERROR] --max-line-length must be at least {2 * LINE_WINDOW_OVERLAP}.",
+            file=sys.stderr,
+        )
+        return 2
+    limits = ScanLimits(
+        max_line_length=args.max_line_length,
+        line_seconds=args.line_time_budget,
+        file_seconds=args.file_time_budget,
+        max_file_bytes=int(args.file_size_budget_mb * 1024 * 1024),
+    )
+
+    cache: Optional[ScanCache] = None
+    ai_cache: Optional[AIVerdictCache] = None
+    if args.cache or args.cache_dir:
+        if args.cache_dir:
+            cache_dir = Path(args.cache_dir)
+        else:
+            cache_dir = (root if root.is_dir() else root.parent) / DEFAULT_CACHE_DIRNAME
+        cache = ScanCache(cache_dir, active_patterns.fingerprint(), args.cache_max_entries, limits)
+        if args.enable_ai:
+            ai_cache = AIVerdictCache(cache_dir, int(args.ai_cache_ttl_days * 86400))
+
     ignore_patterns = load_ignore_patterns(root)
-    print(f"Ignore patterns are: {ignore_patterns}")
+    ignore_matcher = IgnoreMatcher(ignore_patterns)
     # =========================
     # Scan
     # =========================
-    findings: List[Finding] = []
+    findings: Iterable[Finding] = []
     max_size_bytes = args.max_size_mb * 1024 * 1024
-    print(ignore_patterns)
-    if args.changed_only:
+    low, high = args.triage_band
+    if not 0.0 <= low <= high <= 1.0:
+        print("[ERROR] --triage-band needs 0 <= LOW <= HIGH <= 1.", file=sys.stderr)
+        return 2
+
+    scan_root = root if root.is_dir() else root.parent
+    baseline_writer: Optional[BaselineWriter] = None
+    baseline: Optional[set] = None
+    if args.write_baseline:
+        baseline_path = (
+            Path(args.baseline) if args.baseline else scan_root / DEFAULT_BASELINE_FILENAME
+        )
+        baseline_writer = BaselineWriter(baseline_path, scan_root)
+    elif args.baseline:
+        baseline = load_baseline(Path(args.baseline))
+        if baseline is None:
+            return 2
+
+    if args.history and (args.changed_only or args.since):
+        print("[ERROR] --history cannot be combined with --changed-only or --since.", file=sys.stderr)
+        return 2
+
+    if args.history:
+        if not (root / ".git").exists():
+            print(
+                "[ERROR] --history was used, but this folder is not a Git repository.",
+                file=sys.stderr,
+            )
+            return 2
+
+        print("[INFO] Scanning every blob in the git history...")
+        findings = iter_scan_history(
+            root=root,
+            active_patterns=active_patterns,
+            include_ext=include_ext,
+            exclude_ext=exclude_ext,
+            ignore_patterns=ignore_matcher,
+            debug_ignore=args.debug_ignore,
+            limits=limits,
+        )
+    elif args.changed_only or args.since:
         # Require git repo for changed-only mode
         if not (root / ".git").exists():
             print(
@@ -215,58 +574,139 @@ def main(argv: Optional[List[str]] = None) -> int:
             print("        Run without --changed-only or initialize git (git init).")
             return 2
 
-        print("[INFO] Scanning only changed (staged/unstaged) files in git...")
-        changed_files = get_changed_files(root)
+        if args.since and not is_valid_ref(root, args.since):
+            print(f"[ERROR] --since: unknown git revision: {args.since}", file=sys.stderr)
+            return 2
 
-        if not changed_files:
-            print("[INFO] No modified or staged files detected — nothing to scan.")
-        else:
-            for file in changed_files:
-                if should_scan_file(
-                    file,
-                    max_size_bytes,
-                    include_ext,
-                    exclude_ext,
-                    ignore_patterns,
-                ):
-                    findings.extend(scan_file(file, active_patterns))  # type: ignore[name-defined]
+        print(
+            f"[INFO] Scanning only lines added since {args.since or 'HEAD'} "
+            "(staged/unstaged) and untracked files in git..."
+        )
+        findings = iter_scan_changes(
+            root=root,
+            active_patterns=active_patterns,
+            include_ext=include_ext,
+            exclude_ext=exclude_ext,
+            ignore_patterns=ignore_matcher,
+            since=args.since,
+            debug_ignore=args.debug_ignore,
+            stream_threshold_bytes=max_size_bytes,
+            jobs=jobs,
+            cache=cache,
+            limits=limits,
+        )
     else:
-        findings = walk_and_scan(
+        findings = iter_walk_and_scan(
             root=root,
             max_size_mb=args.max_size_mb,
             include_ext=include_ext,
             exclude_ext=exclude_ext,
-            ignore_patterns=ignore_patterns,
+            ignore_patterns=ignore_matcher,
             active_patterns=active_patterns,
-            debug_ignore=args.debug_ignore,  
+            debug_ignore=args.debug_ignore,
+            jobs=jobs,
+            cache=cache,
+            limits=limits,
         )
 
     # =========================
     # Optional AI refinement
     # =========================
+    # Every stage below is a generator: findings flow from the walker
+    # through AI refinement to the reporters one at a time.
+
+    # Baselined findings are dropped as they leave the scanner, so they
+    # cost nothing downstream.
+    if baseline_writer is not None:
+        findings = baseline_writer.record(findings)
+    elif baseline:
+        findings = suppress_baseline(findings, baseline, scan_root)
+
+    if args.collapse_duplicates:
+        # Before AI refinement, so each duplicate is only sent once.
+        findings = collapse_duplicates(findings)
+
+    use_ai = bool(args.enable_ai) and baseline_writer is None
+    use_triage = (args.triage or (use_ai and not args.no_triage)) and baseline_writer is None
+    if use_triage:
+        # Settle the clear cases offline so only uncertain findings cost a request.
+        findings = iter_triage_findings(findings, active_patterns, low=low, high=high)
+
+    if use_ai:
+        findings = iter_ai_refine_findings(
+            findings,
+            concurrency=args.ai_concurrency,
+            rate_limit=args.ai_rate_limit,
+            timeout=args.ai_timeout,
+            cache=ai_cache,
+        )
 
-    use_ai = bool(args.enable_ai)
-    if use_ai and findings:
-        try:
-            findings = ai_refine_findings(findings)
-            print(f"[INFO] AI refinement complete. {len(findings)} findings confirmed by AI.")
-        except Exception as e:
-            print(f"[ERROR] AI refinement failed: {e}")
-            # fail-safe fallback: do NOT break scanning
     # =========================
     # Output
     # =========================
 
-    print_findings_console(findings, use_ai=use_ai)
+    reporters: List = [ConsoleReporter(use_ai=use_ai)]
 
     if args.json_report:
-        save_findings_json(findings, Path(args.json_report))
+        reporters.append(JsonReporter(Path(args.json_report)))
+
+    if args.jsonl_report:
+        reporters.append(JsonlReporter(Path(args.jsonl_report)))
 
     if args.html_report:
-        save_findings_html(findings, Path(args.html_report))
+        reporters.append(HtmlReporter(Path(args.html_report)))
+
+    count = report_findings(findings, reporters)
+
+    if cache is not None:
+        cache.evict()
+        cache.close()
+    if use_triage:
+        print(
+            f"[INFO] Triage: {triage_stats['confirmed']} confirmed and "
+            f"{triage_stats['dismissed']} dismissed locally, "
+            f"{triage_stats['uncertain']} uncertain"
+        )
+    if ai_cache is not None:
+        print(
+            f"[INFO] AI verdicts reused from cache: {ai_cache.hits}, "
+            f"sent to the model: {ai_cache.misses}"
+        )
+        ai_cache.evict()
+        ai_cache.close()
+
+    if scan_stats["partial"]:
+        print(
+            f"[WARN] {scan_stats['partial']} files were only partially scanned "
+            "because they exceeded a scan budget.",
+            file=sys.stderr,
+        )
+
+    if args.debug:
+        scanned = scan_stats["files_scanned"]
+        stat_calls = scan_stats["stat_calls"]
+        per_file = stat_calls / scanned if scanned else 0.0
+        print(
+            f"[DEBUG] Files scanned: {scanned}, stat calls: {stat_calls} "
+            f"({per_file:.2f} per scanned file), "
+            f"binary by content: {scan_stats['binary_skipped']}, "
+            f"identical to an earlier file: {scan_stats['duplicates']}"
+        )
+
+    if profile is not None:
+        print_profile(profile)
+        if args.profile_json and not save_profile_json(profile, Path(args.profile_json)):
+            return 2
+
+    if use_ai:
+        print(f"[INFO] AI refinement complete. {count} findings confirmed by AI.")
 
-    return 0 if not findings else 1
+    if baseline_writer is not None:
+        return 0 if baseline_writer.close() else 2
+    if baseline:
+        print(f"[INFO] Suppressed {baseline_stats['suppressed']} findings present in the baseline.")
 
+    return 0 if not count else 1
 
 if __name__ == "__main__":
     sys.exit(main())
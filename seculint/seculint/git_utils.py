@@ -1,35 +1,252 @@
+import codecs
+import re
 import subprocess
 import sys
+import threading
 from pathlib import Path
-from typing import List
+from typing import Callable, Iterable, Iterator, List, Optional, Set, Tuple
 
 
-def get_changed_files(repo_root: Path) -> List[Path]:
+# Hash of the empty tree, used as the diff base in a repository with no commits.
+EMPTY_TREE = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+
+_HUNK_HEADER = re.compile(rb"^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def _git(repo_root: Path, *args: str) -> Optional[bytes]:
     try:
-        output = subprocess.check_output(
-            ["git", "status", "--porcelain"],
-            cwd=str(repo_root),
-            stderr=subprocess.DEVNULL,
-            text=True,
+        return subprocess.check_output(
+            ["git", *args], cwd=str(repo_root), stderr=subprocess.DEVNULL
         )
-    except Exception:
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def is_valid_ref(repo_root: Path, ref: str) -> bool:
+    return _git(repo_root, "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}") is not None
+
+
+def _unquote_path(raw: bytes) -> str:
+    """Undo git's C-style quoting of unusual path names."""
+    if raw.startswith(b'"') and raw.endswith(b'"'):
+        raw = codecs.escape_decode(raw[1:-1])[0]
+    return raw.decode("utf-8", errors="surrogateescape")
+
+
+def _diff_line(raw: bytes) -> str:
+    line = raw[1:].decode("utf-8", errors="ignore").rstrip("\n")
+    return line[:-1] if line.endswith("\r") else line
+
+
+def iter_added_hunks(
+    repo_root: Path, since: Optional[str] = None
+) -> Iterator[Tuple[str, int, List[str]]]:
+    """
+    Yield (relative path, first line number, added lines) for every block of
+    lines added in the working tree relative to `since`, or to HEAD (staged
+    and unstaged changes) when no ref is given. Line numbers refer to the
+    working-tree file. `git diff -U0` is read as a stream, so no file is
+    read in full.
+    """
+    base = since
+    if base is None:
+        base = "HEAD" if is_valid_ref(repo_root, "HEAD") else EMPTY_TREE
+
+    cmd = [
+        "git", "-c", "core.quotePath=false", "diff", "-U0", "--no-color",
+        "--no-ext-diff", "--no-textconv", "--ignore-submodules",
+        "--src-prefix=a/", "--dst-prefix=b/", base, "--",
+    ]
+    try:
+        proc = subprocess.Popen(
+            cmd, cwd=str(repo_root), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+    except OSError:
+        print(
+            "[WARN] --changed-only used, but git is unavailable.",
+            file=sys.stderr,
+        )
+        return
+
+    path: Optional[str] = None
+    first_line = 0
+    lines: List[str] = []
+    added_left = removed_left = 0
+
+    with proc:
+        for raw in proc.stdout:
+            # Inside a hunk the header counts say exactly which lines follow,
+            # so added lines that happen to start with "++" are never mistaken
+            # for file headers.
+            if added_left or removed_left:
+                if raw.startswith(b"+") and added_left:
+                    lines.append(_diff_line(raw))
+                    added_left -= 1
+                    if not added_left and path is not None:
+                        yield path, first_line, lines
+                        lines = []
+                elif raw.startswith(b"-") and removed_left:
+                    removed_left -= 1
+                continue
+
+            if raw.startswith(b"+++ "):
+                target = raw[4:].rstrip(b"\r\n")
+                # git ends a name that contains a space with a TAB, after the
+                # closing quote when the name is C-quoted.
+                if target.endswith(b"\t"):
+                    target = target[:-1]
+                if target == b"/dev/null":
+                    path = None
+                else:
+                    path = _unquote_path(target)
+                    if path.startswith("b/"):
+                        path = path[2:]
+            elif raw.startswith(b"@@"):
+                m = _HUNK_HEADER.match(raw)
+                if m is None:
+                    continue
+                removed_left = int(m.group(1)) if m.group(1) is not None else 1
+                first_line = int(m.group(2))
+                added_left = int(m.group(3)) if m.group(3) is not None else 1
+                lines = []
+
+    if proc.returncode:
         print(
-            "[WARN] --changed-only used, but this is not a git repo or git is unavailable.",
+            f"[WARN] git diff against {base} failed; no changes were scanned.",
             file=sys.stderr,
         )
+
+
+def get_untracked_files(repo_root: Path) -> List[str]:
+    """Paths of untracked, non-ignored files, relative to `repo_root`."""
+    output = _git(repo_root, "ls-files", "-z", "--others", "--exclude-standard")
+    if output is None:
         return []
+    return [
+        p.decode("utf-8", errors="surrogateescape")
+        for p in output.split(b"\0")
+        if p
+    ]
+
 
-    files: List[Path] = []
-    for line in output.splitlines():
-        if not line.strip():
-            continue
+def iter_history_blobs(
+    repo_root: Path, wanted: Callable[[str], bool]
+) -> Iterator[Tuple[str, str, bytes]]:
+    """
+    Yield (blob sha, path, contents) for every blob reachable from any ref
+    that `wanted` accepts under at least one of its paths.
 
-        status = line[:2].strip()
-        file_path = line[3:].strip()
+    `git rev-list --objects --all` lists each object once, so every unique
+    blob is yielded exactly once, with the first path it was seen under.
+    That path alone does not decide: a blob first committed under a
+    rejected path may have been copied to an accepted one later, so the
+    blobs held by any accepted path are collected from `git log` first.
+    Other blobs are never read. Contents stream from a single
+    `git cat-file --batch` process, fed from a thread so the two pipes never
+    deadlock.
+    """
+    kept: Set[bytes] = {
+        blob.encode("ascii") for blob, _, path in iter_blob_locations(repo_root) if wanted(path)
+    }
 
-        if status or file_path:
-            p = repo_root / file_path
-            if p.exists():
-                files.append(p)
+    try:
+        rev_list = subprocess.Popen(
+            ["git", "rev-list", "--objects", "--all"],
+            cwd=str(repo_root),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        cat_file = subprocess.Popen(
+            [
+                "git", "cat-file",
+                "--batch=%(objectname) %(objecttype) %(objectsize) %(rest)",
+            ],
+            cwd=str(repo_root),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        print("[WARN] --history used, but git is unavailable.", file=sys.stderr)
+        return
+
+    def feed() -> None:
+        try:
+            for raw in rev_list.stdout:
+                # Commits are listed without a path and are never requested.
+                sha, _, path = raw.rstrip(b"\n").partition(b" ")
+                if path and (
+                    sha in kept or wanted(path.decode("utf-8", errors="surrogateescape"))
+                ):
+                    cat_file.stdin.write(raw)
+        except OSError:  # cat-file went away; the reader stops on its own
+            pass
+        finally:
+            try:
+                cat_file.stdin.close()
+            except OSError:
+                pass
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+
+    out = cat_file.stdout
+    try:
+        for header in iter(out.readline, b""):
+            parts = header.rstrip(b"\n").split(b" ", 3)
+            if len(parts) < 4 or parts[1] == b"missing":
+                continue
+            sha, objtype, size, path = parts
+            data = out.read(int(size))
+            out.read(1)  # newline after the contents
+            if objtype == b"blob":
+                yield (
+                    sha.decode("ascii"),
+                    path.decode("utf-8", errors="surrogateescape"),
+                    data,
+                )
+    finally:
+        for proc in (rev_list, cat_file):
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+        feeder.join()
+
+    if rev_list.returncode:
+        print("[WARN] git rev-list failed; history scan is incomplete.", file=sys.stderr)
+
+
+def iter_blob_locations(
+    repo_root: Path, blobs: Optional[Iterable[str]] = None
+) -> Iterator[Tuple[str, str, str]]:
+    """
+    Yield (blob sha, commit sha, path) for every commit, on any ref, that
+    added or modified a path so that it holds one of `blobs` (any blob when
+    None). Commits are listed newest first.
+    """
+    wanted = set(blobs) if blobs is not None else None
+    cmd = [
+        "git", "-c", "core.quotePath=false", "log", "--all", "--raw",
+        "--no-abbrev", "--no-renames", "--format=commit %H",
+    ]
+    try:
+        proc = subprocess.Popen(
+            cmd, cwd=str(repo_root), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+    except OSError:
+        return
 
-    return files
+    commit = ""
+    with proc:
+        for raw in proc.stdout:
+            if raw.startswith(b"commit "):
+                commit = raw[7:].strip().decode("ascii")
+            elif raw.startswith(b":"):
+                # :<old mode> <new mode> <old sha> <new sha> <status>\t<path>
+                meta, _, path = raw.rstrip(b"\n").partition(b"\t")
+                fields = meta.split()
+                if len(fields) < 5:
+                    continue
+                blob = fields[3].decode("ascii")
+                if wanted is None or blob in wanted:
+                    yield blob, commit, _unquote_path(path)
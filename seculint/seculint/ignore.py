@@ -1,7 +1,9 @@
-import fnmatch
-import os
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple, Union
+
+_GLOB_CHARS = re.compile(r"[*?\[]")
 
 
 def load_ignore_patterns(root: Path) -> List[str]:
@@ -23,32 +25,241 @@ def load_ignore_patterns(root: Path) -> List[str]:
     return patterns
 
 
-def is_ignored(path: str | Path, ignore_patterns: List[str]) -> bool:
+def _parse_rule(pat: str) -> Optional[Tuple[bool, bool, bool, str]]:
     """
-    Check if a given file or directory should be ignored
-    based on loaded .seculintignore patterns.
+    Split a gitignore-style rule into (negate, dir_only, anchored, glob).
+    A rule is anchored to the root when it contains a slash other than a
+    trailing one; otherwise it matches a file or directory name at any depth.
     """
-    if not ignore_patterns:
-        return False
+    pat = pat.strip().replace("\\", "/")
+    if not pat or pat.startswith("#"):
+        return None
+
+    negate = pat.startswith("!")
+    if negate:
+        pat = pat[1:]
+
+    dir_only = pat.endswith("/")
+    pat = pat.rstrip("/")
+    anchored = "/" in pat
+    pat = pat.lstrip("/")
 
-    # Normalize for consistent comparison
-    rel_path = str(path).replace("\\", "/").rstrip("/")
+    # "**/name" is the same as a plain "name" rule.
+    if pat.startswith("**/") and "/" not in pat[3:]:
+        pat = pat[3:]
+        anchored = False
 
-    for pat in ignore_patterns:
-        pat = pat.strip().replace("\\", "/").rstrip("/")
-        if not pat:
+    if not pat:
+        return None
+    return negate, dir_only, anchored, pat
+
+
+def _glob_to_regex(pat: str) -> str:
+    """
+    Translate a gitignore glob into a regex body. `*`, `?` and `[...]` never
+    match `/`; `**/` matches zero or more directories and a trailing `/**`
+    matches everything inside a directory.
+    """
+    out: List[str] = []
+    i, n = 0, len(pat)
+    while i < n:
+        c = pat[i]
+        if c == "*":
+            if pat.startswith("**", i):
+                j = i + 2
+                at_segment_start = i == 0 or pat[i - 1] == "/"
+                if at_segment_start and j < n and pat[j] == "/":
+                    out.append("(?:[^/]*/)*")
+                    i = j + 1
+                    continue
+                if at_segment_start and j == n:
+                    out.append(".+")
+                    i = j
+                    continue
+                i = j
+            else:
+                i += 1
+            out.append("[^/]*")
             continue
+        if c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = pat.find("]", i + 2)
+            if j != -1:
+                body = pat[i + 1 : j]
+                if body[0] in "!^":
+                    body = "^" + body[1:]
+                out.append("(?!/)[" + body.replace("\\", "\\\\") + "]")
+                i = j + 1
+                continue
+            out.append(re.escape(c))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
 
-        # Exact match or wildcard
-        if fnmatch.fnmatch(rel_path, pat):
-            return True
 
-        # If the pattern ends with '/', treat it as a directory ignore rule
-        if pat.endswith("/") and (rel_path == pat[:-1] or rel_path.startswith(pat)):
-            return True
+def _combine(globs: List[Tuple[int, bool, str]]) -> Optional[Pattern]:
+    """
+    Compile rules into one alternation. Later rules come first, so the
+    alternative that matches is always the last matching rule, and its
+    group name carries the rule index.
+    """
+    if not globs:
+        return None
+    parts = [f"(?P<r{idx}>{_glob_to_regex(glob)})" for idx, _, glob in reversed(globs)]
+    return re.compile("|".join(parts), re.DOTALL)
+
+
+def _combine_pair(globs: List[Tuple[int, bool, str]]) -> Tuple[Optional[Pattern], Optional[Pattern]]:
+    """
+    Combined regexes for matching (directories, files): directory-only
+    rules are left out of the one for files.
+    """
+    return _combine(globs), _combine([g for g in globs if not g[1]])
+
 
-        # Handle patterns like "venv" (no slash)
-        if "/" not in pat and (rel_path == pat or rel_path.startswith(f"{pat}/")):
-            return True
+class IgnoreMatcher:
+    """
+    `.seculintignore` rules compiled once for repeated matching.
+
+    Follows gitignore semantics: the last matching rule wins, `!` re-includes,
+    a trailing `/` matches directories only, a leading or inner `/` anchors
+    the rule to the root and `**` spans directories. Nothing inside an
+    ignored directory can be re-included.
+
+    Literal names live in a dict, literal anchored paths in a prefix trie of
+    path components, and glob rules in two combined regexes (one for names,
+    one for anchored paths), so a lookup costs a handful of dict probes and
+    at most two regex calls regardless of the number of rules.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = list(patterns)
+        self._dir_only: List[bool] = []
+        self._negate: List[bool] = []
+        self._names: Dict[str, List[int]] = {}
+        self._trie: Dict = {}
 
-    return False
+        name_globs: List[Tuple[int, bool, str]] = []
+        path_globs: List[Tuple[int, bool, str]] = []
+        for pat in self.patterns:
+            rule = _parse_rule(pat)
+            if rule is None:
+                continue
+            negate, dir_only, anchored, glob = rule
+            idx = len(self._negate)
+            self._negate.append(negate)
+            self._dir_only.append(dir_only)
+
+            if _GLOB_CHARS.search(glob):
+                (path_globs if anchored else name_globs).append((idx, dir_only, glob))
+            elif anchored:
+                node = self._trie
+                for part in glob.split("/"):
+                    node = node.setdefault(part, {})
+                # Components are never empty, so "" is free to hold the rules.
+                node.setdefault("", []).append(idx)
+            else:
+                self._names.setdefault(glob, []).append(idx)
+
+        self._name_regex = _combine_pair(name_globs)
+        self._path_regex = _combine_pair(path_globs)
+
+    def __bool__(self) -> bool:
+        return bool(self._negate)
+
+    def __reduce__(self):
+        return (IgnoreMatcher, (self.patterns,))
+
+    def _last_rule(self, node: Optional[Dict], name: str, path: str, is_dir: bool) -> int:
+        """Index of the last rule matching this exact path, or -1."""
+        best = -1
+        dir_only = self._dir_only
+
+        for idx in self._names.get(name, ()):
+            if idx > best and (is_dir or not dir_only[idx]):
+                best = idx
+        if node is not None:
+            for idx in node.get("", ()):
+                if idx > best and (is_dir or not dir_only[idx]):
+                    best = idx
+
+        kind = 0 if is_dir else 1
+        name_regex = self._name_regex[kind]
+        if name_regex is not None:
+            m = name_regex.fullmatch(name)
+            if m is not None:
+                best = max(best, int(m.lastgroup[1:]))
+        path_regex = self._path_regex[kind]
+        if path_regex is not None:
+            m = path_regex.fullmatch(path)
+            if m is not None:
+                best = max(best, int(m.lastgroup[1:]))
+        return best
+
+    def is_ignored(self, path: Union[str, Path], is_dir: bool = False) -> bool:
+        """
+        Check a path relative to the scan root. The path is ignored when it,
+        or any directory above it, is excluded by the rules.
+        """
+        if not self._negate:
+            return False
+
+        rel_path = str(path).replace("\\", "/").strip("/")
+        parts = rel_path.split("/")
+        last = len(parts) - 1
+        node: Optional[Dict] = self._trie
+        for i, name in enumerate(parts):
+            if node is not None:
+                node = node.get(name)
+            prefix = rel_path if i == last else "/".join(parts[: i + 1])
+            idx = self._last_rule(node, name, prefix, is_dir or i < last)
+            if idx >= 0 and not self._negate[idx]:
+                return True
+        return False
+
+    def match(self, rel_path: str, is_dir: bool = False) -> bool:
+        """
+        Check `rel_path` alone, assuming its parent directories were already
+        checked and kept, as they are during a directory walk.
+        """
+        if not self._negate:
+            return False
+
+        node: Optional[Dict] = self._trie
+        for part in rel_path.split("/"):
+            node = node.get(part)
+            if node is None:
+                break
+        name = rel_path.rsplit("/", 1)[-1]
+        idx = self._last_rule(node, name, rel_path, is_dir)
+        return idx >= 0 and not self._negate[idx]
+
+
+@lru_cache(maxsize=16)
+def _compiled(patterns: Tuple[str, ...]) -> IgnoreMatcher:
+    return IgnoreMatcher(patterns)
+
+
+def compile_ignore_patterns(
+    ignore_patterns: Union[List[str], IgnoreMatcher, None],
+) -> IgnoreMatcher:
+    """Return `ignore_patterns` as a compiled matcher, compiling lists once."""
+    if isinstance(ignore_patterns, IgnoreMatcher):
+        return ignore_patterns
+    return _compiled(tuple(ignore_patterns or ()))
+
+
+def is_ignored(
+    path: str | Path,
+    ignore_patterns: Union[List[str], IgnoreMatcher],
+    is_dir: bool = False,
+) -> bool:
+    """
+    Check if a given file or directory should be ignored
+    based on loaded .seculintignore patterns.
+    """
+    if not ignore_patterns:
+        return False
+    return compile_ignore_patterns(ignore_patterns).is_ignored(path, is_dir)
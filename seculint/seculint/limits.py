@@ -0,0 +1,99 @@
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable, Optional, Tuple
+
+DEFAULT_MAX_LINE_LENGTH = 4096
+DEFAULT_LINE_TIME_BUDGET = 1.0
+# Off by default: a time budget makes results depend on machine load, so
+# it is left to users who prefer bounded scans to complete ones.
+DEFAULT_FILE_TIME_BUDGET = 0.0
+
+# Consecutive windows of a long line overlap by this many characters, so a
+# match shorter than this is found whole even when it straddles a boundary.
+LINE_WINDOW_OVERLAP = 256
+
+
+@dataclass(frozen=True)
+class ScanLimits:
+    """
+    Budgets that keep one file from stalling a scan.
+
+    Lines longer than `max_line_length` are matched in overlapping windows
+    of that many characters, which bounds the cost of each regex call. A
+    pattern that spends more than `line_seconds` on one line gives up on
+    it, and a file stops being scanned after `file_seconds` or past its
+    first `max_file_bytes` (0 disables either). Files hitting a budget are
+    reported as partially scanned.
+    """
+
+    max_line_length: int = DEFAULT_MAX_LINE_LENGTH
+    line_seconds: float = DEFAULT_LINE_TIME_BUDGET
+    file_seconds: float = DEFAULT_FILE_TIME_BUDGET
+    max_file_bytes: int = 0
+
+    def budget(self) -> "ScanBudget":
+        return ScanBudget(self)
+
+
+DEFAULT_SCAN_LIMITS = ScanLimits()
+
+
+def first_span(regex, text, validate: Optional[Callable] = None) -> Optional[Tuple[int, int]]:
+    """Offsets of the first match of `regex` in `text` that passes `validate`."""
+    if validate is None:
+        m = regex.search(text)
+        return m.span() if m is not None else None
+    for m in regex.finditer(text):
+        if validate(m.group()):
+            return m.span()
+    return None
+
+
+class ScanBudget:
+    """The time left for scanning one file, and why it stopped early, if it did."""
+
+    def __init__(self, limits: ScanLimits):
+        self.limits = limits
+        self.deadline = perf_counter() + limits.file_seconds if limits.file_seconds > 0 else None
+        self.partial: Optional[str] = None
+
+    def stop(self, reason: str) -> None:
+        if self.partial is None:
+            self.partial = reason
+
+    def expired(self) -> bool:
+        """True once the file's time budget is spent."""
+        if self.deadline is None or perf_counter() < self.deadline:
+            return False
+        self.stop(f"file time budget of {self.limits.file_seconds:g}s exceeded")
+        return True
+
+    def search(self, regex, line, validate: Optional[Callable] = None) -> Optional[Tuple[int, int]]:
+        """
+        `first_span` within the line budget: lines longer than
+        `max_line_length` are searched window by window, and the search
+        gives up once it has taken `line_seconds` or the file budget is
+        spent. Works on str and bytes lines.
+        """
+        width = self.limits.max_line_length
+        if len(line) <= width:
+            return first_span(regex, line, validate)
+
+        started = perf_counter()
+        step = max(1, width - LINE_WINDOW_OVERLAP)
+        offset = 0
+        while True:
+            span = first_span(regex, line[offset : offset + width], validate)
+            if span is not None:
+                return span[0] + offset, span[1] + offset
+            if offset + width >= len(line):
+                return None
+            offset += step
+            if self.limits.line_seconds > 0 and perf_counter() - started > self.limits.line_seconds:
+                self.stop(
+                    f"a line of {len(line)} characters exceeded the per-line "
+                    f"time budget of {self.limits.line_seconds:g}s"
+                )
+                return None
+            if self.expired():
+                return None
@@ -1,9 +1,53 @@
+import sys
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
+# Longer lines are stored as a window of this many characters around the
+# match, so a finding on a huge minified line does not keep the line alive.
+PREVIEW_MAX_CHARS = 400
+PREVIEW_ELLIPSIS = "…"
 
-@dataclass
+
+def bounded_preview(
+    line: str, start: Optional[int], end: Optional[int], limit: int = PREVIEW_MAX_CHARS
+) -> Tuple[str, Optional[int], Optional[int]]:
+    """
+    Cut `line` to at most `limit` characters centred on the match at
+    [start, end), marking cut ends with an ellipsis. Returns the preview and
+    the match offsets within it; a match longer than the window is cut too.
+    Previews that already fit are returned unchanged.
+    """
+    if len(line) <= limit:
+        return line, start, end
+    width = limit - 2 * len(PREVIEW_ELLIPSIS)
+    if start is None or end is None:
+        return line[:width] + PREVIEW_ELLIPSIS, None, None
+
+    end = min(end, start + width)
+    lo = max(0, start - (width - (end - start)) // 2)
+    hi = min(len(line), lo + width)
+    lo = max(0, hi - width)
+
+    prefix = PREVIEW_ELLIPSIS if lo > 0 else ""
+    suffix = PREVIEW_ELLIPSIS if hi < len(line) else ""
+    shift = len(prefix) - lo
+    return prefix + line[lo:hi] + suffix, start + shift, end + shift
+
+
+def intern_text(value: Optional[str]) -> Optional[str]:
+    """Share one copy of strings repeated across many findings."""
+    return sys.intern(value) if value is not None else None
+
+
+@dataclass(slots=True)
 class Finding:
+    """
+    One pattern match. Slotted to keep instances small, since large scans
+    hold many of them: pattern names, severities and descriptions should be
+    interned (see `intern_text`) and previews bounded (see
+    `bounded_preview`), which the scanner does for every finding it makes.
+    """
+
     file_path: str
     line_no: int
     pattern_name: str
@@ -17,11 +61,24 @@ class Finding:
     ai_type: Optional[str] = None
     ai_reason: Optional[str] = None
 
+    # Every file holding this finding, when identical findings are collapsed
+    locations: Optional[List[str]] = None
+
+    # Offsets of the match within line_preview, when known
+    match_start: Optional[int] = None
+    match_end: Optional[int] = None
+
+    def matched_text(self) -> str:
+        """The matched part of the line, or the whole line if unknown."""
+        if self.match_start is None or self.match_end is None:
+            return self.line_preview.strip()
+        return self.line_preview[self.match_start : self.match_end]
+
     def effective_severity(self) -> str:
         return (self.ai_severity or self.severity).upper()
 
     def to_dict(self) -> Dict:
-        return {
+        data = {
             "file": self.file_path,
             "line": self.line_no,
             "pattern": self.pattern_name,
@@ -33,3 +90,6 @@ class Finding:
             "ai_type": self.ai_type,
             "ai_reason": self.ai_reason,
         }
+        if self.locations is not None:
+            data["locations"] = self.locations
+        return data
@@ -1,10 +1,30 @@
+import hashlib
 import json
+import math
 import re
 import sys
+from bisect import bisect_right
+from collections import Counter
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
-# Base pattern definitions
+from .limits import ScanBudget, first_span
+from .profiling import ANCHOR_PREFILTER, ENTROPY_TOKENS, ProfiledRegex, profiled_pattern, unwrap
+
+try:  # Python 3.11+
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover - Python 3.10
+    import sre_parse  # type: ignore
+
+# Base pattern definitions.
+# "keywords" lists lowercase literals of which every match contains at least
+# one; patterns without them get keywords derived from their regex, if any.
+# "multiline" patterns may match across lines and are reported on the line
+# where the match starts.
+# Entropy patterns ("min_entropy") match candidate tokens of one character
+# set and only report those with at least "min_length" characters and
+# "min_entropy" bits of Shannon entropy per character. They are disabled
+# unless enabled in the config, where both thresholds can be overridden.
 PATTERN_DEFINITIONS = [
     # ===== Secrets =====
     {
@@ -12,6 +32,7 @@ PATTERN_DEFINITIONS = [
         "regex": re.compile(r"AKIA[0-9A-Z]{16}"),
         "description": "Possible AWS Access Key ID.",
         "severity": "HIGH",
+        "keywords": ["akia"],
     },
     {
         "name": "GENERIC_PASSWORD_ASSIGNMENT",
@@ -20,6 +41,7 @@ PATTERN_DEFINITIONS = [
         ),
         "description": "Line looks like it contains a password.",
         "severity": "HIGH",
+        "keywords": ["password", "passwd", "pwd"],
     },
     {
         "name": "GENERIC_TOKEN_ASSIGNMENT",
@@ -28,12 +50,48 @@ PATTERN_DEFINITIONS = [
         ),
         "description": "Line looks like it contains a token/secret.",
         "severity": "HIGH",
+        "keywords": ["token", "secret"],
     },
     {
         "name": "PRIVATE_KEY_MARKER",
-        "regex": re.compile(r"-----BEGIN (RSA |EC |DSA |OPENSSH )?PRIVATE KEY-----"),
+        # Spans the whole PEM block when its END marker follows, without
+        # running into the next block.
+        "regex": re.compile(
+            r"-----BEGIN (RSA |EC |DSA |OPENSSH )?PRIVATE KEY-----"
+            r"(?:(?:(?!-----BEGIN )[A-Za-z0-9+/=\s:,.-]){0,16384}?-----END (?:RSA |EC |DSA |OPENSSH )?PRIVATE KEY-----)?"
+        ),
         "description": "Private key material found.",
         "severity": "HIGH",
+        "keywords": ["-----begin"],
+        "multiline": True,
+    },
+    {
+        "name": "HIGH_ENTROPY_BASE64",
+        "charset": r"[A-Za-z0-9+/]",
+        "suffix": r"={0,2}",
+        "description": "High-entropy base64 string (possible key or secret).",
+        "severity": "MEDIUM",
+        "min_entropy": 4.5,
+        "min_length": 20,
+        "enabled": False,
+    },
+    {
+        "name": "HIGH_ENTROPY_URLSAFE",
+        "charset": r"[A-Za-z0-9_-]",
+        "description": "High-entropy URL-safe string (possible key or secret).",
+        "severity": "MEDIUM",
+        "min_entropy": 4.5,
+        "min_length": 20,
+        "enabled": False,
+    },
+    {
+        "name": "HIGH_ENTROPY_HEX",
+        "charset": r"[0-9a-fA-F]",
+        "description": "High-entropy hex string (possible key or secret).",
+        "severity": "MEDIUM",
+        "min_entropy": 3.0,
+        "min_length": 32,
+        "enabled": False,
     },
     # ===== Privacy / PII =====
     {
@@ -41,6 +99,7 @@ PATTERN_DEFINITIONS = [
         "regex": re.compile(r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+"),
         "description": "Email address found (possible PII).",
         "severity": "MEDIUM",
+        "keywords": ["@"],
     },
     {
         "name": "PHONE_NUMBER",
@@ -56,16 +115,94 @@ PATTERN_DEFINITIONS = [
         "regex": re.compile(r"verify\s*=\s*False"),
         "description": "TLS verification disabled (verify=False).",
         "severity": "HIGH",
+        "keywords": ["verify"],
     },
     {
         "name": "DEBUG_TRUE",
         "regex": re.compile(r"\bDEBUG\s*=\s*True\b"),
         "description": "DEBUG=True committed (may leak sensitive info).",
         "severity": "LOW",
+        "keywords": ["debug"],
     },
 ]
 
 
+# Every entropy pattern "charset" is a subset of these characters, so one
+# pass over the buffer finds the candidate tokens of all of them.
+ENTROPY_TOKEN_CHARS = r"[A-Za-z0-9+/=_-]"
+
+
+def shannon_entropy(value) -> float:
+    """Shannon entropy of a str or bytes `value` in bits per character."""
+    n = len(value)
+    if not n:
+        return 0.0
+    counts = Counter(value).values()
+    return math.log2(n) - sum(c * math.log2(c) for c in counts) / n
+
+
+class EntropyFilter:
+    """
+    Accepts tokens of at least `min_length` characters whose Shannon entropy
+    reaches `min_entropy` bits per character.
+
+    Entropy cannot exceed log2 of the number of distinct characters, and
+    that bound comes from a set built in C, so the common low-entropy
+    token (identifiers, paths, repeated digits) is rejected before any
+    per-character counting.
+    """
+
+    def __init__(self, min_entropy: float, min_length: int):
+        self.min_entropy = min_entropy
+        self.min_length = min_length
+
+    def __call__(self, token) -> bool:
+        if len(token) < self.min_length:
+            return False
+        if math.log2(len(set(token))) < self.min_entropy:
+            return False
+        return shannon_entropy(token) >= self.min_entropy
+
+    def __reduce__(self):
+        return (EntropyFilter, (self.min_entropy, self.min_length))
+
+    def __repr__(self) -> str:
+        return f"EntropyFilter({self.min_entropy}, {self.min_length})"
+
+
+def match_span(
+    pattern: Dict, line, budget: Optional[ScanBudget] = None
+) -> Optional[Tuple[int, int]]:
+    """
+    Offsets of the first match of `pattern` on `line` that passes its
+    validator, if any. Multiline patterns are matched on their first line.
+    With a `budget`, long lines are searched in windows.
+    """
+    if budget is not None:
+        return budget.search(pattern["regex"], line, pattern.get("validate"))
+    return first_span(pattern["regex"], line, pattern.get("validate"))
+
+
+def _entropy_pattern(p: Dict, cfg: Dict) -> Dict:
+    """Compile an entropy pattern definition with its configured thresholds."""
+    try:
+        min_entropy = float(cfg.get("min_entropy", p["min_entropy"]))
+        min_length = max(1, int(cfg.get("min_length", p["min_length"])))
+    except (TypeError, ValueError):
+        print(
+            f"[WARN] Invalid entropy thresholds for {p['name']}, using defaults.",
+            file=sys.stderr,
+        )
+        min_entropy, min_length = p["min_entropy"], p["min_length"]
+
+    pattern_copy = dict(p)
+    pattern_copy["regex"] = re.compile(f"{p['charset']}{{{min_length},}}{p.get('suffix', '')}")
+    pattern_copy["min_entropy"] = min_entropy
+    pattern_copy["min_length"] = min_length
+    pattern_copy["validate"] = EntropyFilter(min_entropy, min_length)
+    return pattern_copy
+
+
 def load_pattern_config(path: Path) -> Dict[str, Dict]:
     try:
         data = json.loads(path.read_text(encoding="utf-8"))
@@ -83,21 +220,910 @@ def load_pattern_config(path: Path) -> Dict[str, Dict]:
     return patterns_cfg
 
 
-def build_active_patterns(pattern_config: Dict[str, Dict]) -> List[Dict]:
+# Upper bound on the literal alternatives tracked per pattern; beyond it a
+# pattern is treated as unanchored rather than blowing up the anchor regex.
+MAX_ANCHOR_LITERALS = 16
+
+_REPEAT_OPS = {
+    sre_parse.MAX_REPEAT,
+    sre_parse.MIN_REPEAT,
+    getattr(sre_parse, "POSSESSIVE_REPEAT", sre_parse.MAX_REPEAT),
+}
+
+
+def _literal_strings(items) -> Optional[Set[str]]:
+    """All strings a purely literal sub-expression can match, or None."""
+    results = {""}
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            options: Optional[Set[str]] = {chr(av)}
+        elif op is sre_parse.SUBPATTERN:
+            options = _literal_strings(av[3].data)
+        elif op is sre_parse.BRANCH:
+            options = set()
+            for alt in av[1]:
+                alt_options = _literal_strings(alt.data)
+                if alt_options is None:
+                    return None
+                options |= alt_options
+        else:
+            return None
+
+        if options is None:
+            return None
+        results = {r + o for r in results for o in options}
+        if len(results) > MAX_ANCHOR_LITERALS:
+            return None
+    return results
+
+
+def _required_literals(items) -> Optional[Set[str]]:
+    """
+    Pick a set of literals such that every match contains at least one of
+    them. Longer literals are preferred since they are more selective.
+    """
+    candidates: List[Set[str]] = []
+    run = {""}
+
+    for item in items:
+        options = _literal_strings([item])
+        if options is not None:
+            merged = {r + o for r in run for o in options}
+            if len(merged) <= MAX_ANCHOR_LITERALS:
+                run = merged
+            else:
+                candidates.append(run)
+                run = options
+            continue
+
+        candidates.append(run)
+        run = {""}
+
+        op, av = item
+        nested: Optional[Set[str]] = None
+        if op is sre_parse.SUBPATTERN:
+            nested = _required_literals(av[3].data)
+        elif op in _REPEAT_OPS and av[0] >= 1:
+            nested = _required_literals(av[2].data)
+        elif op is sre_parse.BRANCH:
+            nested = set()
+            for alt in av[1]:
+                alt_required = _required_literals(alt.data)
+                if alt_required is None:
+                    nested = None
+                    break
+                nested |= alt_required
+            if nested is not None and len(nested) > MAX_ANCHOR_LITERALS:
+                nested = None
+        if nested:
+            candidates.append(nested)
+
+    candidates.append(run)
+    candidates = [c for c in candidates if c and "" not in c]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda c: min(len(s) for s in c))
+
+
+def derive_anchors(regex: re.Pattern) -> Optional[List[str]]:
+    """
+    Derive lowercase literals of which every match of `regex` contains at
+    least one, or None when the pattern has no usable literal.
+    """
+    try:
+        parsed = sre_parse.parse(regex.pattern, regex.flags)
+    except (re.error, RecursionError):
+        return None
+    literals = _required_literals(parsed.data)
+    if not literals:
+        return None
+    if isinstance(regex.pattern, bytes):
+        # bytes.lower() only folds ASCII, so fold the same way here.
+        return sorted({lit.encode("latin-1").lower() for lit in literals}, key=lambda s: (-len(s), s))
+    return sorted({lit.lower() for lit in literals}, key=lambda s: (-len(s), s))
+
+
+_LINE_ANCHOR_CODES = {
+    sre_parse.AT_BEGINNING,
+    sre_parse.AT_BEGINNING_STRING,
+    sre_parse.AT_END,
+    sre_parse.AT_END_STRING,
+}
+
+_ATOMIC_GROUP = getattr(sre_parse, "ATOMIC_GROUP", None)
+
+
+def _line_agnostic(items) -> bool:
+    for op, av in items:
+        if op is sre_parse.AT and av in _LINE_ANCHOR_CODES:
+            return False
+        if op is sre_parse.ASSERT_NOT or op is sre_parse.GROUPREF_EXISTS:
+            return False
+        if op is _ATOMIC_GROUP:
+            if not _line_agnostic(av.data):
+                return False
+        elif op is sre_parse.SUBPATTERN:
+            if not _line_agnostic(av[3].data):
+                return False
+        elif op is sre_parse.ASSERT:
+            if not _line_agnostic(av[1].data):
+                return False
+        elif op in _REPEAT_OPS:
+            if not _line_agnostic(av[2].data):
+                return False
+        elif op is sre_parse.BRANCH:
+            if not all(_line_agnostic(alt.data) for alt in av[1]):
+                return False
+    return True
+
+
+def _is_line_agnostic(regex: re.Pattern) -> bool:
+    """
+    True when a search over a whole buffer finds a match whenever any single
+    line of it would, i.e. the pattern has no ^/$ or negative lookarounds.
+    """
+    try:
+        return _line_agnostic(sre_parse.parse(regex.pattern, regex.flags).data)
+    except (re.error, RecursionError):
+        return False
+
+
+def _may_overlap(a: str, b: str) -> bool:
+    if a in b or b in a:
+        return True
+    return any(a.endswith(b[:k]) or b.endswith(a[:k]) for k in range(1, min(len(a), len(b))))
+
+
+class LineIndex:
+    """
+    Maps buffer offsets to 1-based line numbers without splitting the buffer.
+
+    Newline offsets are only counted up to the furthest position asked for;
+    earlier positions are resolved with bisect over the recorded checkpoints.
+    Works on both str and bytes buffers.
+    """
+
+    def __init__(self, buffer, first_line: int = 1):
+        self._buffer = buffer
+        self._newline = b"\n" if isinstance(buffer, (bytes, bytearray)) else "\n"
+        self._offsets = [0]
+        self._lines = [first_line]
+
+    def line_no(self, pos: int) -> int:
+        if pos >= self._offsets[-1]:
+            line = self._lines[-1] + self._buffer.count(self._newline, self._offsets[-1], pos)
+            self._offsets.append(pos)
+            self._lines.append(line)
+            return line
+        k = bisect_right(self._offsets, pos) - 1
+        return self._lines[k] + self._buffer.count(self._newline, self._offsets[k], pos)
+
+    def line_bounds(self, pos: int) -> Tuple[int, int]:
+        """Return the (start, end) offsets of the line holding `pos`."""
+        start = self._buffer.rfind(self._newline, 0, pos) + 1
+        end = self._buffer.find(self._newline, pos)
+        return start, len(self._buffer) if end == -1 else end
+
+    def line(self, start: int, end: int):
+        line = self._buffer[start:end]
+        # Match splitlines(): a CRLF line does not include its "\r".
+        return line[:-1] if line[-1:] in ("\r", b"\r") else line
+
+
+class PatternSet:
+    """
+    Compiled view over the active patterns.
+
+    The literals of every anchored pattern are merged into one lowercase
+    alternation, so an ordinary line costs a single regex pass no matter how
+    many patterns are enabled. Each literal hit maps back to the patterns
+    that own it, which then confirm the line with their own regex.
+
+    Patterns without literals, and patterns marked "multiline", are searched
+    over the whole buffer instead. Only patterns whose semantics depend on
+    line boundaries (^, $, negative lookarounds) fall back to a line loop.
+    Patterns with a "validate" callable are also searched over the whole
+    buffer, and a line only matches when one of its candidate tokens passes
+    the validator. Entropy patterns share a single pass that extracts
+    candidate tokens for all of their character sets at once.
+    """
+
+    def __init__(self, patterns: List[Dict]):
+        self.patterns: List[Dict] = list(patterns)
+        self._is_bytes = bool(self.patterns) and isinstance(
+            self.patterns[0]["regex"].pattern, bytes
+        )
+        self._bytes_view: Optional["PatternSet"] = None
+        self._anchors: Dict[int, List[str]] = {}
+        self._literal_owners: Dict[str, List[int]] = {}
+        self._buffer_scanned: List[int] = []
+        self._line_scanned: List[int] = []
+        self._validated: List[int] = []
+        self._tokenized: List[int] = []
+        self._profiled = bool(self.patterns) and isinstance(
+            self.patterns[0]["regex"], ProfiledRegex
+        )
+
+        for i, p in enumerate(self.patterns):
+            if p.get("validate") is not None:
+                (self._tokenized if p.get("charset") else self._validated).append(i)
+                continue
+            anchors = (
+                [kw.lower() for kw in p["keywords"]]
+                if p.get("keywords")
+                else derive_anchors(p["regex"])
+            )
+            if anchors:
+                self._anchors[i] = anchors
+                if not p.get("multiline"):
+                    for lit in anchors:
+                        self._literal_owners.setdefault(lit, []).append(i)
+                    continue
+            # A buffer-wide search finds a match whenever a single line would,
+            # unless line-relative assertions make it stricter.
+            if p.get("multiline") or _is_line_agnostic(p["regex"]):
+                self._buffer_scanned.append(i)
+            else:
+                self._line_scanned.append(i)
+
+        self._token_regex: Optional[re.Pattern] = None
+        if self._tokenized:
+            shortest = min(self.patterns[i]["min_length"] for i in self._tokenized)
+            source = f"{ENTROPY_TOKEN_CHARS}{{{shortest},}}"
+            self._token_regex = re.compile(source.encode() if self._is_bytes else source)
+
+        self._line_anchored = sorted(
+            {i for owners in self._literal_owners.values() for i in owners}
+        )
+        self._subsets: Dict[Tuple[int, ...], "PatternSet"] = {}
+
+        # Plain literal branches keep re's first-character fast path, which
+        # named groups around each pattern's literals would disable.
+        self._anchor_regex: Optional[re.Pattern] = None
+        if self._literal_owners:
+            literals = sorted(self._literal_owners, key=lambda s: (-len(s), s))
+            separator = b"|" if self._is_bytes else "|"
+            self._anchor_regex = re.compile(separator.join(re.escape(lit) for lit in literals))
+
+        if self._profiled:
+            if self._anchor_regex is not None:
+                self._anchor_regex = ProfiledRegex(self._anchor_regex, ANCHOR_PREFILTER)
+            if self._token_regex is not None:
+                self._token_regex = ProfiledRegex(self._token_regex, ENTROPY_TOKENS)
+
+        # An alternation reports one literal per position, so when literals of
+        # different patterns can overlap a hit may hide another pattern's anchor.
+        literals = list(self._literal_owners)
+        self._anchors_overlap = any(
+            set(self._literal_owners[a]) != set(self._literal_owners[b]) and _may_overlap(a, b)
+            for n, a in enumerate(literals)
+            for b in literals[n + 1:]
+        )
+
+    def __reduce__(self):
+        # Rebuild from the pattern list on unpickling (e.g. in worker
+        # processes) instead of shipping the per-run caches.
+        return (PatternSet, (self.patterns,))
+
+    def fingerprint(self) -> str:
+        """
+        Stable hash of everything in the active patterns that affects scan
+        results, used to key cached results so rule or config changes
+        invalidate them automatically.
+        """
+
+        def encode(value):
+            value = unwrap(value)
+            if isinstance(value, re.Pattern):
+                source = value.pattern
+                if isinstance(source, bytes):
+                    source = source.decode("latin-1")
+                return [source, value.flags]
+            if callable(value):
+                qualname = getattr(value, "__qualname__", None)
+                return f"{value.__module__}.{qualname}" if qualname else repr(value)
+            return value
+
+        payload = [{k: encode(v) for k, v in p.items()} for p in self.patterns]
+        data = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(data).hexdigest()
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.patterns)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def __getitem__(self, index: int) -> Dict:
+        return self.patterns[index]
+
+    def profiled(self) -> "PatternSet":
+        """
+        The same patterns with every regex evaluation recorded in the active
+        scan profile (see `profiling`), including the shared prefilters.
+        """
+        if self._profiled:
+            return self
+        return PatternSet([profiled_pattern(p) for p in self.patterns])
+
+    def bytes_view(self) -> "PatternSet":
+        """
+        The same patterns compiled as bytes regexes, for scanning memory-mapped
+        files without decoding them. Patterns that cannot be expressed as bytes
+        regexes are left out with a warning.
+        """
+        if self._bytes_view is not None:
+            return self._bytes_view
+        if self._is_bytes:
+            return self
+
+        converted: List[Dict] = []
+        for i, p in enumerate(self.patterns):
+            try:
+                regex = re.compile(
+                    p["regex"].pattern.encode("utf-8"), p["regex"].flags & ~re.UNICODE
+                )
+            except (re.error, UnicodeEncodeError) as e:
+                print(
+                    f"[WARN] Pattern {p['name']} cannot be used for streamed files: {e}",
+                    file=sys.stderr,
+                )
+                continue
+            pattern_copy = dict(p)
+            pattern_copy["regex"] = regex
+            anchors = self._anchors.get(i)
+            pattern_copy["keywords"] = (
+                [a.encode("utf-8") for a in anchors] if anchors else None
+            )
+            converted.append(profiled_pattern(pattern_copy) if self._profiled else pattern_copy)
+
+        self._bytes_view = PatternSet(converted)
+        return self._bytes_view
+
+    def split_multiline(self) -> Tuple[List[Dict], "PatternSet"]:
+        """
+        Return the patterns marked "multiline", and the others as a
+        PatternSet. Streamed scans search multiline patterns over the whole
+        file, since their matches can be longer than any chunk overlap.
+        """
+        multiline = [p for p in self.patterns if p.get("multiline")]
+        if not multiline:
+            return [], self
+        key = tuple(i for i, p in enumerate(self.patterns) if not p.get("multiline"))
+        rest = self._subsets.get(key)
+        if rest is None:
+            rest = self._subsets[key] = PatternSet([self.patterns[i] for i in key])
+        return multiline, rest
+
+    def select(self, text: str, low: Optional[str] = None) -> "PatternSet":
+        """
+        Return the subset of patterns that can match somewhere in `text`.
+
+        Keywords are checked with plain substring searches over the lowercased
+        buffer, so files that contain none of them skip regex work entirely.
+        """
+        if low is None:
+            low = text.lower()
+
+        chosen = []
+        for i, p in enumerate(self.patterns):
+            anchors = self._anchors.get(i)
+            if anchors is not None:
+                if any(kw in low for kw in anchors):
+                    chosen.append(i)
+            elif i in self._buffer_scanned or i in self._validated:
+                if p["regex"].search(text):
+                    chosen.append(i)
+            elif i in self._tokenized:
+                if self._token_regex.search(text):
+                    chosen.append(i)
+            else:
+                chosen.append(i)
+
+        key = tuple(chosen)
+        if len(key) == len(self.patterns):
+            return self
+        subset = self._subsets.get(key)
+        if subset is None:
+            subset = PatternSet([self.patterns[i] for i in key])
+            self._subsets[key] = subset
+        return subset
+
+    def _line_matches(self, i: int, line, budget: Optional[ScanBudget]) -> bool:
+        regex = self.patterns[i]["regex"]
+        if budget is None:
+            return regex.search(line) is not None
+        return budget.search(regex, line) is not None
+
+    def _anchored_hits(self, line: str, low: str, budget: Optional[ScanBudget] = None) -> Set[int]:
+        if self._anchor_regex is None or not self._anchor_regex.search(low):
+            return set()
+        if self._anchors_overlap:
+            candidates = {
+                i
+                for i in self._line_anchored
+                if any(lit in low for lit in self._anchors[i])
+            }
+        else:
+            candidates = {
+                i
+                for m in self._anchor_regex.finditer(low)
+                for i in self._literal_owners[m.group()]
+            }
+        return {i for i in candidates if self._line_matches(i, line, budget)}
+
+    def match_line(self, line: str, budget: Optional[ScanBudget] = None) -> List[Dict]:
+        """Return the patterns matching `line`, in definition order."""
+        hits = self._anchored_hits(line, line.lower(), budget)
+
+        for i in self._buffer_scanned + self._line_scanned:
+            if self._line_matches(i, line, budget):
+                hits.add(i)
+
+        for i in self._validated:
+            validate = self.patterns[i]["validate"]
+            if any(validate(m.group()) for m in self.patterns[i]["regex"].finditer(line)):
+                hits.add(i)
+        hits.update(i for _, i in self._token_hits(line, len(line), budget))
+
+        if not hits:
+            return []
+        return [self.patterns[i] for i in sorted(hits)]
+
+    def _token_hits(
+        self, text, limit: int, budget: Optional[ScanBudget] = None
+    ) -> Iterator[Tuple[int, int]]:
+        """
+        Yield (offset, pattern index) for every candidate token of `text`
+        starting before `limit` that passes an entropy pattern. Each
+        pattern's own charset is only matched within the candidates.
+        """
+        if self._token_regex is None:
+            return
+        for m in self._token_regex.finditer(text):
+            if m.start() >= limit or (budget is not None and budget.expired()):
+                break
+            token = m.group()
+            for i in self._tokenized:
+                p = self.patterns[i]
+                validate = p["validate"]
+                if any(validate(t.group()) for t in p["regex"].finditer(token)):
+                    yield m.start(), i
+
+    def scan_buffer(
+        self,
+        text: str,
+        low: Optional[str] = None,
+        first_line: int = 1,
+        limit: Optional[int] = None,
+        budget: Optional[ScanBudget] = None,
+    ) -> Iterator[Tuple[int, str, Dict]]:
+        """
+        Yield (line_no, line, pattern) for every line of `text` a pattern
+        matches, ordered by line and then by pattern definition order.
+
+        The buffer is never split: anchor literals and buffer-scanned
+        patterns run with a single pass each, and a line is only
+        materialized when it holds a match. Multiline matches are reported
+        on the line where they start.
+
+        `text` may be a str or, for a bytes view, a bytes chunk of a larger
+        file: line numbers then start at `first_line`, and only matches
+        starting before `limit` are reported, the rest being overlap.
+
+        With a `budget`, lines are matched within its line budget and the
+        scan stops early, keeping the hits found so far, once the file
+        budget is spent.
+        """
+        if low is None:
+            low = text.lower()
+        if limit is None:
+            limit = len(text)
+        if len(low) != len(text):
+            # A few characters change length when lowercased, which would put
+            # anchor offsets out of step with the text; scan by line instead,
+            # splitting and numbering lines as LineIndex does.
+            start = 0
+            for line_no, line in enumerate(text.split("\n"), start=first_line):
+                if start >= limit or (budget is not None and budget.expired()):
+                    return
+                start += len(line) + 1
+                if line[-1:] == "\r":
+                    line = line[:-1]
+                for p in self.match_line(line, budget):
+                    yield line_no, line, p
+            return
+
+        index = LineIndex(text, first_line)
+        hits: Dict[int, Set[int]] = {}
+        bounds: Dict[int, int] = {}
+
+        if self._anchor_regex is not None:
+            line_end = -1
+            for m in self._anchor_regex.finditer(low):
+                if m.start() >= limit:
+                    break
+                if m.start() < line_end:
+                    continue
+                if budget is not None and budget.expired():
+                    break
+                start, line_end = index.line_bounds(m.start())
+                found = self._anchored_hits(
+                    index.line(start, line_end), low[start:line_end], budget
+                )
+                if found:
+                    hits.setdefault(start, set()).update(found)
+                    bounds[start] = line_end
+
+        for i in self._buffer_scanned:
+            regex = self.patterns[i]["regex"]
+            multiline = self.patterns[i].get("multiline", False)
+            pos = 0
+            while pos < limit:
+                if budget is not None and budget.expired():
+                    break
+                m = regex.search(text, pos)
+                if m is None or m.start() >= limit:
+                    break
+                start, end = index.line_bounds(m.start())
+                if multiline or m.end() <= end or self._line_matches(i, index.line(start, end), budget):
+                    hits.setdefault(start, set()).add(i)
+                    bounds[start] = end
+                # Resume on the next line even after a multiline match, so a
+                # start line inside the span is still reported.
+                pos = end + 1
+
+        for i in self._validated:
+            validate = self.patterns[i]["validate"]
+            line_end = -1
+            for m in self.patterns[i]["regex"].finditer(text):
+                if m.start() >= limit or (budget is not None and budget.expired()):
+                    break
+                # One passing token is enough for its line.
+                if m.start() < line_end or not validate(m.group()):
+                    continue
+                start, line_end = index.line_bounds(m.start())
+                hits.setdefault(start, set()).add(i)
+                bounds[start] = line_end
+
+        for pos, i in self._token_hits(text, limit, budget):
+            start, end = index.line_bounds(pos)
+            hits.setdefault(start, set()).add(i)
+            bounds[start] = end
+
+        if self._line_scanned:
+            newline = b"\n" if self._is_bytes else "\n"
+            start = 0
+            while start < limit:
+                if budget is not None and budget.expired():
+                    break
+                end = text.find(newline, start)
+                if end == -1:
+                    end = len(text)
+                line = index.line(start, end)
+                for i in self._line_scanned:
+                    if self._line_matches(i, line, budget):
+                        hits.setdefault(start, set()).add(i)
+                        bounds[start] = end
+                start = end + 1
+
+        for start in sorted(hits):
+            line = index.line(start, bounds[start])
+            line_no = index.line_no(start)
+            for i in sorted(hits[start]):
+                yield line_no, line, self.patterns[i]
+
+
+# Static ReDoS check for regexes from the config. Character sets are
+# approximated as (negated, chars): (False, S) is S, (True, S) everything
+# but S; case variants are added so (?i) patterns are not under-estimated.
+_NO_CHARS = (False, frozenset())
+_ALL_CHARS = (True, frozenset())
+_DIGITS = frozenset("0123456789")
+_WORD_CHARS = _DIGITS | frozenset("_abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ")
+_SPACES = frozenset(" \t\n\r\f\v")
+_CATEGORY_CHARS = {
+    sre_parse.CATEGORY_DIGIT: (False, _DIGITS),
+    sre_parse.CATEGORY_NOT_DIGIT: (True, _DIGITS),
+    sre_parse.CATEGORY_WORD: (False, _WORD_CHARS),
+    sre_parse.CATEGORY_NOT_WORD: (True, _WORD_CHARS),
+    sre_parse.CATEGORY_SPACE: (False, _SPACES),
+    sre_parse.CATEGORY_NOT_SPACE: (True, _SPACES),
+}
+
+# Repeats allowing more iterations than this count as unbounded.
+REDOS_REPEAT_LIMIT = 32
+
+
+def _union(a, b):
+    (neg_a, chars_a), (neg_b, chars_b) = a, b
+    if neg_a and neg_b:
+        return True, chars_a & chars_b
+    if neg_a:
+        return True, chars_a - chars_b
+    if neg_b:
+        return True, chars_b - chars_a
+    return False, chars_a | chars_b
+
+
+def _disjoint(a, b) -> bool:
+    (neg_a, chars_a), (neg_b, chars_b) = a, b
+    if neg_a and neg_b:
+        return False
+    if neg_a:
+        return chars_b <= chars_a
+    if neg_b:
+        return chars_a <= chars_b
+    return not chars_a & chars_b
+
+
+def _literal_chars(code: int):
+    c = chr(code)
+    return False, frozenset({c, c.lower(), c.upper()})
+
+
+def _atom_chars(op, av):
+    """The characters a single-character item can match, or None for other items."""
+    if op is sre_parse.LITERAL:
+        return _literal_chars(av)
+    if op is sre_parse.NOT_LITERAL or op is sre_parse.ANY:
+        return _ALL_CHARS
+    if op is not sre_parse.IN:
+        return None
+    result = _NO_CHARS
+    negate = False
+    for item_op, item_av in av:
+        if item_op is sre_parse.NEGATE:
+            negate = True
+        elif item_op is sre_parse.LITERAL:
+            result = _union(result, _literal_chars(item_av))
+        elif item_op is sre_parse.RANGE and item_av[1] - item_av[0] <= 256:
+            for code in range(item_av[0], item_av[1] + 1):
+                result = _union(result, _literal_chars(code))
+        elif item_op is sre_parse.CATEGORY:
+            result = _union(result, _CATEGORY_CHARS.get(item_av, _ALL_CHARS))
+        else:
+            result = _union(result, _ALL_CHARS)
+    return (not result[0], result[1]) if negate else result
+
+
+def _chars(items):
+    """Every character the sub-expression `items` can consume."""
+    result = _NO_CHARS
+    for op, av in items:
+        chars = _atom_chars(op, av)
+        if chars is not None:
+            result = _union(result, chars)
+        elif op is sre_parse.SUBPATTERN:
+            result = _union(result, _chars(av[3].data))
+        elif op is _ATOMIC_GROUP:
+            result = _union(result, _chars(av.data))
+        elif op in _REPEAT_OPS:
+            result = _union(result, _chars(av[2].data))
+        elif op is sre_parse.BRANCH:
+            for alt in av[1]:
+                result = _union(result, _chars(alt.data))
+        elif op is sre_parse.GROUPREF or op is sre_parse.GROUPREF_EXISTS:
+            return _ALL_CHARS
+    return result
+
+
+def _item_first(op, av):
+    """(first characters, can match empty) of one item."""
+    chars = _atom_chars(op, av)
+    if chars is not None:
+        return chars, False
+    if op is sre_parse.SUBPATTERN:
+        return _first(av[3].data)
+    if op is _ATOMIC_GROUP:
+        return _first(av.data)
+    if op in _REPEAT_OPS:
+        chars, nullable = _first(av[2].data)
+        return chars, nullable or av[0] == 0
+    if op is sre_parse.BRANCH:
+        result, nullable = _NO_CHARS, False
+        for alt in av[1]:
+            chars, alt_nullable = _first(alt.data)
+            result, nullable = _union(result, chars), nullable or alt_nullable
+        return result, nullable
+    if op in (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+        return _NO_CHARS, True
+    return _ALL_CHARS, True
+
+
+def _first(items, follow=None):
     """
-    Merge default pattern definitions with overrides from config.
+    (first characters, can match empty) of the sequence `items`; when it
+    can match empty, the characters in `follow` may come first instead.
+    """
+    result = _NO_CHARS
+    for op, av in items:
+        chars, nullable = _item_first(op, av)
+        result = _union(result, chars)
+        if not nullable:
+            return result, False
+    if follow is not None:
+        result = _union(result, follow)
+    return result, True
+
+
+def _flatten(items) -> List:
+    """`items` with groups inlined, i.e. the sequence a repeat's body matches."""
+    flat: List = []
+    for op, av in items:
+        if op is sre_parse.SUBPATTERN:
+            flat.extend(_flatten(av[3].data))
+        else:
+            flat.append((op, av))
+    return flat
+
+
+def _backtracking_repeat(op) -> bool:
+    return op is sre_parse.MAX_REPEAT or op is sre_parse.MIN_REPEAT
+
+
+def _unbounded(op, av) -> bool:
+    return _backtracking_repeat(op) and av[1] > REDOS_REPEAT_LIMIT
+
+
+def _inner_repeats(items) -> Iterator:
+    """Unbounded repeats inside `items` that can backtrack, outermost first."""
+    for op, av in items:
+        if _unbounded(op, av):
+            yield av[2].data
+        elif op is sre_parse.SUBPATTERN:
+            yield from _inner_repeats(av[3].data)
+        elif _backtracking_repeat(op):
+            yield from _inner_repeats(av[2].data)
+        elif op is sre_parse.BRANCH:
+            for alt in av[1]:
+                yield from _inner_repeats(alt.data)
+
+
+def _repeat_risks(body, risks: Set[str], unbounded: bool) -> None:
+    """Ways the body of a repeat can match one text in many ways."""
+    flat = _flatten(body)
+    body_first, _ = _first(flat)
+    for inner in _inner_repeats(flat):
+        inner_chars = _chars(inner)
+        # A required item the inner repeat cannot consume, like the dot in
+        # (?:[a-z]+\.)+, pins down where each iteration ends.
+        separated = any(
+            not _item_first(op, av)[1] and _disjoint(_chars([(op, av)]), inner_chars)
+            for op, av in flat
+        )
+        if not separated:
+            risks.add("an unbounded quantifier nested in another quantifier, as in (a+)+")
+            break
+
+    if not unbounded:
+        return
+    for k, (op, av) in enumerate(flat):
+        if op is not sre_parse.BRANCH:
+            continue
+        follow, _ = _first(flat[k + 1 :], body_first)
+        firsts = [_first(alt.data, follow)[0] for alt in av[1]]
+        if any(not _disjoint(a, b) for j, a in enumerate(firsts) for b in firsts[j + 1 :]):
+            risks.add("a repeated alternation whose branches can match the same text, as in (a|aa)*")
+
+
+def _collect_redos_risks(items, risks: Set[str]) -> None:
+    for op, av in items:
+        if op in _REPEAT_OPS:
+            if _backtracking_repeat(op) and av[1] > 1:
+                _repeat_risks(av[2].data, risks, _unbounded(op, av))
+            _collect_redos_risks(av[2].data, risks)
+        elif op is sre_parse.SUBPATTERN:
+            _collect_redos_risks(av[3].data, risks)
+        elif op is _ATOMIC_GROUP:
+            _collect_redos_risks(av.data, risks)
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            _collect_redos_risks(av[1].data, risks)
+        elif op is sre_parse.BRANCH:
+            for alt in av[1]:
+                _collect_redos_risks(alt.data, risks)
+        elif op is sre_parse.GROUPREF_EXISTS:
+            for alt in av[1:]:
+                if alt is not None:
+                    _collect_redos_risks(alt.data, risks)
+
+
+def redos_risks(source: str) -> List[str]:
+    """
+    Constructs in the regex `source` that can make a search take exponential
+    time (catastrophic backtracking). Raises re.error if it does not parse.
+    The check is conservative: a few safe regexes are flagged too, and
+    possessive quantifiers or atomic groups are the way to rewrite them.
+    """
+    try:
+        parsed = sre_parse.parse(source)
+    except RecursionError:
+        return ["nesting too deep to check"]
+    risks: Set[str] = set()
+    _collect_redos_risks(parsed.data, risks)
+    return sorted(risks)
+
+
+def _config_pattern(name: str, cfg: Dict, base: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    Compile a pattern whose regex is given in the config, overriding the
+    definition `base` if any. Returns None, with a warning, when the regex
+    is invalid or prone to catastrophic backtracking.
+    """
+    source = cfg["regex"]
+    if not isinstance(source, str):
+        print(f"[WARN] Regex of pattern {name} in config is not a string.", file=sys.stderr)
+        return None
+    try:
+        risks = redos_risks(source)
+        regex = re.compile(source)
+    except re.error as e:
+        print(f"[WARN] Invalid regex for pattern {name} in config: {e}", file=sys.stderr)
+        return None
+    if risks:
+        print(
+            f"[WARN] Regex of pattern {name} in config may backtrack catastrophically: "
+            f"{'; '.join(risks)}.",
+            file=sys.stderr,
+        )
+        return None
+
+    if base is not None:
+        pattern = dict(base)
+    else:
+        pattern = {"name": name, "description": f"Custom pattern {name}.", "severity": "MEDIUM"}
+    pattern["regex"] = regex
+    # Keywords of the built-in regex may not hold for the new one.
+    pattern["keywords"] = [str(kw).lower() for kw in cfg.get("keywords") or []]
+    for key in ("description", "multiline"):
+        if key in cfg:
+            pattern[key] = cfg[key]
+    return pattern
+
+
+def build_active_patterns(pattern_config: Dict[str, Dict]) -> PatternSet:
+    """
+    Merge default pattern definitions with overrides from config and
+    compile the result into a PatternSet.
     """
     active: List[Dict] = []
     for p in PATTERN_DEFINITIONS:
         name = p["name"]
         cfg = pattern_config.get(name, {})
-        enabled = cfg.get("enabled", True)
+        enabled = cfg.get("enabled", p.get("enabled", True))
         if not enabled:
             continue
 
         severity = cfg.get("severity", p["severity"]).upper()
-        pattern_copy = dict(p)
+        if "min_entropy" in p:
+            if "regex" in cfg:
+                print(f"[WARN] Regex of entropy pattern {name} cannot be overridden.", file=sys.stderr)
+            pattern_copy = _entropy_pattern(p, cfg)
+        elif "regex" in cfg:
+            pattern_copy = _config_pattern(name, cfg, p)
+            if pattern_copy is None:
+                print(f"[WARN] Using the built-in regex of pattern {name}.", file=sys.stderr)
+                pattern_copy = dict(p)
+        else:
+            pattern_copy = dict(p)
+        pattern_copy.pop("enabled", None)
         pattern_copy["severity"] = severity
         active.append(pattern_copy)
 
-    return active
+    known = {p["name"] for p in PATTERN_DEFINITIONS}
+    for name, cfg in pattern_config.items():
+        if name in known:
+            continue
+        if not isinstance(cfg, dict) or "regex" not in cfg:
+            print(f"[WARN] Unknown pattern {name} in config has no regex, ignoring it.", file=sys.stderr)
+            continue
+        if not cfg.get("enabled", True):
+            continue
+        pattern = _config_pattern(name, cfg)
+        if pattern is None:
+            print(f"[WARN] Skipping pattern {name}.", file=sys.stderr)
+            continue
+        pattern["severity"] = str(cfg.get("severity", pattern["severity"])).upper()
+        active.append(pattern)
+
+    return PatternSet(active)
@@ -0,0 +1,228 @@
+import json
+import sys
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Dict, List, Optional
+
+# Stages timed by the profiler, in pipeline order.
+STAGES = ("walk", "ignore", "stat", "read", "decode", "match", "report")
+
+# Names under which the shared prefilter passes of a PatternSet are profiled.
+ANCHOR_PREFILTER = "(anchor prefilter)"
+ENTROPY_TOKENS = "(entropy tokens)"
+
+
+class ScanProfile:
+    """
+    Counters collected while profiling a scan: per pattern, the number of
+    regex evaluations and matches, their cumulative time and the slowest
+    single evaluation with its file and input length; per stage, the time
+    spent. Stage times from worker processes are summed, so with `--jobs`
+    they can exceed the wall-clock time.
+    """
+
+    def __init__(self):
+        self.current_file = ""
+        self.stages: Dict[str, float] = dict.fromkeys(STAGES, 0.0)
+        # name -> [evaluations, matches, seconds, worst seconds, worst file, worst length]
+        self.patterns: Dict[str, List] = {}
+
+    def record(self, name: str, seconds: float, matches: int, length: int, evaluations: int = 1) -> None:
+        entry = self.patterns.get(name)
+        if entry is None:
+            entry = self.patterns[name] = [0, 0, 0.0, 0.0, "", 0]
+        entry[0] += evaluations
+        entry[1] += matches
+        entry[2] += seconds
+        if seconds > entry[3]:
+            entry[3:] = [seconds, self.current_file, length]
+
+    def merge(self, data: Dict) -> None:
+        """Add the counters of another profile's `to_dict()`, e.g. a worker's."""
+        for stage, seconds in data["stages"].items():
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        for p in data["patterns"]:
+            entry = self.patterns.setdefault(p["pattern"], [0, 0, 0.0, 0.0, "", 0])
+            entry[0] += p["evaluations"]
+            entry[1] += p["matches"]
+            entry[2] += p["seconds"]
+            worst = p["worst"]
+            if worst["seconds"] > entry[3]:
+                entry[3:] = [worst["seconds"], worst["file"], worst["length"]]
+
+    def to_dict(self) -> Dict:
+        patterns = sorted(self.patterns.items(), key=lambda item: -item[1][2])
+        return {
+            "stages": dict(self.stages),
+            "patterns": [
+                {
+                    "pattern": name,
+                    "evaluations": evaluations,
+                    "matches": matches,
+                    "seconds": seconds,
+                    "worst": {"seconds": worst, "file": file, "length": length},
+                }
+                for name, (evaluations, matches, seconds, worst, file, length) in patterns
+            ],
+        }
+
+
+# The profile of the running scan, or None when profiling is off. Hooks
+# check it once per call site, so an unprofiled scan pays nothing more.
+active: Optional[ScanProfile] = None
+
+
+def enable_profiling() -> ScanProfile:
+    global active
+    if active is None:
+        active = ScanProfile()
+    return active
+
+
+def take_profile() -> Optional[Dict]:
+    """Return and reset the counters collected so far (used by workers)."""
+    global active
+    if active is None:
+        return None
+    data = active.to_dict()
+    active = ScanProfile()
+    return data
+
+
+def timed(stage: str, fn: Callable) -> Callable:
+    """
+    `fn`, adding the time of each call to `stage` when profiling is on.
+    Bind the result outside loops: with profiling off it is `fn` itself.
+    """
+    if active is None:
+        return fn
+    profile = active
+
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.stages[stage] += perf_counter() - start
+
+    return wrapper
+
+
+class ProfiledRegex:
+    """
+    A compiled regex that records each evaluation in the active profile
+    under `name`. `finditer` is timed across the whole iteration; a
+    `search` counts as one evaluation and at most one match.
+    """
+
+    def __init__(self, regex, name: str):
+        self.regex = regex
+        self.name = name
+
+    def __reduce__(self):
+        return (ProfiledRegex, (self.regex, self.name))
+
+    def __getattr__(self, attr):
+        return getattr(self.regex, attr)
+
+    def __repr__(self) -> str:
+        return f"ProfiledRegex({self.regex!r}, {self.name!r})"
+
+    def _record(self, seconds: float, matches: int, length: int) -> None:
+        if active is not None:
+            active.record(self.name, seconds, matches, length)
+
+    def search(self, string, *args):
+        start = perf_counter()
+        m = self.regex.search(string, *args)
+        self._record(perf_counter() - start, m is not None, len(string))
+        return m
+
+    def fullmatch(self, string, *args):
+        start = perf_counter()
+        m = self.regex.fullmatch(string, *args)
+        self._record(perf_counter() - start, m is not None, len(string))
+        return m
+
+    def finditer(self, string, *args):
+        seconds = 0.0
+        matches = 0
+        it = self.regex.finditer(string, *args)
+        try:
+            while True:
+                start = perf_counter()
+                m = next(it, None)
+                seconds += perf_counter() - start
+                if m is None:
+                    break
+                matches += 1
+                yield m
+        finally:
+            self._record(seconds, matches, len(string))
+
+
+class ProfiledValidator:
+    """A pattern's `validate` callable whose time is added to the pattern."""
+
+    def __init__(self, validate: Callable, name: str):
+        self.validate = validate
+        self.name = name
+
+    def __reduce__(self):
+        return (ProfiledValidator, (self.validate, self.name))
+
+    def __repr__(self) -> str:
+        return repr(self.validate)
+
+    def __call__(self, token) -> bool:
+        start = perf_counter()
+        passed = self.validate(token)
+        if active is not None:
+            active.record(self.name, perf_counter() - start, 0, len(token), evaluations=0)
+        return passed
+
+
+def profiled_pattern(p: Dict) -> Dict:
+    """A copy of pattern `p` whose regex and validator record to the profile."""
+    pattern_copy = dict(p)
+    pattern_copy["regex"] = ProfiledRegex(unwrap(p["regex"]), p["name"])
+    validate = p.get("validate")
+    if validate is not None and not isinstance(validate, ProfiledValidator):
+        pattern_copy["validate"] = ProfiledValidator(validate, p["name"])
+    return pattern_copy
+
+
+def unwrap(regex):
+    """The compiled regex behind a possibly profiled one."""
+    return regex.regex if isinstance(regex, ProfiledRegex) else regex
+
+
+def print_profile(profile: ScanProfile, top: int = 20) -> None:
+    data = profile.to_dict()
+    total = sum(data["stages"].values())
+    print("\n[PROFILE] Stage times:")
+    for stage, seconds in data["stages"].items():
+        share = seconds / total * 100 if total else 0.0
+        print(f"  {stage:<8} {seconds:>10.3f}s {share:>6.1f}%")
+
+    print(f"\n[PROFILE] Patterns by cumulative time (top {top}):")
+    print(
+        f"  {'pattern':<30} {'evals':>10} {'matches':>9} {'seconds':>9} "
+        f"{'worst ms':>9} {'length':>9}  worst file"
+    )
+    for p in data["patterns"][:top]:
+        worst = p["worst"]
+        print(
+            f"  {p['pattern']:<30} {p['evaluations']:>10} {p['matches']:>9} "
+            f"{p['seconds']:>9.3f} {worst['seconds'] * 1000:>9.2f} {worst['length']:>9}  {worst['file']}"
+        )
+
+
+def save_profile_json(profile: ScanProfile, path: Path) -> bool:
+    try:
+        path.write_text(json.dumps(profile.to_dict(), indent=2) + "\n", encoding="utf-8")
+    except OSError as e:
+        print(f"[ERROR] Could not write profile {path}: {e}", file=sys.stderr)
+        return False
+    print(f"[INFO] Pattern profile saved to {path}")
+    return True
@@ -1,9 +1,13 @@
 import json
 import sys
+import textwrap
+import time
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple
 
 from .models import Finding
+from .profiling import timed
 
 RESET = "\033[0m"
 BOLD = "\033[1m"
@@ -29,14 +33,18 @@ def colored(text: str, color: str) -> str:
     return f"{color}{text}{RESET}"
 
 
-def print_findings_console(findings: List[Finding], use_ai: bool = False) -> None:
-    if not findings:
-        print(colored("\n✅ SecuLint: No potential secrets or privacy leaks found.", FG_GREEN))
-        return
+class ConsoleReporter:
+    """Prints findings to the terminal as they arrive."""
 
-    print(colored("\n⚠️  SecuLint: Potential secrets / privacy leaks found:\n", FG_RED))
+    def __init__(self, use_ai: bool = False):
+        self.use_ai = use_ai
+        self.count = 0
+
+    def write(self, f: Finding) -> None:
+        if self.count == 0:
+            print(colored("\n⚠️  SecuLint: Potential secrets / privacy leaks found:\n", FG_RED))
+        self.count += 1
 
-    for f in findings:
         eff_sev = f.effective_severity()
         sev_color = SEVERITY_COLOR.get(eff_sev, FG_WHITE)
         sev_text = colored(eff_sev, sev_color)
@@ -46,8 +54,12 @@ def print_findings_console(findings: List[Finding], use_ai: bool = False) -> Non
         print(f"{BOLD}Pattern   :{RESET} {f.pattern_name} (severity: {sev_text})")
         print(f"{BOLD}Desc      :{RESET} {f.description}")
         print(f"{BOLD}Snippet   :{RESET} {colored(f.line_preview.strip(), FG_MAGENTA)}")
+        if f.locations:
+            print(f"{BOLD}Locations :{RESET} {len(f.locations)} files")
+            for location in f.locations:
+                print(f"            {location}")
 
-        if use_ai:
+        if self.use_ai:
             print(f"  AI Confirmed : {f.ai_confirmed}")
             print(f"  AI Severity  : {f.ai_severity}")
             print(f"  AI Type      : {f.ai_type}")
@@ -56,69 +68,132 @@ def print_findings_console(findings: List[Finding], use_ai: bool = False) -> Non
 
         print(colored("-" * 80, FG_WHITE))
 
+    def close(self) -> None:
+        if self.count == 0:
+            print(colored("\n✅ SecuLint: No potential secrets or privacy leaks found.", FG_GREEN))
+
+
+def print_findings_console(findings: Iterable[Finding], use_ai: bool = False) -> None:
+    report_findings(findings, [ConsoleReporter(use_ai=use_ai)])
+
+
+class JsonReporter:
+    """
+    Writes findings to a JSON array file one element at a time, producing
+    the same document `json.dump(..., indent=2)` would.
+    """
+
+    def __init__(self, json_path: Path):
+        self.json_path = json_path
+        self.count = 0
+        try:
+            self._fh: Optional[TextIO] = json_path.open("w", encoding="utf-8")
+        except OSError as e:
+            print(f"[ERROR] Could not save JSON report to {json_path}: {e}", file=sys.stderr)
+            self._fh = None
+
+    def write(self, f: Finding) -> None:
+        if self._fh is None:
+            return
+        element = json.dumps(f.to_dict(), indent=2, ensure_ascii=False)
+        self._fh.write(("[\n" if self.count == 0 else ",\n") + textwrap.indent(element, "  "))
+        self.count += 1
+
+    def close(self) -> None:
+        if self._fh is None:
+            return
+        try:
+            self._fh.write("\n]" if self.count else "[]")
+            self._fh.close()
+            print(f"[INFO] JSON report saved to {self.json_path}")
+        except OSError as e:
+            print(f"[ERROR] Could not save JSON report to {self.json_path}: {e}", file=sys.stderr)
+
+
+def save_findings_json(findings: Iterable[Finding], json_path: Path) -> None:
+    report_findings(findings, [JsonReporter(json_path)])
+
+
+class JsonlReporter:
+    """
+    Writes one compact JSON record per line as findings arrive, so the file
+    can be tailed or ingested while a scan is still running. The file ends
+    with a summary record holding totals and timing.
+    """
+
+    def __init__(self, jsonl_path: Path, flush_every: int = 100, flush_interval: float = 1.0):
+        self.jsonl_path = jsonl_path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.counts: Dict[str, int] = {}
+        self.total = 0
+        self._started = time.time()
+        self._last_flush = time.monotonic()
+        self._unflushed = 0
+        try:
+            self._fh: Optional[TextIO] = jsonl_path.open("w", encoding="utf-8")
+        except OSError as e:
+            print(f"[ERROR] Could not save JSONL report to {jsonl_path}: {e}", file=sys.stderr)
+            self._fh = None
+
+    def _write_record(self, record: Dict) -> None:
+        self._fh.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        self._fh.write("\n")
+
+    def write(self, f: Finding) -> None:
+        sev = f.effective_severity()
+        self.counts[sev] = self.counts.get(sev, 0) + 1
+        self.total += 1
+        if self._fh is None:
+            return
+
+        self._write_record({"type": "finding", **f.to_dict()})
+        self._unflushed += 1
+        if (
+            self._unflushed >= self.flush_every
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self._fh.flush()
+            self._unflushed = 0
+            self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        if self._fh is None:
+            return
+        finished = time.time()
+        try:
+            self._write_record(
+                {
+                    "type": "summary",
+                    "total": self.total,
+                    "by_severity": self.counts,
+                    "started_at": _isoformat(self._started),
+                    "finished_at": _isoformat(finished),
+                    "duration_seconds": round(finished - self._started, 3),
+                }
+            )
+            self._fh.close()
+            print(f"[INFO] JSONL report saved to {self.jsonl_path}")
+        except OSError as e:
+            print(f"[ERROR] Could not save JSONL report to {self.jsonl_path}: {e}", file=sys.stderr)
 
-def save_findings_json(findings: List[Finding], json_path: Path) -> None:
-    data = [f.to_dict() for f in findings]
-    try:
-        with json_path.open("w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        print(f"[INFO] JSON report saved to {json_path}")
-    except OSError as e:
-        print(f"[ERROR] Could not save JSON report to {json_path}: {e}", file=sys.stderr)
 
+def _isoformat(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
 
-def save_findings_html(findings: List[Finding], html_path: Path) -> None:
-    total = len(findings)
-    high = sum(1 for f in findings if f.effective_severity() == "HIGH")
-    medium = sum(1 for f in findings if f.effective_severity() == "MEDIUM")
-    low = sum(1 for f in findings if f.effective_severity() == "LOW")
 
-    def esc(s: str) -> str:
-        return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+def _script_json(value) -> str:
+    """Compact JSON that is safe to embed in a <script> element."""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).replace("<", "\\u003c")
 
-    if findings:
-        rows = []
-        for f in findings:
-            sev = f.effective_severity()
-            sev_class = sev.lower()
-            ai_badge = ""
-            if f.ai_confirmed is not None:
-                ai_badge = f'<div class="ai-pill">AI: {"✔" if f.ai_confirmed else "✖"} {esc(f.ai_severity or "")}</div>'
-            ai_reason = esc(f.ai_reason) if f.ai_reason else ""
-            rows.append(
-                f"""
-            <tr class="row-{sev_class}">
-                <td class="col-file">{esc(f.file_path)}</td>
-                <td class="col-line">{f.line_no}</td>
-                <td class="col-pattern">{esc(f.pattern_name)}</td>
-                <td class="col-severity">
-                    <span class="badge badge-{sev_class}">{esc(sev)}</span>
-                    {ai_badge}
-                </td>
-                <td class="col-desc">
-                    {esc(f.description)}
-                    <div class="ai-reason">{ai_reason}</div>
-                </td>
-                <td class="col-snippet"><pre>{esc(f.line_preview)}</pre></td>
-            </tr>
-            """
-            )
-        rows_html = "\n".join(rows)
-    else:
-        rows_html = """
-        <tr>
-            <td colspan="6" class="no-findings">No potential secrets or privacy leaks found.</td>
-        </tr>
-        """
-
-    # (HTML template exactly as you had, with theme toggle)
-    html = f"""<!DOCTYPE html>
+
+_HTML_HEAD = """<!DOCTYPE html>
 <html lang="en" data-theme="dark">
 <head>
 <meta charset="UTF-8">
 <title>SecuLint Report</title>
 <style>
-    :root {{
+    :root {
         --bg: #0f172a;
         --bg-alt: #020617;
         --bg-card: #020617;
@@ -130,9 +205,10 @@ def save_findings_html(findings: List[Finding], html_path: Path) -> None:
         --text-softer: #6b7280;
         --accent: #38bdf8;
         --accent-secondary: #f97316;
-    }}
+        --row-height: 40px;
+    }
 
-    :root[data-theme="light"] {{
+    :root[data-theme="light"] {
         --bg: #f9fafb;
         --bg-alt: #ffffff;
         --bg-card: #ffffff;
@@ -144,16 +220,16 @@ def save_findings_html(findings: List[Finding], html_path: Path) -> None:
         --text-softer: #9ca3af;
         --accent: #2563eb;
         --accent-secondary: #f97316;
-    }}
+    }
 
-    body {{
+    body {
         font-family: system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif;
         background: var(--bg);
         color: var(--text-main);
         margin: 0;
         padding: 0;
-    }}
-    .container {{
+    }
+    .container {
         max-width: 1200px;
         margin: 40px auto;
         padding: 24px;
@@ -161,30 +237,33 @@ def save_findings_html(findings: List[Finding], html_path: Path) -> None:
         border-radius: 16px;
         box-shadow: 0 20px 40px rgba(15,23,42,0.7);
         border: 1px solid var(--border-subtle);
-    }}
+    }
 
-    .toolbar {{
+    .toolbar {
         display: flex;
         justify-content: flex-end;
         margin-bottom: 12px;
-    }}
-    .theme-toggle {{
+    }
+    .theme-toggle, .controls select, .controls input, .pager button {
         border-radius: 999px;
         border: 1px solid var(--border-subtle);
         background: var(--bg-alt);
         color: var(--text-main);
         padding: 6px 12px;
         font-size: 12px;
+    }
+    .theme-toggle, .pager button {
         cursor: pointer;
-        display: inline-flex;
-        align-items: center;
-        gap: 6px;
-    }}
-    .theme-toggle:hover {{
+    }
+    .theme-toggle:hover, .pager button:hover:enabled {
         background: var(--bg-hover);
-    }}
+    }
+    .pager button:disabled {
+        opacity: 0.4;
+        cursor: default;
+    }
 
-    h1 {{
+    h1 {
         margin-top: 0;
         font-size: 26px;
         letter-spacing: 0.08em;
@@ -192,123 +271,142 @@ def save_findings_html(findings: List[Finding], html_path: Path) -> None:
         display: flex;
         align-items: center;
         gap: 8px;
-    }}
-    h1 .logo {{
+    }
+    h1 .logo {
         font-weight: 700;
         color: var(--accent);
-    }}
-    h1 .dot {{
+    }
+    h1 .dot {
         color: var(--accent-secondary);
-    }}
-    .summary {{
+    }
+    .summary {
         display: flex;
         flex-wrap: wrap;
         gap: 12px;
         margin: 18px 0 24px 0;
-    }}
-    .summary-card {{
+    }
+    .summary-card {
         background: var(--bg-alt);
         border-radius: 10px;
         padding: 10px 14px;
         border: 1px solid var(--border-subtle);
         min-width: 160px;
-    }}
-    .summary-label {{
+    }
+    .summary-label {
         font-size: 11px;
         text-transform: uppercase;
         letter-spacing: 0.08em;
         color: var(--text-muted);
-    }}
-    .summary-value {{
+    }
+    .summary-value {
         margin-top: 6px;
         font-size: 20px;
         font-weight: 600;
-    }}
-    .summary-value.total {{ color: var(--accent); }}
-    .summary-value.high {{ color: #f97373; }}
-    .summary-value.medium {{ color: #facc15; }}
-    .summary-value.low {{ color: #4ade80; }}
-
-    table {{
-        width: 100%;
-        border-collapse: collapse;
-        margin-top: 8px;
+    }
+    .summary-value.total { color: var(--accent); }
+    .summary-value.high { color: #f97373; }
+    .summary-value.medium { color: #facc15; }
+    .summary-value.low { color: #4ade80; }
+
+    .controls, .pager {
+        display: flex;
+        flex-wrap: wrap;
+        align-items: center;
+        gap: 8px;
+        margin-bottom: 10px;
+        font-size: 12px;
+        color: var(--text-muted);
+    }
+    .controls input {
+        flex: 1;
+        min-width: 200px;
+    }
+    .pager {
+        justify-content: flex-end;
+        margin: 10px 0 0 0;
+    }
+
+    .grid-row {
+        display: grid;
+        grid-template-columns: 24% 6% 18% 12% 40%;
+        align-items: center;
         font-size: 13px;
-        table-layout: fixed;
-    }}
-    thead tr {{
+    }
+    .grid-head {
         background: var(--bg-alt);
-    }}
-    thead th {{
-        text-align: left;
-        padding: 10px 8px;
         border-bottom: 1px solid var(--border-subtle);
         font-size: 11px;
         text-transform: uppercase;
         letter-spacing: 0.08em;
         color: var(--text-muted);
-    }}
-    tbody tr:nth-child(even) {{
-        background: var(--bg-card);
-    }}
-    tbody tr:nth-child(odd) {{
-        background: var(--bg-card);
-    }}
-    tbody tr:hover {{
-        background: var(--bg-hover);
-    }}
-    td {{
-        padding: 8px;
-        vertical-align: top;
+    }
+    .grid-head > div {
+        padding: 10px 8px;
+    }
+    .viewport {
+        position: relative;
+        height: 600px;
+        overflow-y: auto;
+    }
+    .viewport .grid-row {
+        position: absolute;
+        left: 0;
+        right: 0;
+        height: var(--row-height);
         border-bottom: 1px solid var(--border-soft);
-    }}
-
-    .col-file {{
-        width: 18%;
+        cursor: pointer;
+    }
+    .viewport .grid-row:hover, .viewport .grid-row.selected {
+        background: var(--bg-hover);
+    }
+    .viewport .grid-row > div {
+        padding: 0 8px;
+        overflow: hidden;
+        white-space: nowrap;
+        text-overflow: ellipsis;
+    }
+    .c-file, .c-snippet, .details pre {
         font-family: "JetBrains Mono", Menlo, Monaco, Consolas, monospace;
         font-size: 12px;
-        white-space: normal;
-        overflow-wrap: anywhere;
-    }}
-    .col-line {{
-        width: 4%;
+    }
+    .c-line {
         text-align: center;
         color: var(--text-muted);
-    }}
-    .col-pattern {{
-        width: 10%;
+    }
+    .c-pattern {
         font-weight: 500;
-        white-space: normal;
-        overflow-wrap: anywhere;
-    }}
-    .col-severity {{
-        width: 10%;
+    }
+    .c-severity {
         text-align: center;
-    }}
-    .col-desc {{
-        width: 18%;
-        color: var(--text-muted);
-        white-space: normal;
+    }
+
+    .details {
+        margin-top: 12px;
+        padding: 12px 14px;
+        background: var(--bg-alt);
+        border-radius: 10px;
+        border: 1px solid var(--border-subtle);
+        font-size: 13px;
+    }
+    .details[hidden] {
+        display: none;
+    }
+    .details .file {
+        font-family: "JetBrains Mono", Menlo, Monaco, Consolas, monospace;
         overflow-wrap: anywhere;
-    }}
-    .col-snippet {{
-        width: 40%;
-    }}
-    .col-snippet pre {{
-        margin: 0;
+    }
+    .details pre {
+        margin: 8px 0 0 0;
         padding: 10px 12px;
         background: var(--bg);
         border-radius: 6px;
-        font-family: "JetBrains Mono", Menlo, Monaco, Consolas, monospace;
-        font-size: 12px;
         color: var(--text-main);
         white-space: pre-wrap;
         word-break: break-word;
-        overflow-x: auto;
         border: 1px solid var(--border-soft);
-    }}
+    }
 
-    .badge {{
+    .badge {
         display: inline-block;
         padding: 2px 8px;
         border-radius: 999px;
@@ -316,51 +414,51 @@ def save_findings_html(findings: List[Finding], html_path: Path) -> None:
         font-weight: 600;
         letter-spacing: 0.08em;
         text-transform: uppercase;
-    }}
-    .badge-high {{
+    }
+    .badge-high {
         background: rgba(248,113,113,0.08);
         color: #fecaca;
         border: 1px solid rgba(248,113,113,0.4);
-    }}
-    .badge-medium {{
+    }
+    .badge-medium {
         background: rgba(250,204,21,0.08);
         color: #fef08a;
         border: 1px solid rgba(250,204,21,0.4);
-    }}
-    .badge-low {{
+    }
+    .badge-low {
         background: rgba(52,211,153,0.08);
         color: #bbf7d0;
         border: 1px solid rgba(52,211,153,0.4);
-    }}
-    .ai-pill {{
-        margin-top: 4px;
+    }
+    .ai-pill {
+        margin-left: 4px;
         font-size: 10px;
         padding: 2px 6px;
         border-radius: 999px;
         border: 1px solid #4b5563;
         color: #9ca3af;
         display: inline-block;
-    }}
-    .ai-reason {{
+    }
+    .ai-reason {
         margin-top: 4px;
         font-size: 11px;
         color: var(--text-softer);
-    }}
-    .no-findings {{
+    }
+    .no-findings {
         text-align: center;
         padding: 32px;
         color: var(--text-muted);
-    }}
-    .footer {{
+    }
+    .footer {
         margin-top: 20px;
         font-size: 11px;
         color: var(--text-softer);
         text-align: right;
-    }}
-    .footer .brand {{
+    }
+    .footer .brand {
         color: var(--accent);
         font-weight: 600;
-    }}
+    }
 </style>
 </head>
 <body>
@@ -374,88 +472,373 @@ def save_findings_html(findings: List[Finding], html_path: Path) -> None:
     <div class="summary">
         <div class="summary-card">
             <div class="summary-label">Total Findings</div>
-            <div class="summary-value total">{total}</div>
+            <div class="summary-value total" id="sum-total">0</div>
         </div>
         <div class="summary-card">
             <div class="summary-label">High Severity</div>
-            <div class="summary-value high">{high}</div>
+            <div class="summary-value high" id="sum-high">0</div>
         </div>
         <div class="summary-card">
             <div class="summary-label">Medium Severity</div>
-            <div class="summary-value medium">{medium}</div>
+            <div class="summary-value medium" id="sum-medium">0</div>
         </div>
         <div class="summary-card">
             <div class="summary-label">Low Severity</div>
-            <div class="summary-value low">{low}</div>
+            <div class="summary-value low" id="sum-low">0</div>
         </div>
     </div>
 
-    <table>
-        <thead>
-            <tr>
-                <th>File</th>
-                <th>Line</th>
-                <th>Pattern</th>
-                <th>Severity</th>
-                <th>Description</th>
-                <th>Snippet</th>
-            </tr>
-        </thead>
-        <tbody>
-            {rows_html}
-        </tbody>
-    </table>
+    <div class="controls">
+        <input id="filter-text" type="search" placeholder="Filter by file, pattern or snippet">
+        <select id="filter-severity">
+            <option value="">All severities</option>
+            <option value="HIGH">High</option>
+            <option value="MEDIUM">Medium</option>
+            <option value="LOW">Low</option>
+        </select>
+        <select id="filter-pattern">
+            <option value="">All patterns</option>
+        </select>
+        <select id="page-size">
+            <option value="500">500 / page</option>
+            <option value="2000" selected>2000 / page</option>
+            <option value="10000">10000 / page</option>
+        </select>
+    </div>
+
+    <div class="grid-row grid-head">
+        <div>File</div>
+        <div>Line</div>
+        <div>Pattern</div>
+        <div>Severity</div>
+        <div>Snippet</div>
+    </div>
+    <div class="viewport" id="viewport">
+        <div id="spacer"></div>
+        <div id="rows"></div>
+    </div>
+
+    <div class="pager">
+        <span id="page-info"></span>
+        <button id="page-prev">‹ Prev</button>
+        <button id="page-next">Next ›</button>
+    </div>
+
+    <div class="details" id="details" hidden></div>
 
     <div class="footer">
         Generated by <span class="brand">SecuLint</span> — Local Secret & Privacy Leak Scanner (with AI assist)
     </div>
 </div>
 
+<script type="application/json" id="seculint-rows">["""
+
+# Row layout shared by HtmlReporter.write and the page script below:
+# [file index, line, pattern index, severity, snippet, ai_confirmed,
+#  ai_severity, ai_reason, locations]
+_HTML_TAIL = """
 <script>
-(function() {{
+(function() {
     const root = document.documentElement;
     const btn = document.getElementById('theme-toggle');
 
-    function applyLabel(theme) {{
+    function applyLabel(theme) {
         if (!btn) return;
-        if (theme === 'light') {{
+        if (theme === 'light') {
             btn.textContent = '☀️ Light';
-        }} else {{
+        } else {
             btn.textContent = '🌙 Dark';
-        }}
-    }}
+        }
+    }
 
-    function setTheme(theme) {{
+    function setTheme(theme) {
         root.setAttribute('data-theme', theme);
-        try {{
+        try {
             localStorage.setItem('seculint-theme', theme);
-        }} catch (e) {{}}
+        } catch (e) {}
         applyLabel(theme);
-    }}
+    }
 
     let stored = null;
-    try {{
+    try {
         stored = localStorage.getItem('seculint-theme');
-    }} catch (e) {{}}
+    } catch (e) {}
 
     const initial = stored || 'dark';
     setTheme(initial);
 
-    if (btn) {{
-        btn.addEventListener('click', function () {{
+    if (btn) {
+        btn.addEventListener('click', function () {
             const current = root.getAttribute('data-theme') || 'dark';
             const next = current === 'dark' ? 'light' : 'dark';
             setTheme(next);
-        }});
-    }}
-}})();
+        });
+    }
+})();
+
+(function() {
+    const rows = JSON.parse(document.getElementById('seculint-rows').textContent);
+    const meta = JSON.parse(document.getElementById('seculint-meta').textContent);
+    const files = meta.files;
+    const patterns = meta.patterns;
+
+    const $ = (id) => document.getElementById(id);
+    const viewport = $('viewport');
+    const spacer = $('spacer');
+    const layer = $('rows');
+    const details = $('details');
+    const rowHeight = parseInt(
+        getComputedStyle(document.documentElement).getPropertyValue('--row-height'), 10
+    ) || 40;
+    const overscan = 10;
+
+    function esc(s) {
+        return String(s == null ? '' : s)
+            .replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+    }
+
+    $('sum-total').textContent = meta.total;
+    $('sum-high').textContent = meta.by_severity.HIGH || 0;
+    $('sum-medium').textContent = meta.by_severity.MEDIUM || 0;
+    $('sum-low').textContent = meta.by_severity.LOW || 0;
+
+    const patternSelect = $('filter-pattern');
+    patterns
+        .map((p, i) => [p[0], i])
+        .sort((a, b) => a[0].localeCompare(b[0]))
+        .forEach(([name, i]) => {
+            const opt = document.createElement('option');
+            opt.value = String(i);
+            opt.textContent = name;
+            patternSelect.appendChild(opt);
+        });
+
+    let haystack = null;
+    let filtered = [];
+    let pageRows = [];
+    let page = 0;
+    let selected = -1;
+
+    function pageSize() { return parseInt($('page-size').value, 10); }
+
+    function applyFilters() {
+        const text = $('filter-text').value.trim().toLowerCase();
+        const severity = $('filter-severity').value;
+        const pattern = patternSelect.value === '' ? -1 : parseInt(patternSelect.value, 10);
+        if (text && haystack === null) {
+            haystack = rows.map((r) => (files[r[0]] + '\\n' + patterns[r[2]][0] + '\\n' + r[4]).toLowerCase());
+        }
+        filtered = [];
+        for (let i = 0; i < rows.length; i++) {
+            const r = rows[i];
+            if (severity && r[3] !== severity) continue;
+            if (pattern >= 0 && r[2] !== pattern) continue;
+            if (text && haystack[i].indexOf(text) === -1) continue;
+            filtered.push(i);
+        }
+        page = 0;
+        renderPage();
+    }
+
+    function renderPage() {
+        const size = pageSize();
+        const pages = Math.max(1, Math.ceil(filtered.length / size));
+        page = Math.min(page, pages - 1);
+        pageRows = filtered.slice(page * size, (page + 1) * size);
+        spacer.style.height = (pageRows.length * rowHeight) + 'px';
+        viewport.scrollTop = 0;
+        $('page-info').textContent = filtered.length
+            ? 'Page ' + (page + 1) + ' of ' + pages + ' — ' + filtered.length + ' of ' + rows.length + ' findings'
+            : '';
+        $('page-prev').disabled = page === 0;
+        $('page-next').disabled = page >= pages - 1;
+        renderVisible();
+    }
+
+    function rowHtml(i, top) {
+        const r = rows[i];
+        const sev = r[3];
+        const cls = sev.toLowerCase();
+        let ai = '';
+        if (r[5] !== null) {
+            ai = '<span class="ai-pill">AI: ' + (r[5] ? '✔' : '✖') + ' ' + esc(r[6]) + '</span>';
+        }
+        return '<div class="grid-row row-' + esc(cls) + (i === selected ? ' selected' : '') +
+            '" data-i="' + i + '" style="top:' + top + 'px">' +
+            '<div class="c-file" title="' + esc(files[r[0]]) + '">' + esc(files[r[0]]) + '</div>' +
+            '<div class="c-line">' + r[1] + '</div>' +
+            '<div class="c-pattern" title="' + esc(patterns[r[2]][1]) + '">' + esc(patterns[r[2]][0]) + '</div>' +
+            '<div class="c-severity"><span class="badge badge-' + esc(cls) + '">' + esc(sev) + '</span>' + ai + '</div>' +
+            '<div class="c-snippet">' + esc(r[4]) + '</div>' +
+            '</div>';
+    }
+
+    // Only the rows in view (plus a small margin) exist in the DOM.
+    function renderVisible() {
+        if (!rows.length) {
+            layer.innerHTML = '<div class="no-findings">No potential secrets or privacy leaks found.</div>';
+            return;
+        }
+        if (!pageRows.length) {
+            layer.innerHTML = '<div class="no-findings">No findings match the filters.</div>';
+            return;
+        }
+        const first = Math.max(0, Math.floor(viewport.scrollTop / rowHeight) - overscan);
+        const last = Math.min(
+            pageRows.length,
+            Math.ceil((viewport.scrollTop + viewport.clientHeight) / rowHeight) + overscan
+        );
+        const html = [];
+        for (let k = first; k < last; k++) {
+            html.push(rowHtml(pageRows[k], k * rowHeight));
+        }
+        layer.innerHTML = html.join('');
+    }
+
+    function showDetails(i) {
+        const r = rows[i];
+        selected = i;
+        let html = '<div class="file">' + esc(files[r[0]]) + ':' + r[1] + '</div>' +
+            '<div>' + esc(patterns[r[2]][0]) + ' — ' + esc(patterns[r[2]][1]) + '</div>' +
+            '<pre>' + esc(r[4]) + '</pre>';
+        if (r[7]) {
+            html += '<div class="ai-reason">' + esc(r[7]) + '</div>';
+        }
+        if (r[8]) {
+            html += '<div class="ai-reason">Also in ' + r[8].length + ' files:<br>' +
+                r[8].map(esc).join('<br>') + '</div>';
+        }
+        details.innerHTML = html;
+        details.hidden = false;
+        renderVisible();
+    }
+
+    let scheduled = false;
+    viewport.addEventListener('scroll', function () {
+        if (scheduled) return;
+        scheduled = true;
+        requestAnimationFrame(function () {
+            scheduled = false;
+            renderVisible();
+        });
+    });
+    layer.addEventListener('click', function (e) {
+        const row = e.target.closest('[data-i]');
+        if (row) showDetails(parseInt(row.getAttribute('data-i'), 10));
+    });
+
+    let debounce = null;
+    $('filter-text').addEventListener('input', function () {
+        clearTimeout(debounce);
+        debounce = setTimeout(applyFilters, 150);
+    });
+    $('filter-severity').addEventListener('change', applyFilters);
+    patternSelect.addEventListener('change', applyFilters);
+    $('page-size').addEventListener('change', function () {
+        page = 0;
+        renderPage();
+    });
+    $('page-prev').addEventListener('click', function () {
+        page -= 1;
+        renderPage();
+    });
+    $('page-next').addEventListener('click', function () {
+        page += 1;
+        renderPage();
+    });
+
+    applyFilters();
+})();
 </script>
 </body>
 </html>"""
 
+
+class HtmlReporter:
+    """
+    Streams the HTML report. The page shell is written up front and each
+    finding is appended as one compact JSON array, with file paths and
+    patterns stored once in lookup tables that follow the data along with
+    the severity totals. The page renders only the rows in view and pages
+    and filters on the client, so the file and the time to produce it grow
+    linearly with the findings and a browser stays responsive at 100k rows.
+    """
+
+    def __init__(self, html_path: Path):
+        self.html_path = html_path
+        self.counts = {"HIGH": 0, "MEDIUM": 0, "LOW": 0}
+        self.total = 0
+        self._files: Dict[str, int] = {}
+        self._patterns: Dict[Tuple[str, str], int] = {}
+        try:
+            self._fh: Optional[TextIO] = html_path.open("w", encoding="utf-8")
+            self._fh.write(_HTML_HEAD)
+        except OSError as e:
+            print(f"[ERROR] Could not save HTML report to {html_path}: {e}", file=sys.stderr)
+            self._fh = None
+
+    def write(self, f: Finding) -> None:
+        sev = f.effective_severity()
+        self.counts[sev] = self.counts.get(sev, 0) + 1
+        self.total += 1
+        if self._fh is None:
+            return
+
+        file_idx = self._files.setdefault(f.file_path, len(self._files))
+        pattern_idx = self._patterns.setdefault(
+            (f.pattern_name, f.description), len(self._patterns)
+        )
+        row = [
+            file_idx,
+            f.line_no,
+            pattern_idx,
+            sev,
+            f.line_preview.strip(),
+            f.ai_confirmed,
+            f.ai_severity,
+            f.ai_reason,
+            f.locations,
+        ]
+        self._fh.write(("\n" if self.total == 1 else ",\n") + _script_json(row))
+
+    def close(self) -> None:
+        if self._fh is None:
+            return
+        meta = {
+            "total": self.total,
+            "by_severity": self.counts,
+            "files": list(self._files),
+            "patterns": [list(key) for key in self._patterns],
+        }
+        try:
+            self._fh.write("\n]</script>\n")
+            self._fh.write(
+                f'<script type="application/json" id="seculint-meta">{_script_json(meta)}</script>'
+            )
+            self._fh.write(_HTML_TAIL)
+            self._fh.close()
+            print(f"[INFO] HTML report saved to {self.html_path}")
+        except OSError as e:
+            print(f"[ERROR] Could not save HTML report to {self.html_path}: {e}", file=sys.stderr)
+
+
+def save_findings_html(findings: Iterable[Finding], html_path: Path) -> None:
+    report_findings(findings, [HtmlReporter(html_path)])
+
+
+def report_findings(findings: Iterable[Finding], reporters: List) -> int:
+    """
+    Feed each finding to every reporter as soon as it is produced, then
+    close them. Returns the number of findings seen.
+    """
+    writers = [timed("report", reporter.write) for reporter in reporters]
+    count = 0
     try:
-        with html_path.open("w", encoding="utf-8") as f:
-            f.write(html)
-        print(f"[INFO] HTML report saved to {html_path}")
-    except OSError as e:
-        print(f"[ERROR] Could not save HTML report to {html_path}: {e}", file=sys.stderr)
+        for f in findings:
+            count += 1
+            for write in writers:
+                write(f)
+    finally:
+        for reporter in reporters:
+            timed("report", reporter.close)()
+    return count
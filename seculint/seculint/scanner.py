@@ -1,113 +1,1037 @@
+import hashlib
+import mmap
 import os
+import re
+import stat
+import sys
+import weakref
+from collections import OrderedDict, deque
+from dataclasses import replace
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import chain, groupby, islice
 from pathlib import Path
-from typing import List, Optional, Dict, Iterable
-from .ignore import is_ignored
-from .models import Finding
+from typing import Deque, List, Optional, Dict, Iterable, Iterator, Set, Tuple, Union
+from .cache import DEFAULT_CACHE_DIRNAME, ScanCache, findings_from_records
+from .git_utils import (
+    get_untracked_files,
+    iter_added_hunks,
+    iter_blob_locations,
+    iter_history_blobs,
+)
+from . import profiling
+from .ignore import IgnoreMatcher, compile_ignore_patterns
+from .limits import DEFAULT_SCAN_LIMITS, ScanBudget, ScanLimits
+from .models import Finding, bounded_preview, intern_text
+from .patterns import LineIndex, PatternSet, match_span
+from .profiling import timed
 
+# Files above this size are memory-mapped and scanned in chunks instead of
+# being read and decoded whole.
+DEFAULT_STREAM_THRESHOLD_BYTES = 5 * 1024 * 1024
+STREAM_CHUNK_BYTES = 4 * 1024 * 1024
+# Chunks end on a line boundary, so only a line longer than a chunk is cut;
+# reading past the cut keeps a match that straddles it whole. Multiline
+# patterns do not rely on this: they are searched over the whole file.
+STREAM_OVERLAP_BYTES = 64 * 1024
 
-def should_scan_file(
-    path: Path,
-    max_size_bytes: int,
+# Parallel scans send paths to workers in batches of this size, and only
+# start a pool once the walk has produced at least PARALLEL_MIN_FILES files.
+PARALLEL_BATCH_SIZE = 64
+PARALLEL_MIN_FILES = 256
+
+
+BINARY_EXTS = frozenset({
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico",
+    ".pdf", ".exe", ".dll", ".zip", ".tar", ".so",
+    ".pyc", ".db", ".sqlite", ".woff", ".woff2",
+    ".class", ".jar", ".whl", ".gz", ".7z", ".mp3", ".mp4",
+})
+
+# Files with other extensions are classified from their first bytes: a NUL
+# byte, or more than BINARY_NON_TEXT_RATIO of control bytes, marks them as
+# binary before the rest of the file is read.
+BINARY_SNIFF_BYTES = 8192
+BINARY_NON_TEXT_RATIO = 0.30
+_TEXT_BYTES = bytes(range(0x20, 0x7F)) + b"\t\n\r\f\b\x1b" + bytes(range(0x80, 0x100))
+
+# Binary verdicts by path, so no file is sniffed twice in a run.
+_binary_verdicts: Dict[str, bool] = {}
+
+# Bounds of the content memo below: the digests it remembers, and the
+# findings it retains across them. Past either, the least recently used
+# results are dropped, so memory stays flat however many findings a scan
+# streams through.
+CONTENT_RESULTS_MAX_ENTRIES = 50_000
+CONTENT_RESULTS_MAX_FINDINGS = 10_000
+
+
+class _ContentResults:
+    """
+    Scan results by content digest, so identical files (vendored libraries,
+    copied config templates) are scanned once and their findings
+    reattributed to every copy. Values hold (line_no, pattern_name,
+    severity, description, line_preview, match_start, match_end) tuples.
+    """
+
+    def __init__(self):
+        self._results: "OrderedDict[bytes, Tuple]" = OrderedDict()
+        self._findings = 0
+
+    def get(self, digest: bytes) -> Optional[Tuple]:
+        records = self._results.get(digest)
+        if records is not None:
+            self._results.move_to_end(digest)
+        return records
+
+    def put(self, digest: bytes, records: Tuple) -> None:
+        if len(records) > CONTENT_RESULTS_MAX_FINDINGS:
+            return
+        self._results[digest] = records
+        self._findings += len(records)
+        while (
+            len(self._results) > CONTENT_RESULTS_MAX_ENTRIES
+            or self._findings > CONTENT_RESULTS_MAX_FINDINGS
+        ):
+            _, dropped = self._results.popitem(last=False)
+            self._findings -= len(dropped)
+
+
+# Per PatternSet, since results depend on the patterns.
+_content_results: "weakref.WeakKeyDictionary[PatternSet, _ContentResults]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Per-process counters reported by `--debug`: files handed to scan_file,
+# the stat() calls made while walking and scanning them, files rejected
+# as binary by content, files answered from an identical copy, and files
+# only partially scanned because they hit a scan budget.
+scan_stats: Dict[str, int] = {
+    "files_scanned": 0,
+    "stat_calls": 0,
+    "binary_skipped": 0,
+    "duplicates": 0,
+    "partial": 0,
+}
+
+
+def _stat(path: Path) -> os.stat_result:
+    scan_stats["stat_calls"] += 1
+    return timed("stat", path.stat)()
+
+
+def _suffix(name: str) -> str:
+    """Lower-cased extension of a file name, computed as `Path.suffix` does."""
+    i = name.rfind(".")
+    if 0 < i < len(name) - 1:
+        return name[i:].lower()
+    return ""
+
+
+def _extension_allowed(
+    ext: str,
     include_ext: Optional[List[str]],
     exclude_ext: Optional[List[str]],
 ) -> bool:
-    """Applies size, extension, and binary-type filters."""
-    if not path.is_file():
+    if include_ext is not None and ext not in include_ext:
+        return False
+
+    if exclude_ext is not None and ext in exclude_ext:
         return False
 
+    return ext not in BINARY_EXTS
+
+
+def looks_binary(header: bytes) -> bool:
+    """True if the leading bytes of a file look like binary data rather than text."""
+    if not header:
+        return False
+    if b"\0" in header:
+        return True
+    non_text = len(header.translate(None, _TEXT_BYTES))
+    return non_text > len(header) * BINARY_NON_TEXT_RATIO
+
+
+def clear_scan_caches() -> None:
+    """Forget the binary verdicts and content results of earlier scans."""
+    _binary_verdicts.clear()
+    _content_results.clear()
+
+
+def _record_binary(key: str, header: bytes) -> bool:
+    binary = looks_binary(header)
+    _binary_verdicts[key] = binary
+    if binary:
+        scan_stats["binary_skipped"] += 1
+    return binary
+
+
+def _is_binary_file(path: Path) -> bool:
+    """The binary verdict for `path`, sniffing its first block if not known yet."""
+    file_path = str(path)
+    verdict = _binary_verdicts.get(file_path)
+    if verdict is not None:
+        return verdict
     try:
-        size = path.stat().st_size
+        with path.open("rb") as f:
+            header = f.read(BINARY_SNIFF_BYTES)
     except OSError:
         return False
+    return _record_binary(file_path, header)
 
-    if size > max_size_bytes:
-        return False
 
-    ext = path.suffix.lower()
+def should_scan_file(
+    path: Path,
+    max_size_bytes: Optional[int],
+    include_ext: Optional[List[str]],
+    exclude_ext: Optional[List[str]],
+) -> bool:
+    """
+    Applies size, extension, and binary-type filters.
+    `max_size_bytes` is a hard cap; pass None to accept files of any size.
+    Extensions are checked first, so rejected files cost no system call.
+    """
+    if not _extension_allowed(_suffix(path.name), include_ext, exclude_ext):
+        return False
 
-    if include_ext is not None and ext not in include_ext:
+    try:
+        st = _stat(path)
+    except OSError:
         return False
 
-    if exclude_ext is not None and ext in exclude_ext:
+    if not stat.S_ISREG(st.st_mode):
         return False
 
-    binary_exts = {
-        ".png", ".jpg", ".jpeg", ".gif", ".bmp",
-        ".pdf", ".exe", ".dll", ".zip", ".tar", ".so",
-        ".pyc", ".db", ".sqlite", ".woff", ".woff2",
-    }
-    if ext in binary_exts:
+    if max_size_bytes is not None and st.st_size > max_size_bytes:
         return False
 
     return True
 
 
-def scan_file(path: Path, active_patterns: List[Dict]) -> Iterable[Finding]:
-    """Reads a file line by line and yields findings for matching patterns."""
+def scan_file(
+    path: Path,
+    active_patterns: Union[PatternSet, List[Dict]],
+    stream_threshold_bytes: Optional[int] = DEFAULT_STREAM_THRESHOLD_BYTES,
+    cache: Optional[ScanCache] = None,
+    limits: Optional[ScanLimits] = None,
+) -> Iterable[Finding]:
+    """
+    Reads a file and yields findings for matching patterns, in line order.
+    Files larger than `stream_threshold_bytes` are scanned in streaming mode.
+    With a `cache`, unchanged files are answered from previous runs.
+    Files that exceed a budget of `limits` yield what was found in time and
+    are reported as partially scanned.
+    """
+    if not isinstance(active_patterns, PatternSet):
+        active_patterns = PatternSet(active_patterns)
+
+    scan_stats["files_scanned"] += 1
+    st = None
+    if stream_threshold_bytes is not None or cache is not None:
+        try:
+            st = _stat(path)
+        except OSError:
+            return
+
+    content_hash = None
+    if cache is not None:
+        # Sniff before the cache hashes the file, so a large binary is
+        # rejected after its first block instead of being read in full.
+        records, content_hash = cache.lookup(path, st, lambda: _is_binary_file(path))
+        if records is not None:
+            yield from findings_from_records(path, records)
+            return
+
+    budget = (limits or DEFAULT_SCAN_LIMITS).budget()
+    if stream_threshold_bytes is not None and st.st_size > stream_threshold_bytes:
+        findings = scan_file_streaming(path, active_patterns, budget)
+    else:
+        findings = _scan_text_file(path, active_patterns, budget)
+
+    if content_hash is None:
+        yield from findings
+    else:
+        scanned: List[Finding] = []
+        for finding in findings:
+            scanned.append(finding)
+            yield finding
+        if budget.partial is None:
+            cache.store(path, st, content_hash, scanned)
+
+    if budget.partial is not None:
+        _report_partial(str(path), budget.partial)
+
+
+def _report_partial(file_path: str, reason: str) -> None:
+    scan_stats["partial"] += 1
+    print(f"[WARN] Partially scanned {file_path}: {reason}", file=sys.stderr)
+
+
+def _apply_size_budget(data: bytes, budget: ScanBudget) -> bytes:
+    """`data` cut after the last whole line within the file size budget."""
+    max_bytes = budget.limits.max_file_bytes
+    if not max_bytes or len(data) <= max_bytes:
+        return data
+    budget.stop(f"file size budget of {max_bytes} bytes exceeded")
+    cut = data.rfind(b"\n", 0, max_bytes) + 1
+    return data[: cut or max_bytes]
+
+
+def _read_text_file(path: Path, file_path: str) -> Optional[bytes]:
+    """Contents of `path`, or None if it is unreadable or binary."""
     try:
-        text = path.read_text(encoding="utf-8", errors="ignore")
+        with path.open("rb") as f:
+            header = f.read(BINARY_SNIFF_BYTES)
+            if _record_binary(file_path, header):
+                return None
+            return header + f.read()
     except OSError:
+        return None
+
+
+def _scan_text_file(
+    path: Path, active_patterns: PatternSet, budget: Optional[ScanBudget] = None
+) -> Iterable[Finding]:
+    file_path = str(path)
+    if _binary_verdicts.get(file_path):
         return
 
-    for i, line in enumerate(text.splitlines(), start=1):
-        for p in active_patterns:
-            if p["regex"].search(line):
-                yield Finding(
-                    file_path=str(path),
-                    line_no=i,
-                    pattern_name=p["name"],
-                    severity=p["severity"],
-                    description=p["description"],
-                    line_preview=line,
+    data = timed("read", _read_text_file)(path, file_path)
+    if data is None:
+        return
+    if budget is not None:
+        data = _apply_size_budget(data, budget)
+
+    # Results of a cut file must not stand in for a whole one.
+    known: Optional[_ContentResults] = None
+    if budget is None or budget.partial is None:
+        known = _content_results.get(active_patterns)
+        if known is None:
+            known = _content_results[active_patterns] = _ContentResults()
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    records = known.get(digest) if known is not None else None
+    if records is not None:
+        scan_stats["duplicates"] += 1
+        for record in records:
+            yield _finding(file_path, *record)
+        return
+
+    text = timed("decode", _decode_text)(data)
+    del data
+    findings = timed("match", _scan_text)(file_path, text, active_patterns, 1, budget)
+    partial = budget is not None and budget.partial is not None
+    if known is not None and not partial:
+        known.put(
+            digest,
+            tuple(
+                (
+                    f.line_no,
+                    f.pattern_name,
+                    f.severity,
+                    f.description,
+                    f.line_preview,
+                    f.match_start,
+                    f.match_end,
                 )
+                for f in findings
+            ),
+        )
+    yield from findings
 
 
-def walk_and_scan(
+def _decode_text(data: bytes) -> str:
+    """Same text read_text() would produce: lenient UTF-8, universal newlines."""
+    text = data.decode("utf-8", errors="ignore")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def _finding(
+    file_path: str,
+    line_no: int,
+    pattern_name: str,
+    severity: str,
+    description: str,
+    line_preview: str,
+    match_start: Optional[int],
+    match_end: Optional[int],
+) -> Finding:
+    line_preview, match_start, match_end = bounded_preview(line_preview, match_start, match_end)
+    return Finding(
+        file_path=file_path,
+        line_no=line_no,
+        pattern_name=intern_text(pattern_name),
+        severity=intern_text(severity),
+        description=intern_text(description),
+        line_preview=line_preview,
+        match_start=match_start,
+        match_end=match_end,
+    )
+
+
+def _scan_text(
+    file_path: str,
+    text: str,
+    active_patterns: PatternSet,
+    first_line: int = 1,
+    budget: Optional[ScanBudget] = None,
+) -> List[Finding]:
+    if profiling.active is not None:
+        profiling.active.current_file = file_path
+    low = text.lower()
+    candidates = active_patterns.select(text, low)
+    if not candidates:
+        return []
+
+    findings = []
+    for line_no, line, p in candidates.scan_buffer(text, low, first_line=first_line, budget=budget):
+        span = match_span(p, line, budget) or (None, None)
+        findings.append(
+            _finding(file_path, line_no, p["name"], p["severity"], p["description"], line, *span)
+        )
+    return findings
+
+
+def scan_lines(
+    path: Path,
+    lines: List[str],
+    first_line: int,
+    active_patterns: Union[PatternSet, List[Dict]],
+    limits: Optional[ScanLimits] = None,
+) -> Iterator[Finding]:
+    """
+    Scan a block of consecutive lines of `path` that starts at line
+    `first_line`, such as the lines added by a diff hunk.
+    """
+    if not isinstance(active_patterns, PatternSet):
+        active_patterns = PatternSet(active_patterns)
+    budget = (limits or DEFAULT_SCAN_LIMITS).budget()
+    yield from timed("match", _scan_text)(
+        str(path), "\n".join(lines), active_patterns, first_line, budget
+    )
+    if budget.partial is not None:
+        _report_partial(str(path), budget.partial)
+
+
+def scan_file_streaming(
+    path: Path, active_patterns: PatternSet, budget: Optional[ScanBudget] = None
+) -> Iterable[Finding]:
+    """
+    Scans a file of any size through a read-only memory map with the bytes
+    versions of the patterns. The file is never read or decoded whole: it is
+    processed in line-aligned chunks that overlap their successor, so memory
+    stays flat regardless of file size. Multiline patterns are searched over
+    the whole map, so their matches may run past any chunk. Scanning stops
+    early when `budget` runs out.
+    """
+    if budget is None:
+        budget = DEFAULT_SCAN_LIMITS.budget()
+    patterns = active_patterns.bytes_view()
+    if not patterns:
+        return
+    rank = {p["name"]: i for i, p in enumerate(patterns)}
+    multiline, patterns = patterns.split_multiline()
+
+    file_path = str(path)
+    if _binary_verdicts.get(file_path):
+        return
+
+    try:
+        f = path.open("rb")
+    except OSError:
+        return
+
+    with f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # ValueError: empty file
+            return
+
+        with mm:
+            if _record_binary(file_path, mm[:BINARY_SNIFF_BYTES]):
+                return
+
+            if hasattr(mm, "madvise"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+
+            read = timed("read", mm.__getitem__)
+            scan_window = timed("match", _scan_window)
+            size = len(mm)
+            start = 0
+            first_line = 1
+            # A line cut by a chunk boundary continues into the next chunk;
+            # remember what was reported for it to avoid duplicates.
+            carry_line, carry = 0, set()
+
+            max_bytes = budget.limits.max_file_bytes
+            if max_bytes and size > max_bytes:
+                # Only the whole lines within the size budget are scanned.
+                budget.stop(f"file size budget of {max_bytes} bytes exceeded")
+                size = mm.rfind(b"\n", 0, max_bytes) + 1 or max_bytes
+            spanning_starts = timed("match", _SpanningSearch(mm, size, multiline).starts)
+            while start < size and not budget.expired():
+                stop = min(start + STREAM_CHUNK_BYTES, size)
+                if stop < size:
+                    newline = mm.rfind(b"\n", start, stop)
+                    if newline != -1:
+                        stop = newline + 1
+                window = read(slice(start, min(stop + STREAM_OVERLAP_BYTES, size)))
+                core_len = stop - start
+                next_first_line = first_line + window.count(b"\n", 0, core_len)
+
+                findings, reported = scan_window(
+                    file_path,
+                    patterns,
+                    window,
+                    first_line,
+                    core_len,
+                    next_first_line,
+                    carry_line,
+                    carry,
+                    budget,
+                )
+                starts = spanning_starts(start, stop, budget)
+                if starts:
+                    index = LineIndex(window, first_line)
+                    for pos, p in starts:
+                        line_start, line_end = index.line_bounds(pos - start)
+                        line = index.line(line_start, line_end)
+                        line_no = index.line_no(line_start)
+                        findings.append(_window_finding(file_path, line_no, line, p, budget))
+                    findings.sort(key=lambda f: (f.line_no, rank[f.pattern_name]))
+                yield from findings
+
+                carry_line, carry = next_first_line, reported
+                if hasattr(mmap, "MADV_DONTNEED"):
+                    # Drop the pages already scanned so RSS does not grow
+                    # with the file.
+                    page_start = start - start % mmap.PAGESIZE
+                    mm.madvise(mmap.MADV_DONTNEED, page_start, stop - page_start)
+                first_line = next_first_line
+                start = stop
+
+
+def _scan_window(
+    file_path: str,
+    patterns: PatternSet,
+    window: bytes,
+    first_line: int,
+    core_len: int,
+    next_first_line: int,
+    carry_line: int,
+    carry: Set[str],
+    budget: Optional[ScanBudget] = None,
+) -> Tuple[List[Finding], Set[str]]:
+    """
+    Findings of one streamed chunk whose first `core_len` bytes are its own,
+    and the patterns reported on `next_first_line`, which continues into the
+    next chunk. Patterns in `carry` were already reported on `carry_line`.
+    """
+    if profiling.active is not None:
+        profiling.active.current_file = file_path
+    low = window.lower()
+    candidates = patterns.select(window, low)
+    findings: List[Finding] = []
+    reported: Set[str] = set()
+    for line_no, line, p in candidates.scan_buffer(
+        window, low, first_line=first_line, limit=core_len, budget=budget
+    ):
+        if line_no == carry_line and p["name"] in carry:
+            continue
+        if line_no == next_first_line:
+            reported.add(p["name"])
+        findings.append(_window_finding(file_path, line_no, line, p, budget))
+    return findings, reported
+
+
+def _window_finding(
+    file_path: str, line_no: int, line: bytes, p: Dict, budget: Optional[ScanBudget]
+) -> Finding:
+    span = match_span(p, line, budget)
+    if span is not None:
+        # Byte offsets to offsets in the decoded line.
+        col = len(line[: span[0]].decode("utf-8", errors="ignore"))
+        span = (col, col + len(line[span[0] : span[1]].decode("utf-8", errors="ignore")))
+    return _finding(
+        file_path,
+        line_no,
+        p["name"],
+        p["severity"],
+        p["description"],
+        line.decode("utf-8", errors="ignore"),
+        *(span or (None, None)),
+    )
+
+
+class _SpanningSearch:
+    """
+    Multiline patterns searched over the first `size` bytes of a memory-mapped
+    file rather than chunk by chunk, so a match is found however far it runs
+    past the chunk it starts in. Each pattern keeps the next match it found,
+    so the file is searched about once per pattern whatever its chunk count.
+    """
+
+    def __init__(self, mm: mmap.mmap, size: int, patterns: List[Dict]):
+        self.mm = mm
+        self.size = size
+        self.patterns = patterns
+        self._pos = [0] * len(patterns)
+        self._match: List[Optional[re.Match]] = [None] * len(patterns)
+        self._exhausted = [False] * len(patterns)
+
+    def starts(
+        self, start: int, stop: int, budget: Optional[ScanBudget] = None
+    ) -> List[Tuple[int, Dict]]:
+        """
+        (offset, pattern) of each match starting in [start, stop), at most
+        one per pattern and line, as scan_buffer reports them.
+        """
+        hits: List[Tuple[int, Dict]] = []
+        for i, p in enumerate(self.patterns):
+            while budget is None or not budget.expired():
+                pos = max(start, self._pos[i])
+                m = self._match[i]
+                # A match found from an earlier position is still the first
+                # one from any later position up to its start.
+                if m is None or m.start() < pos:
+                    if self._exhausted[i]:
+                        break
+                    m = p["regex"].search(self.mm, pos, self.size)
+                    self._pos[i], self._match[i] = pos, m
+                    if m is None:
+                        self._exhausted[i] = True
+                        break
+                if m.start() >= stop:
+                    break
+                hits.append((m.start(), p))
+                # Resume on the next line, so a start line inside the span
+                # is still reported.
+                line_end = self.mm.find(b"\n", m.start(), self.size)
+                self._pos[i] = self.size if line_end == -1 else line_end + 1
+                self._match[i] = None
+        return hits
+
+
+def _list_dir(dirpath: str) -> List[os.DirEntry]:
+    """Entries of `dirpath` sorted by name, or none if it cannot be read."""
+    try:
+        with os.scandir(dirpath) as it:
+            return sorted(it, key=lambda e: e.name)
+    except OSError:
+        return []
+
+
+def iter_scan_targets(
     root: Path,
-    max_size_mb: int,
     include_ext: Optional[List[str]],
     exclude_ext: Optional[List[str]],
-    ignore_patterns: List[str],
-    active_patterns: List[Dict],
-    debug_ignore: bool = False,  # 👈 new flag
-) -> List[Finding]:
+    ignore_patterns: Union[List[str], IgnoreMatcher],
+    debug_ignore: bool = False,
+) -> Iterator[Path]:
     """
-    Recursively walk the directory tree from `root` and scan matching files.
-    Properly respects .seculintignore rules and skips ignored directories.
-    Set `debug_ignore=True` to print skipped files/directories.
+    Walk the directory tree from `root` and yield the files to scan.
+    Directories and files are visited in sorted order so reports are
+    reproducible across runs and machines.
+
+    Built on `os.scandir`: file types come from the cached `DirEntry` data
+    and extension filters run first, so no file is stat'ed during the walk
+    (symlinks excepted). Symlinked directories are not followed.
     """
-    max_size_bytes = max_size_mb * 1024 * 1024
-    findings: List[Finding] = []
     root = root.resolve()
+    ignore = compile_ignore_patterns(ignore_patterns)
+    list_dir = timed("walk", _list_dir)
+    is_ignored = timed("ignore", ignore.match)
 
-    for dirpath, dirnames, filenames in os.walk(root):
-        rel_dir = os.path.relpath(dirpath, root).replace("\\", "/")
-        if rel_dir == ".":
-            rel_dir = ""
+    # Depth-first, with each directory's files yielded before its
+    # subdirectories are entered, matching os.walk's top-down order.
+    stack = [(str(root), "")]
+    while stack:
+        dirpath, rel_dir = stack.pop()
+        entries = list_dir(dirpath)
 
-        # === Filter ignored directories ===
-        keep_dirs = []
-        for d in dirnames:
-            rel_subdir = f"{rel_dir}/{d}" if rel_dir else d
-            if is_ignored(rel_subdir, ignore_patterns):
-                if debug_ignore:
-                    print(f"[DEBUG] Skipping directory (ignored): {rel_subdir}")
-            else:
-                keep_dirs.append(d)
-        dirnames[:] = keep_dirs  # modifies walk traversal
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            rel_path = f"{rel_dir}/{name}" if rel_dir else name
+            is_link = entry.is_symlink()
+            if is_link:
+                # Resolving the link's target type costs one stat.
+                scan_stats["stat_calls"] += 1
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
 
-        # === Process files ===
-        for fname in filenames:
-            rel_file = f"{rel_dir}/{fname}" if rel_dir else fname
+            # === Filter ignored directories ===
+            if is_dir:
+                if name == DEFAULT_CACHE_DIRNAME:
+                    continue
+                if is_ignored(rel_path, is_dir=True):
+                    if debug_ignore:
+                        print(f"[DEBUG] Skipping directory (ignored): {rel_path}")
+                elif not is_link:
+                    subdirs.append((entry.path, rel_path))
+                continue
 
-            if is_ignored(rel_file, ignore_patterns):
+            # === Process files ===
+            if is_ignored(rel_path):
                 if debug_ignore:
-                    print(f"[DEBUG] Skipping file (ignored): {rel_file}")
+                    print(f"[DEBUG] Skipping file (ignored): {rel_path}")
                 continue
 
-            full_path = Path(dirpath) / fname
-            if should_scan_file(full_path, max_size_bytes, include_ext, exclude_ext):
-                for finding in scan_file(full_path, active_patterns):
-                    findings.append(finding)
+            if not _extension_allowed(_suffix(name), include_ext, exclude_ext):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            yield Path(entry.path)
+
+        stack.extend(reversed(subdirs))
+
+
+# Worker-process state, set once per worker by _init_worker.
+_worker_patterns: Optional[PatternSet] = None
+_worker_stream_threshold: Optional[int] = None
+_worker_cache: Optional[ScanCache] = None
+_worker_limits: Optional[ScanLimits] = None
+
+
+def _init_worker(
+    active_patterns: PatternSet,
+    stream_threshold_bytes: Optional[int],
+    cache: Optional[ScanCache],
+    profile: bool = False,
+    limits: Optional[ScanLimits] = None,
+) -> None:
+    global _worker_patterns, _worker_stream_threshold, _worker_cache, _worker_limits
+    _worker_patterns = active_patterns
+    _worker_stream_threshold = stream_threshold_bytes
+    _worker_cache = cache
+    _worker_limits = limits
+    if profile:
+        profiling.enable_profiling()
 
+
+def _scan_batch(paths: List[Path]) -> Tuple[List[Finding], Dict[str, int], Optional[Dict]]:
+    before = dict(scan_stats)
+    findings: List[Finding] = []
+    for path in paths:
+        findings.extend(
+            scan_file(
+                path, _worker_patterns, _worker_stream_threshold, _worker_cache, _worker_limits
+            )
+        )
+    if _worker_cache is not None:
+        _worker_cache.flush()
+    stats = {k: scan_stats[k] - before[k] for k in scan_stats}
+    return findings, stats, profiling.take_profile()
+
+
+def _batch_result(future: Future) -> List[Finding]:
+    findings, stats, profile = future.result()
+    for k, v in stats.items():
+        scan_stats[k] += v
+    if profile is not None and profiling.active is not None:
+        profiling.active.merge(profile)
     return findings
+
+
+def scan_paths(
+    paths: Iterable[Path],
+    active_patterns: PatternSet,
+    stream_threshold_bytes: Optional[int] = DEFAULT_STREAM_THRESHOLD_BYTES,
+    jobs: int = 1,
+    cache: Optional[ScanCache] = None,
+    limits: Optional[ScanLimits] = None,
+) -> Iterator[Finding]:
+    """
+    Scan `paths` and yield their findings in path order, then line order.
+
+    With `jobs > 1`, batches of paths are sent to a pool of worker
+    processes, each of which receives the compiled patterns once at
+    startup. Results are yielded in submission order, so the output is
+    identical to a serial scan. Runs with fewer than PARALLEL_MIN_FILES
+    files stay serial to avoid paying for process startup.
+    """
+    paths = iter(paths)
+
+    if jobs > 1:
+        head = list(islice(paths, PARALLEL_MIN_FILES))
+        if len(head) < PARALLEL_MIN_FILES:
+            paths = iter(head)
+        else:
+            yield from _scan_paths_parallel(
+                chain(head, paths), active_patterns, stream_threshold_bytes, jobs, cache, limits
+            )
+            return
+
+    for path in paths:
+        yield from scan_file(path, active_patterns, stream_threshold_bytes, cache, limits)
+
+
+def _scan_paths_parallel(
+    paths: Iterator[Path],
+    active_patterns: PatternSet,
+    stream_threshold_bytes: Optional[int],
+    jobs: int,
+    cache: Optional[ScanCache],
+    limits: Optional[ScanLimits] = None,
+) -> Iterator[Finding]:
+    batches = iter(lambda: list(islice(paths, PARALLEL_BATCH_SIZE)), [])
+    # Keep a bounded number of batches in flight so a huge tree is never
+    # queued up front.
+    max_in_flight = jobs * 4
+    pending: Deque[Future] = deque()
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(
+            active_patterns,
+            stream_threshold_bytes,
+            cache,
+            profiling.active is not None,
+            limits,
+        ),
+    ) as pool:
+        for batch in batches:
+            pending.append(pool.submit(_scan_batch, batch))
+            if len(pending) >= max_in_flight:
+                yield from _batch_result(pending.popleft())
+        while pending:
+            yield from _batch_result(pending.popleft())
+
+
+def _file_digest(file_path: str) -> Optional[bytes]:
+    """BLAKE2b digest of a file's contents, or None if it cannot be read."""
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    except OSError:
+        return None
+    return h.digest()
+
+
+def collapse_duplicates(findings: Iterable[Finding]) -> Iterator[Finding]:
+    """
+    Merge the findings of files with identical contents that produced the
+    same findings. The first file's findings are kept, and each one's
+    `locations` lists every file sharing them. Files that cannot be read
+    back, such as `<commit>:<path>` history entries, are never merged.
+    Findings are buffered until the input is exhausted and keep the order
+    of their first occurrence.
+    """
+    merged: Dict[Tuple, List[Finding]] = {}
+    for file_path, group in groupby(findings, key=lambda f: f.file_path):
+        file_findings = list(group)
+        # Equal findings alone do not make equal files: two configs sharing
+        # one leaked line differ elsewhere. With --changed-only, identical
+        # files can still differ in the lines scanned, hence both parts.
+        key = (
+            _file_digest(file_path) or file_path,
+            tuple((f.pattern_name, f.line_no, f.line_preview) for f in file_findings),
+        )
+        first = merged.get(key)
+        if first is None:
+            merged[key] = file_findings
+            continue
+        locations = first[0].locations
+        if locations is None:
+            locations = [first[0].file_path]
+            for f in first:
+                f.locations = locations
+        locations.append(file_path)
+
+    for file_findings in merged.values():
+        yield from file_findings
+
+
+def iter_scan_changes(
+    root: Path,
+    active_patterns: PatternSet,
+    include_ext: Optional[List[str]],
+    exclude_ext: Optional[List[str]],
+    ignore_patterns: Union[List[str], IgnoreMatcher],
+    since: Optional[str] = None,
+    debug_ignore: bool = False,
+    stream_threshold_bytes: Optional[int] = DEFAULT_STREAM_THRESHOLD_BYTES,
+    jobs: int = 1,
+    cache: Optional[ScanCache] = None,
+    limits: Optional[ScanLimits] = None,
+) -> Iterator[Finding]:
+    """
+    Scan only what changed in the git repository at `root`: the lines added
+    relative to `since` (by default HEAD, i.e. staged and unstaged changes),
+    plus untracked files in full. Unchanged lines of modified files are
+    never read.
+    """
+    ignore = compile_ignore_patterns(ignore_patterns)
+
+    def wanted(rel_path: str) -> bool:
+        if ignore.is_ignored(rel_path):
+            if debug_ignore:
+                print(f"[DEBUG] Skipping file (ignored): {rel_path}")
+            return False
+        return True
+
+    for rel_path, first_line, lines in iter_added_hunks(root, since):
+        if not _extension_allowed(_suffix(rel_path.rsplit("/", 1)[-1]), include_ext, exclude_ext):
+            continue
+        if wanted(rel_path):
+            yield from scan_lines(root / rel_path, lines, first_line, active_patterns, limits)
+
+    untracked = (
+        root / rel_path
+        for rel_path in get_untracked_files(root)
+        if wanted(rel_path)
+    )
+    yield from scan_paths(
+        (path for path in untracked if should_scan_file(path, None, include_ext, exclude_ext)),
+        active_patterns,
+        stream_threshold_bytes,
+        jobs=jobs,
+        cache=cache,
+        limits=limits,
+    )
+
+
+def iter_scan_history(
+    root: Path,
+    active_patterns: PatternSet,
+    include_ext: Optional[List[str]],
+    exclude_ext: Optional[List[str]],
+    ignore_patterns: Union[List[str], IgnoreMatcher],
+    debug_ignore: bool = False,
+    limits: Optional[ScanLimits] = None,
+) -> Iterator[Finding]:
+    """
+    Scan every blob reachable from any ref of the git repository at `root`,
+    including files that were later deleted or rewritten.
+
+    Each unique blob is scanned once. Its findings are then reported for
+    every commit that introduced it, with `file_path` set to
+    `<commit>:<path>` (the form `git show` accepts). Findings are buffered
+    until the blob scan completes, since the commits are only looked up
+    for blobs that produced findings.
+    """
+    ignore = compile_ignore_patterns(ignore_patterns)
+
+    verdicts: Dict[str, bool] = {}
+
+    def wanted(rel_path: str) -> bool:
+        verdict = verdicts.get(rel_path)
+        if verdict is not None:
+            return verdict
+        verdict = True
+        if not _extension_allowed(_suffix(rel_path.rsplit("/", 1)[-1]), include_ext, exclude_ext):
+            verdict = False
+        elif ignore.is_ignored(rel_path):
+            if debug_ignore:
+                print(f"[DEBUG] Skipping file (ignored): {rel_path}")
+            verdict = False
+        verdicts[rel_path] = verdict
+        return verdict
+
+    hits: Dict[str, List[Finding]] = {}
+    for blob, rel_path, data in iter_history_blobs(root, wanted):
+        scan_stats["files_scanned"] += 1
+        if looks_binary(data[:BINARY_SNIFF_BYTES]):
+            scan_stats["binary_skipped"] += 1
+            continue
+        budget = (limits or DEFAULT_SCAN_LIMITS).budget()
+        text = timed("decode", _decode_text)(_apply_size_budget(data, budget))
+        findings = timed("match", _scan_text)(rel_path, text, active_patterns, 1, budget)
+        if budget.partial is not None:
+            _report_partial(f"{blob}:{rel_path}", budget.partial)
+        if findings:
+            hits[blob] = findings
+
+    if not hits:
+        return
+
+    # Commits arrive newest first; rank them so each blob can list its
+    # locations oldest first while keeping the path order within a commit.
+    commit_rank: Dict[str, int] = {}
+    locations: Dict[str, List[Tuple[int, str]]] = {}
+    for blob, commit, rel_path in iter_blob_locations(root, hits):
+        rank = commit_rank.setdefault(commit, len(commit_rank))
+        if not wanted(rel_path):
+            continue
+        locations.setdefault(blob, []).append((-rank, f"{commit}:{rel_path}"))
+
+    for blob, findings in hits.items():
+        # A blob only reachable through a merge resolution has no
+        # introducing commit and keeps its bare path.
+        places = [place for _, place in sorted(locations.get(blob, []), key=lambda x: x[0])]
+        for file_path in places or [findings[0].file_path]:
+            for f in findings:
+                yield replace(f, file_path=file_path)
+
+
+def iter_walk_and_scan(
+    root: Path,
+    max_size_mb: int,
+    include_ext: Optional[List[str]],
+    exclude_ext: Optional[List[str]],
+    ignore_patterns: Union[List[str], IgnoreMatcher],
+    active_patterns: PatternSet,
+    debug_ignore: bool = False,
+    jobs: int = 1,
+    cache: Optional[ScanCache] = None,
+    limits: Optional[ScanLimits] = None,
+) -> Iterator[Finding]:
+    """
+    Streaming form of `walk_and_scan`: findings are yielded as soon as
+    their file has been scanned, so memory is bounded by the files in
+    flight rather than by the total number of findings.
+    """
+    targets = iter_scan_targets(root, include_ext, exclude_ext, ignore_patterns, debug_ignore)
+    yield from scan_paths(
+        targets,
+        active_patterns,
+        max_size_mb * 1024 * 1024,
+        jobs=jobs,
+        cache=cache,
+        limits=limits,
+    )
+
+
+def walk_and_scan(
+    root: Path,
+    max_size_mb: int,
+    include_ext: Optional[List[str]],
+    exclude_ext: Optional[List[str]],
+    ignore_patterns: Union[List[str], IgnoreMatcher],
+    active_patterns: PatternSet,
+    debug_ignore: bool = False,
+    jobs: int = 1,
+    cache: Optional[ScanCache] = None,
+    limits: Optional[ScanLimits] = None,
+) -> List[Finding]:
+    """
+    Recursively walk the directory tree from `root` and scan matching files.
+    Properly respects .seculintignore rules and skips ignored directories.
+    Set `debug_ignore=True` to print skipped files/directories.
+    Files larger than `max_size_mb` are scanned in streaming mode rather
+    than skipped. `jobs` sets the number of worker processes, `cache`
+    reuses results for files unchanged since a previous run, and `limits`
+    sets the per-line and per-file scan budgets.
+    """
+    return list(
+        iter_walk_and_scan(
+            root,
+            max_size_mb,
+            include_ext,
+            exclude_ext,
+            ignore_patterns,
+            active_patterns,
+            debug_ignore=debug_ignore,
+            jobs=jobs,
+            cache=cache,
+            limits=limits,
+        )
+    )
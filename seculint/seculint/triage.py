@@ -0,0 +1,231 @@
+import re
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .models import Finding
+from .patterns import shannon_entropy
+from .profiling import unwrap
+
+# Findings scoring at or below the low bound are dismissed locally, those at
+# or above the high bound are confirmed locally; only the band in between
+# is sent to the AI.
+DEFAULT_TRIAGE_LOW = 0.2
+DEFAULT_TRIAGE_HIGH = 0.85
+TRIAGE_BATCH_SIZE = 512
+
+# Patterns whose matches are distinctive tokens rather than assignments.
+TOKEN_PATTERNS = frozenset({"AWS_ACCESS_KEY_ID", "PRIVATE_KEY_MARKER"})
+
+_TEST_PATH = re.compile(
+    r"(?:^|/)(?:tests?|spec|specs|__tests__|__mocks__|fixtures?|mocks?|examples?|samples?|docs?)/"
+    r"|(?:^|/)test_[^/]*$|_test\.\w+$|\.(?:spec|test)\.\w+$",
+    re.IGNORECASE,
+)
+# Values that are wholly an interpolation of an environment variable or a
+# secret-store reference, and unquoted values that read one.
+_ENV_LOOKUP = re.compile(
+    r"^(?:\$[A-Z_][A-Z0-9_]*|\$\{[A-Za-z_][\w.]*(?::?[-=?+][^}]*)?\}"
+    r"|\$\{\{\s*(?:secrets|env|vars)\.\w+\s*\}\}|%[A-Za-z_]\w*%)$"
+)
+_ENV_ACCESSOR = re.compile(
+    r"^(?:os\.environ\b|os\.getenv\(|getenv\(|process\.env\b|System\.getenv\(|ENV(?:\[|\.fetch\b)"
+    r"|(?:System\.)?Environment\.GetEnvironmentVariable\(|secrets\.|vault\.|keyring\.)"
+)
+# Whole-value placeholders: template and filler forms, or values made only
+# of plain words and short numbers, one of them a placeholder word
+# ("your-api-key-here", "CHANGE_ME", "example123"). A placeholder word
+# inside a random token, as in "sk_live_51HfakeKeyQ9", does not count.
+_PLACEHOLDER = re.compile(
+    r"^(?:<[^>]*>|\{\{.*\}\}|\$\{.*\}|%\(.*\)s|\{[a-z_]*\}|\*+|x{3,}|\.{3,}|-+|_+)$"
+    r"|^(?:(?:[a-z]+|\d{1,4})[\s._-])*"
+    r"(?:change[_-]?me|replace[_-]?me|your|placeholder|example|dummy|redacted|todo|fixme"
+    r"|sample|fake|insert|secret[_-]?here|x{3,})\d{0,4}"
+    r"(?:[\s._-](?:[a-z]+|\d{1,4}))*$",
+    re.IGNORECASE,
+)
+_NULL_VALUES = frozenset(
+    {"", "none", "null", "nil", "undefined", "true", "false", "0", "[]", "{}", "()"}
+)
+_KNOWN_DUMMIES = frozenset(
+    {
+        "password", "passwd", "pass", "pwd", "secret", "token", "admin", "root",
+        "test", "testing", "foo", "bar", "baz", "qwerty", "letmein", "abc123",
+        "123456", "12345678", "1234", "pass123", "password123", "hunter2",
+        "akiaiosfodnn7example", "wjalrxutnfemi/k7mdeng/bpxrficyexamplekey",
+    }
+)
+_DUMMY_EMAIL_DOMAINS = re.compile(
+    r"@(?:[\w-]+\.)*(?:example\.(?:com|org|net)|test\.com|localhost|domain\.com|email\.com"
+    r"|foo\.(?:com|bar)|acme\.com|invalid|test)$",
+    re.IGNORECASE,
+)
+_QUOTED = re.compile(r"""(["'`])((?:\\.|(?!\1).)*)\1""")
+_TEMPLATE = re.compile(r"\$?\{\{.*?\}\}")
+_NON_LITERAL = re.compile(r"^[A-Za-z_][\w.]*(?:\(|\[|$)")
+
+triage_stats = {"confirmed": 0, "dismissed": 0, "uncertain": 0}
+
+
+def _regex_for(patterns) -> Dict[str, object]:
+    if patterns is None:
+        return {}
+    # Unwrapped, so triage lookups stay out of a --profile-patterns profile.
+    return {
+        p["name"]: unwrap(p["regex"])
+        for p in getattr(patterns, "patterns", patterns)
+        if hasattr(p["regex"], "search")
+    }
+
+
+def matched_text(line: str, regex=None) -> str:
+    """The text `regex` matches on `line`, or the whole line."""
+    if regex is not None:
+        m = regex.search(line)
+        if m is not None:
+            return m.group(0)
+    return line
+
+
+def extract_value(line: str, regex=None) -> Tuple[str, bool]:
+    """
+    Return (value, is_literal) for an assignment on `line`: the quoted
+    string or bare token after the first `=` or `:` of the match.
+    """
+    start = 0
+    if regex is not None:
+        m = regex.search(line)
+        if m is not None:
+            start = m.start()
+
+    sep = re.search(r"[:=]", line[start:])
+    if sep is None:
+        return line[start:].strip(), False
+
+    rhs = line[start + sep.end():].lstrip("=>").strip()
+    q = _QUOTED.match(rhs) or _QUOTED.match(rhs.lstrip("rbuf"))
+    if q is not None:
+        return q.group(2), True
+    t = _TEMPLATE.match(rhs)
+    if t is not None:
+        return t.group(0), False
+    token = re.split(r"[\s,;)#]", rhs, maxsplit=1)[0]
+    return token, False
+
+
+def is_test_path(file_path: str) -> bool:
+    return bool(_TEST_PATH.search(file_path.replace("\\", "/")))
+
+
+def score_finding(f: Finding, regex=None, test_path: Optional[bool] = None) -> Tuple[float, str]:
+    """
+    Estimate how likely `f` is a real secret, from 0 (certainly not) to 1
+    (certainly), with a short reason for the score.
+    """
+    if test_path is None:
+        test_path = is_test_path(f.file_path)
+    penalty = 0.15 if test_path else 0.0
+    where = " in a test/example path" if test_path else ""
+    line = f.line_preview.strip()
+
+    if f.pattern_name == "EMAIL_ADDRESS":
+        value = matched_text(line, regex)
+        if _DUMMY_EMAIL_DOMAINS.search(value):
+            return 0.05, "Email address on a reserved or example domain."
+        if value.lower().startswith(("noreply@", "no-reply@")):
+            return 0.15, "No-reply address."
+        return 0.5 - penalty, f"Email address{where}."
+
+    if f.pattern_name in TOKEN_PATTERNS:
+        value = matched_text(line, regex)
+        if value.lower() in _KNOWN_DUMMIES or "EXAMPLE" in value:
+            return 0.05, "Documented example credential."
+        score = 0.8 - penalty
+        if len(value) >= 16 and shannon_entropy(value) >= 3.5:
+            return min(score + 0.15, 1.0), f"High-entropy {f.pattern_name.lower()} value{where}."
+        return score, f"Distinctive {f.pattern_name.lower()} format{where}."
+
+    if not f.pattern_name.endswith("_ASSIGNMENT"):
+        return 0.5 - penalty, f"No local evidence for this pattern{where}."
+
+    value, literal = extract_value(line, regex)
+    if _ENV_LOOKUP.match(value) or (not literal and _ENV_ACCESSOR.match(value)):
+        return 0.05, "Value is read from the environment or a secret store."
+    lowered = value.lower()
+    if lowered in _NULL_VALUES:
+        return 0.02, "Value is empty, null or a boolean."
+    if _PLACEHOLDER.match(value):
+        return 0.05, "Value is a placeholder."
+    if lowered in _KNOWN_DUMMIES:
+        return 0.1, "Value is a well-known dummy."
+    if not literal and _NON_LITERAL.match(value):
+        return 0.1, "Value is a variable, call or type, not a literal."
+
+    entropy = shannon_entropy(value)
+    score = 0.5 - penalty
+    if len(value) >= 20 and entropy >= 4.0:
+        score += 0.45
+        reason = "Long high-entropy literal"
+    elif len(value) >= 12 and entropy >= 3.5:
+        score += 0.3
+        reason = "High-entropy literal"
+    elif len(value) < 6 or entropy < 2.5:
+        score -= 0.2
+        reason = "Short or low-entropy literal"
+    else:
+        reason = "Literal value"
+    return max(0.0, min(score, 1.0)), f"{reason}{where}."
+
+
+def score_findings(
+    findings: List[Finding], regexes: Optional[Dict[str, object]] = None
+) -> List[Tuple[float, str]]:
+    """
+    Score a batch of findings, looking up pattern regexes by name in
+    `regexes`. Identical lines of the same pattern, common in vendored and
+    generated code, are scored once per batch.
+    """
+    regexes = regexes or {}
+    memo: Dict[Tuple[str, str, bool], Tuple[float, str]] = {}
+    scores: List[Tuple[float, str]] = []
+    for f in findings:
+        test_path = is_test_path(f.file_path)
+        key = (f.pattern_name, f.line_preview, test_path)
+        result = memo.get(key)
+        if result is None:
+            result = memo[key] = score_finding(f, regexes.get(f.pattern_name), test_path)
+        scores.append(result)
+    return scores
+
+
+def iter_triage_findings(
+    findings: Iterable[Finding],
+    patterns=None,
+    low: float = DEFAULT_TRIAGE_LOW,
+    high: float = DEFAULT_TRIAGE_HIGH,
+    batch_size: int = TRIAGE_BATCH_SIZE,
+) -> Iterator[Finding]:
+    """
+    Score findings offline in batches and settle the clear cases locally.
+    Findings scoring at or below `low` are dismissed and dropped; those at
+    or above `high` are confirmed, with the AI fields filled in so later
+    stages skip them. Findings in between pass through untouched.
+    """
+    regexes = _regex_for(patterns)
+    it = iter(findings)
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            return
+        for f, (score, reason) in zip(batch, score_findings(batch, regexes)):
+            if score <= low:
+                triage_stats["dismissed"] += 1
+                continue
+            if score >= high:
+                triage_stats["confirmed"] += 1
+                f.ai_confirmed = True
+                f.ai_type = f.pattern_name
+                f.ai_severity = f.severity.upper()
+                f.ai_reason = f"[TRIAGE] Confirmed locally (score {score:.2f}): {reason}"
+            else:
+                triage_stats["uncertain"] += 1
+            yield f
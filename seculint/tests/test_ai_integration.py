@@ -0,0 +1,230 @@
+import asyncio
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from seculint import ai_integration
+from seculint.ai_integration import (
+    AsyncAIClient,
+    iter_ai_refine_findings,
+    match_verdicts,
+    parse_batch_response,
+)
+from seculint.models import Finding
+
+openai = pytest.importorskip("openai")
+
+
+class ChatServer:
+    """
+    Local stand-in for a chat completions endpoint. Each request is answered
+    by the next scripted reply, a (status, content, headers, delay) tuple;
+    once the script runs out, `default` is called with the prompt.
+    """
+
+    def __init__(self):
+        self.script = []
+        self.default = lambda prompt: "[]"
+        self.prompts = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                prompt = body["messages"][-1]["content"]
+                server.prompts.append(prompt)
+                if server.script:
+                    status, content, headers, delay = server.script.pop(0)
+                else:
+                    status, content, headers, delay = 200, server.default(prompt), {}, 0
+                time.sleep(delay)
+                if status == 200:
+                    payload = {
+                        "id": "chatcmpl-test",
+                        "object": "chat.completion",
+                        "created": 0,
+                        "model": body["model"],
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {"role": "assistant", "content": content},
+                                "finish_reason": "stop",
+                            }
+                        ],
+                    }
+                else:
+                    payload = {"error": {"message": content, "type": "test"}}
+                data = json.dumps(payload).encode("utf-8")
+                try:
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except OSError:
+                    pass  # the client gave up (timeout)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+
+
+@pytest.fixture
+def chat_server(monkeypatch):
+    server = ChatServer()
+    thread = threading.Thread(target=server.httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    monkeypatch.setenv("OPENAI_BASE_URL", server.url)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(ai_integration, "AI_BACKOFF_BASE", 0.01)
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+def _findings(tmp_path):
+    path = tmp_path / "settings.py"
+    path.write_text(
+        'DEBUG = True\npassword = "Xk29vLq8mZ"\nname = "app"\ntoken = "abc"\n', encoding="utf-8"
+    )
+    return [
+        Finding(str(path), 1, "DEBUG_TRUE", "LOW", "Debug flag.", "DEBUG = True"),
+        Finding(
+            str(path), 2, "GENERIC_PASSWORD_ASSIGNMENT", "HIGH", "Password.",
+            'password = "Xk29vLq8mZ"',
+        ),
+        Finding(str(path), 4, "GENERIC_TOKEN_ASSIGNMENT", "HIGH", "Token.", 'token = "abc"'),
+    ]
+
+
+def _refine(findings, **kwargs):
+    kwargs.setdefault("rate_limit", 1000.0)
+    return list(iter_ai_refine_findings(findings, **kwargs))
+
+
+def test_client_retries_429_and_5xx_with_backoff(chat_server, monkeypatch):
+    delays = []
+    retry_delay = ai_integration._retry_delay
+
+    def record(attempt, retry_after=None):
+        delays.append((attempt, retry_after))
+        return retry_delay(attempt, retry_after)
+
+    monkeypatch.setattr(ai_integration, "_retry_delay", record)
+    chat_server.script = [
+        (429, "slow down", {"Retry-After": "0"}, 0),
+        (503, "unavailable", {}, 0),
+        (200, "done", {}, 0),
+    ]
+
+    async def run():
+        client = AsyncAIClient(rate_limit=1000.0, max_retries=2)
+        try:
+            return await client.complete("prompt")
+        finally:
+            await client.close()
+
+    assert asyncio.run(run()) == "done"
+    assert len(chat_server.prompts) == 3
+    assert delays == [(0, "0"), (1, None)]
+
+
+def test_client_gives_up_after_max_retries(chat_server):
+    chat_server.script = [(500, "boom", {}, 0)] * 3
+
+    async def run():
+        client = AsyncAIClient(rate_limit=1000.0, max_retries=1)
+        try:
+            return await client.complete("prompt")
+        finally:
+            await client.close()
+
+    with pytest.raises(openai.InternalServerError):
+        asyncio.run(run())
+    assert len(chat_server.prompts) == 2
+
+
+def test_timeouts_are_retried_then_keep_findings(chat_server, tmp_path):
+    chat_server.script = [(200, "[]", {}, 0.5)] * 2
+    findings = _findings(tmp_path)
+
+    kept = _refine(findings, timeout=0.2, max_retries=1)
+    assert kept == findings
+    assert len(chat_server.prompts) == 2
+    assert all(f.ai_reason.startswith("[AI ERROR]") for f in kept)
+
+
+def test_malformed_batch_response_keeps_findings(chat_server, tmp_path):
+    truncated = '[{"line": 2, "pattern": "GENERIC_PASSWORD_ASSIGNMENT", "is_sec'
+    chat_server.default = lambda prompt: truncated
+    findings = _findings(tmp_path)
+
+    kept = _refine(findings)
+    assert kept == findings
+    assert all(f.ai_confirmed is True for f in kept)
+    assert all("no valid verdict" in f.ai_reason for f in kept)
+
+
+def test_verdicts_are_applied_to_their_findings(chat_server, tmp_path):
+    def answer(prompt):
+        # Verdicts come back out of order and wrapped, as models often do.
+        items = re.findall(r"- Line (\d+), pattern (\w+)", prompt)
+        verdicts = [
+            {
+                "line": int(line),
+                "pattern": pattern,
+                "is_secret": pattern == "GENERIC_PASSWORD_ASSIGNMENT",
+                "secret_type": "password",
+                "severity": "HIGH",
+                "reason": f"line {line}",
+            }
+            for line, pattern in reversed(items)
+        ]
+        return "```json\n" + json.dumps({"findings": verdicts}) + "\n```"
+
+    chat_server.default = answer
+    findings = _findings(tmp_path)
+
+    kept = _refine(findings)
+    assert [f.line_no for f in kept] == [2]
+    assert [(f.line_no, f.ai_confirmed, f.ai_reason) for f in findings] == [
+        (1, False, "line 1"),
+        (2, True, "line 2"),
+        (4, False, "line 4"),
+    ]
+    assert len(chat_server.prompts) == 1
+
+
+def test_parse_batch_response_recovers_items_from_truncated_arrays():
+    text = (
+        'Here you go:\n[{"line": 1, "pattern": "A", "is_secret": false},'
+        ' {"line": 2, "pattern": "B", "is_se'
+    )
+    assert parse_batch_response(text) == [{"line": 1, "pattern": "A", "is_secret": False}]
+    assert parse_batch_response("I cannot help with that.") == []
+
+
+def test_match_verdicts_pairs_by_line_and_pattern():
+    findings = [
+        Finding("f", 3, "A", "HIGH", "", "x"),
+        Finding("f", 3, "B", "HIGH", "", "x"),
+        Finding("f", 7, "C", "HIGH", "", "y"),
+        Finding("f", 9, "D", "HIGH", "", "z"),
+    ]
+    verdicts = [
+        {"line": 3, "pattern": "B", "reason": "b"},
+        {"line": "3", "pattern": "A", "reason": "a"},
+        {"line": 7, "pattern": "renamed", "reason": "c"},
+        {"line": "n/a", "reason": "bad"},
+    ]
+    matched = match_verdicts(findings, verdicts)
+    assert [v and v["reason"] for v in matched] == ["a", "b", "c", None]
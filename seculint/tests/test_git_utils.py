@@ -0,0 +1,28 @@
+import shutil
+import subprocess
+
+import pytest
+
+from seculint.git_utils import iter_added_hunks
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+
+def _git(root, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args], cwd=root, check=True
+    )
+
+
+@pytest.mark.parametrize("name", ["with space.txt", 'tab\tand "quote".txt', "été.txt"])
+def test_added_hunks_name_the_working_tree_file(tmp_path, name):
+    # git ends a name containing a space with a TAB, and C-quotes names
+    # with control characters or quotes as "b/...".
+    _git(tmp_path, "init", "-q")
+    (tmp_path / name).write_text("x\n", encoding="utf-8")
+    _git(tmp_path, "add", "-A")
+    _git(tmp_path, "commit", "-qm", "add")
+    with (tmp_path / name).open("a", encoding="utf-8") as f:
+        f.write("password = hunter2\n")
+
+    assert list(iter_added_hunks(tmp_path)) == [(name, 2, ["password = hunter2"])]
@@ -0,0 +1,60 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from seculint.ignore import IgnoreMatcher
+
+# (rules, files) pairs whose verdicts must agree with `git check-ignore`.
+CASES = [
+    (
+        ["config/*", "!config/app.env"],
+        ["config/app.env", "config/db.env", "config/sub/x.env", "src/config/a.env"],
+    ),
+    (
+        ["build/", "*.log", "!keep.log", "/root.txt", "docs/**/*.md"],
+        [
+            "build/out.js",
+            "src/build/out.js",
+            "a.log",
+            "keep.log",
+            "sub/keep.log",
+            "root.txt",
+            "sub/root.txt",
+            "docs/a.md",
+            "docs/x/y/b.md",
+            "docs/readme.txt",
+        ],
+    ),
+    (
+        ["vendor", "!vendor/keep.py", "**/cache/**", "a/*/c"],
+        ["vendor/x.py", "vendor/keep.py", "lib/vendor", "x/cache/y", "a/b/c", "a/b/d/c", "a/c"],
+    ),
+]
+
+
+def _git_ignored(root: Path, files):
+    result = subprocess.run(
+        ["git", "check-ignore", "--stdin"],
+        cwd=root,
+        input="\n".join(files) + "\n",
+        capture_output=True,
+        text=True,
+    )
+    return set(result.stdout.split())
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+@pytest.mark.parametrize("rules, files", CASES)
+def test_matches_git_check_ignore(tmp_path, rules, files):
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    (tmp_path / ".gitignore").write_text("\n".join(rules) + "\n", encoding="utf-8")
+    for rel in files:
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x\n", encoding="utf-8")
+
+    matcher = IgnoreMatcher(rules)
+    expected = _git_ignored(tmp_path, files)
+    assert {rel for rel in files if matcher.is_ignored(rel)} == expected
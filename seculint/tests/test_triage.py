@@ -0,0 +1,59 @@
+import pytest
+
+from seculint.models import Finding
+from seculint.patterns import build_active_patterns
+from seculint.triage import DEFAULT_TRIAGE_LOW, score_finding
+
+_REGEX = {p["name"]: p["regex"] for p in build_active_patterns({}).patterns}
+
+
+def _score(line, pattern="GENERIC_PASSWORD_ASSIGNMENT"):
+    f = Finding("app/settings.py", 1, pattern, "HIGH", "", line)
+    return score_finding(f, _REGEX[pattern])[0]
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        'password = os.environ["DB_PASSWORD"]',
+        'password = os.getenv("DB_PASSWORD", "")',
+        "password: ${DB_PASSWORD}",
+        'password = "${DB_PASSWORD:-}"',
+        "password=$DB_PASSWORD",
+        "password: ${{ secrets.DB_PASSWORD }}",
+        "password = process.env.DB_PASSWORD;",
+        "password = ENV['DB_PASSWORD']",
+        'password = "${var.db_password}"',
+    ],
+)
+def test_environment_lookups_are_dismissed(line):
+    assert _score(line) <= DEFAULT_TRIAGE_LOW
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        'db_password = "Tr0ub4dor$Horse9"',
+        'password = "x9$K2mq!vLz"',
+        'password = "$Xk29vLq8"',
+        'password = "Xk29vLq8" if os.getenv("CI") else ""',
+    ],
+)
+def test_literals_containing_lookup_syntax_are_kept(line):
+    assert _score(line) > DEFAULT_TRIAGE_LOW
+
+
+@pytest.mark.parametrize(
+    "value",
+    ["changeme", "CHANGE_ME", "<your-password>", "your-api-key-here", "example123", "xxxxxx",
+     "fake password", "{{ db_password }}", "TODO"],
+)
+def test_placeholders_are_dismissed(value):
+    assert _score(f'password = "{value}"') <= DEFAULT_TRIAGE_LOW
+
+
+@pytest.mark.parametrize(
+    "value", ["ghp_8fKexampleZ2aQ", "Wq7#sampleR4!xZ", "Kp9vTodoY3mqL", "sk_live_51HfakeKeyQ9"]
+)
+def test_placeholder_words_inside_random_values_are_kept(value):
+    assert _score(f'token = "{value}"', "GENERIC_TOKEN_ASSIGNMENT") > DEFAULT_TRIAGE_LOW